@@ -4,7 +4,9 @@ import pandas as pd
 import numpy as np
 
 from use.config import comps
+from use import raw_index
 from use.functions import json_to_dict, create_slug, elapsed_time_str
+from use.storage import write_table
 
 # --------------------------------------------------------------------------------------
 # LIMPIEZA DE INFORMACIÓN DE TEMPORADA - Procesa el JSON de una temporada de Fotmob y genera los CSVs correspondientes.
@@ -22,7 +24,7 @@ def clean_season_information(season_info: dict, season_key: str, league_slug: st
                                  "slug": league_slug, "name": league_name, "short_name": details.get("shortName", np.nan),
                                  "country": details.get("country", np.nan), "gender": details.get("gender", np.nan),
                                  "league_color": details.get("leagueColor", np.nan)}])
-        info_df.to_csv(os.path.join(season_out_path, "info.csv"), index=False, sep=";")
+        write_table(df=info_df, path=os.path.join(season_out_path, "info.csv"))
 
     # ----------------------------------------------------------------------------------
     # CLASIFICACIONES
@@ -43,7 +45,7 @@ def clean_season_information(season_info: dict, season_key: str, league_slug: st
                 if part_table:
                     table_df = pd.DataFrame(part_table)
 
-                    table_df.to_csv(os.path.join(standings_path, f"{f}.csv"), index=False, sep=";")
+                    write_table(df=table_df, path=os.path.join(standings_path, f"{f}.csv"))
 
     # ----------------------------------------------------------------------------------
     # PARTIDOS
@@ -55,12 +57,12 @@ def clean_season_information(season_info: dict, season_key: str, league_slug: st
                          "away_team": match.get("away", {}).get("name", np.nan), "away_team_id": match.get("away", {}).get("id", np.nan),
                          "time": match.get("status", {}).get("utcTime", np.nan), "score_str": match.get("status", {}).get("scoreStr", np.nan)} for match in matches]
         matches_df = pd.DataFrame(matches_list)
-        matches_df.to_csv(os.path.join(season_out_path, "matches.csv"), index=False, sep=";")
+        write_table(df=matches_df, path=os.path.join(season_out_path, "matches.csv"))
 
 # --------------------------------------------------------------------------------------
 # CLEANING PRINCIPAL DE LIGA - Ejecuta el proceso de limpieza de datos de Fotmob para una liga.
 # --------------------------------------------------------------------------------------
-def main_fotmob_league_cleaning(league_id: int, out_path: str, print_info: bool = True) -> None:
+def main_fotmob_league_cleaning(league_id: int, out_path: str, print_info: bool = True, only_changed: bool = True, seasons: list[str] = None) -> None:
 
     start_time = time.time()
 
@@ -80,6 +82,9 @@ def main_fotmob_league_cleaning(league_id: int, out_path: str, print_info: bool
         print(f"Starting Fotmob cleaning ({league_name})")
 
     seasons_to_proc = [s for s in os.listdir(league_raw_path) if os.path.isdir(os.path.join(league_raw_path, s))]
+    if seasons is not None:
+        seasons_to_proc = [season for season in seasons_to_proc if season in seasons]
+    index = raw_index.open_raw_index(raw_path=out_path)
 
     for season in seasons_to_proc:
         season_info_path = os.path.join(league_raw_path, season, "info.json")
@@ -87,8 +92,14 @@ def main_fotmob_league_cleaning(league_id: int, out_path: str, print_info: bool
         if not os.path.exists(season_info_path):
             continue
 
+        # Solo se limpian las temporadas cuyos archivos crudos han cambiado desde la última limpieza
+        season_start_time = time.time()
+        if only_changed and os.path.exists(os.path.join(league_clean_path, season)) and not index.needs_cleaning(scope_path=os.path.join(league_raw_path, season)):
+            continue
+
         season_info = json_to_dict(json_path=season_info_path)
         clean_season_information(season_info=season_info, season_key=season, league_slug=league_slug, league_name=league_name, season_out_path=os.path.join(league_clean_path, season))
+        index.mark_cleaned(scope_path=os.path.join(league_raw_path, season), cleaned=season_start_time)
 
         if print_info:
             print(f"     - Information cleaned for season {season}")
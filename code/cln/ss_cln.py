@@ -1,12 +1,15 @@
 import os
 import time
 from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
 
 from use.config import comps
-from use.functions import json_to_dict, create_slug, elapsed_time_str
+from use import raw_index, entity_store
+from use.functions import json_to_dict, atomic_json_dump, create_slug, elapsed_time_str, rows_to_columns, merge_columns, columns_to_df
+from use.storage import write_table, append_table, table_path
 
 # --------------------------------------------------------------------------------------
 # PROCESADO DE TABLAS DE CLASIFICACIÓN - Procesa el JSON de clasificaciones de Sofascore y guarda las tablas disponibles.
@@ -37,14 +40,14 @@ def standings_tables_proc(standings_path: str, standings_output_path: str) -> li
                       "scores_against": team.get("scoresAgainst", np.nan), "points": team.get("points", np.nan)} for team in standings_part]
         standings_df = pd.DataFrame(list_info)
         list_return.append(standings_df)
-        standings_df.to_csv(os.path.join(standings_output_path, f"{standing_type}.csv"), index=False, sep=";")
+        write_table(df=standings_df, path=os.path.join(standings_output_path, f"{standing_type}.csv"))
 
     return list_return
 
 # --------------------------------------------------------------------------------------
 # PROCESADO DE JUGADORES - Procesa el listado general de jugadores y lo enriquece con la información individual.
 # --------------------------------------------------------------------------------------
-def players_proc(players_json_path: str, players_dir_path: str, df_output_path: str) -> pd.DataFrame:
+def players_proc(players_json_path: str, season_raw_path: str, df_output_path: str) -> pd.DataFrame:
     
     if not os.path.exists(players_json_path):
         return pd.DataFrame()
@@ -56,47 +59,37 @@ def players_proc(players_json_path: str, players_dir_path: str, df_output_path:
     players_df = pd.DataFrame(all_players_data)
 
     players_info = []
-    if os.path.exists(players_dir_path):
-        for player_file in os.listdir(players_dir_path):
-            single_player_data = (json_to_dict(json_path=os.path.join(players_dir_path, player_file)).get("player"))
-
-            if not single_player_data:
-                continue
-
-            positions_detailed = single_player_data.get("positionsDetailed", [])
-            first_position = positions_detailed[0] if len(positions_detailed) > 0 else np.nan
-            second_position = positions_detailed[1] if len(positions_detailed) > 1 else np.nan
-            third_position = positions_detailed[2] if len(positions_detailed) > 2 else np.nan
-
-            players_info.append({"playerId": single_player_data.get("id", np.nan), "shortName": single_player_data.get("shortName", np.nan), "first_position": first_position,
-                                 "second_position": second_position, "third_position": third_position, "shirt_num": single_player_data.get("shirtNumber", np.nan),
-                                 "height": single_player_data.get("height", np.nan), "pref_foot": single_player_data.get("preferredFoot", np.nan),
-                                 "date_birth": single_player_data.get("dateOfBirthTimestamp", np.nan), "country": single_player_data.get("country", {}).get("name", np.nan),
-                                 "contract_until": single_player_data.get("contractUntilTimestamp", np.nan), "market_value": single_player_data.get("proposedMarketValue", np.nan)})
+    for single_player_data in entity_store.lookup_entities(season_path=season_raw_path, type="player"):
+        positions_detailed = single_player_data.get("positionsDetailed", [])
+        first_position = positions_detailed[0] if len(positions_detailed) > 0 else np.nan
+        second_position = positions_detailed[1] if len(positions_detailed) > 1 else np.nan
+        third_position = positions_detailed[2] if len(positions_detailed) > 2 else np.nan
+
+        players_info.append({"playerId": single_player_data.get("id", np.nan), "shortName": single_player_data.get("shortName", np.nan), "first_position": first_position,
+                             "second_position": second_position, "third_position": third_position, "shirt_num": single_player_data.get("shirtNumber", np.nan),
+                             "height": single_player_data.get("height", np.nan), "pref_foot": single_player_data.get("preferredFoot", np.nan),
+                             "date_birth": single_player_data.get("dateOfBirthTimestamp", np.nan), "country": single_player_data.get("country", {}).get("name", np.nan),
+                             "contract_until": single_player_data.get("contractUntilTimestamp", np.nan), "market_value": single_player_data.get("proposedMarketValue", np.nan)})
 
     if players_info:
         players_more_info_df = pd.DataFrame(players_info)
         players_df = players_df.merge(players_more_info_df, how="left", on="playerId")
 
-    players_df.to_csv(df_output_path, index=False, sep=";")
+    write_table(df=players_df, path=df_output_path)
     return players_df
 
 # --------------------------------------------------------------------------------------
 # PROCESADO DE EQUIPOS - Procesa la información individual de equipos.
 # --------------------------------------------------------------------------------------
-def teams_proc(teams_dir_path: str, df_output_path: str) -> pd.DataFrame:
+def teams_proc(season_raw_path: str, df_output_path: str) -> pd.DataFrame:
     
-    if not os.path.exists(teams_dir_path):
+    teams_data = entity_store.lookup_entities(season_path=season_raw_path, type="team")
+    if not teams_data:
         return pd.DataFrame()
 
     teams_info = []
 
-    for team_file in os.listdir(teams_dir_path):
-        single_team_data = json_to_dict(os.path.join(teams_dir_path, team_file)).get("team")
-
-        if not single_team_data:
-            continue
-
+    for single_team_data in teams_data:
         teams_info.append({"team_id": single_team_data.get("id", np.nan), "name": single_team_data.get("name", np.nan), "short_name": single_team_data.get("shortName", np.nan),
                            "full_name": single_team_data.get("fullName", np.nan), "manager": single_team_data.get("manager", {}).get("id", np.nan),
                            "venue": single_team_data.get("venue", {}).get("id", np.nan), "country": single_team_data.get("country", {}).get("name", np.nan),
@@ -104,7 +97,7 @@ def teams_proc(teams_dir_path: str, df_output_path: str) -> pd.DataFrame:
                            "secondary_colour": single_team_data.get("teamColors", {}).get("secondary", np.nan), "text_colour": single_team_data.get("teamColors", {}).get("text", np.nan)})
 
     teams_df = pd.DataFrame(teams_info)
-    teams_df.to_csv(df_output_path, index=False, sep=";")
+    write_table(df=teams_df, path=df_output_path)
     return teams_df
 
 # --------------------------------------------------------------------------------------
@@ -122,25 +115,21 @@ def venues_proc(venues_json_path: str, df_output_path: str) -> pd.DataFrame:
     venues_info = [{"venue_id": venue.get("id", np.nan), "name": venue.get("name", np.nan), "capacity": venue.get("capacity", np.nan), "city": venue.get("city", {}).get("name", np.nan),
                     "latitude": venue.get("venueCoordinates", {}).get("latitude", np.nan), "longitude": venue.get("venueCoordinates", {}).get("longitude", np.nan)} for venue in venues_data]
     venues_df = pd.DataFrame(venues_info)
-    venues_df.to_csv(df_output_path, index=False, sep=";")
+    write_table(df=venues_df, path=df_output_path)
     return venues_df
 
 # --------------------------------------------------------------------------------------
 # PROCESADO DE MANAGERS - Procesa la información individual de managers.
 # --------------------------------------------------------------------------------------
-def managers_proc(managers_dir_path: str, df_output_path: str) -> pd.DataFrame:
+def managers_proc(season_raw_path: str, df_output_path: str) -> pd.DataFrame:
     
-    if not os.path.exists(managers_dir_path):
+    managers_data = entity_store.lookup_entities(season_path=season_raw_path, type="manager")
+    if not managers_data:
         return pd.DataFrame()
 
     managers_info = []
 
-    for manager_file in os.listdir(managers_dir_path):
-        manager_data = json_to_dict(json_path=os.path.join(managers_dir_path, manager_file)).get("manager")
-
-        if not manager_data:
-            continue
-
+    for manager_data in managers_data:
         managers_info.append({"id": manager_data.get("id", np.nan), "name": manager_data.get("name", np.nan), "short_name": manager_data.get("shortName", np.nan),
                               "country": manager_data.get("country", {}).get("name", np.nan), "date_birth": manager_data.get("dateOfBirthTimestamp", np.nan),
                               "matches": manager_data.get("performance", {}).get("total", np.nan), "wins": manager_data.get("performance", {}).get("wins", np.nan),
@@ -149,30 +138,31 @@ def managers_proc(managers_dir_path: str, df_output_path: str) -> pd.DataFrame:
                               "points": manager_data.get("performance", {}).get("totalPoints", np.nan)})
 
     managers_df = pd.DataFrame(managers_info)
-    managers_df.to_csv(df_output_path, index=False, sep=";")
+    write_table(df=managers_df, path=df_output_path)
     return managers_df
 
 # --------------------------------------------------------------------------------------
-# INFORMACIÓN BÁSICA DE PARTIDO - Extrae la información principal de un partido.
+# INFORMACIÓN BÁSICA DE PARTIDO - Extrae la información principal de un partido como registro.
 # --------------------------------------------------------------------------------------
-def match_info_proc(match_data: dict) -> pd.DataFrame:
+def match_info_proc(match_data: dict) -> dict:
     
     match_info = match_data.get("match", {}).get("event")
     if not match_info:
-        return pd.DataFrame()
+        return {}
 
-    return pd.DataFrame([{"match_id": match_info.get("id", np.nan), "round": match_info.get("roundInfo", {}).get("round", np.nan), "winner": match_info.get("winnerCode", np.nan),
-                          "attendance": match_info.get("attendance", np.nan), "venue": match_info.get("venue", {}).get("id", np.nan), "referee": match_info.get("referee", {}).get("name", np.nan),
-                          "home_team": match_info.get("homeTeam", {}).get("id", np.nan), "away_team": match_info.get("awayTeam", {}).get("id", np.nan), "home_score": match_info.get("homeScore", {}).get("display", np.nan),
-                          "away_score": match_info.get("awayScore", {}).get("display", np.nan), "date_time": match_info.get("startTimestamp", np.nan)}])
+    return {"match_id": match_info.get("id", np.nan), "round": match_info.get("roundInfo", {}).get("round", np.nan), "winner": match_info.get("winnerCode", np.nan),
+            "attendance": match_info.get("attendance", np.nan), "venue": match_info.get("venue", {}).get("id", np.nan), "referee": match_info.get("referee", {}).get("name", np.nan),
+            "home_team": match_info.get("homeTeam", {}).get("id", np.nan), "away_team": match_info.get("awayTeam", {}).get("id", np.nan), "home_score": match_info.get("homeScore", {}).get("display", np.nan),
+            "away_score": match_info.get("awayScore", {}).get("display", np.nan), "date_time": match_info.get("startTimestamp", np.nan)}
 
 # --------------------------------------------------------------------------------------
-# ALINEACIÓN DE UN EQUIPO - Procesa la alineación y estadísticas de los jugadores de un equipo.
+# ALINEACIÓN DE UN EQUIPO - Procesa la alineación y estadísticas de los jugadores de un equipo como {columna: valores}.
+# Las columnas de los jugadores descartados (sin minutos) se mantienen, igual que al filtrar un DataFrame.
 # --------------------------------------------------------------------------------------
-def single_team_lineups(team_lineups: dict) -> Tuple[str, pd.DataFrame]:
+def single_team_lineups(team_lineups: dict) -> Tuple[str, dict]:
     
     if not team_lineups:
-        return np.nan, pd.DataFrame()
+        return np.nan, {}
 
     formation = team_lineups.get("formation", np.nan)
     players = team_lineups.get("players")
@@ -193,26 +183,29 @@ def single_team_lineups(team_lineups: dict) -> Tuple[str, pd.DataFrame]:
             players_list.append({"player_id": player_id, "starter": starter, **player_statistics})
 
     if not players_list:
-        return formation, pd.DataFrame()
+        return formation, {}
 
-    lineups_df = pd.DataFrame(players_list)
+    columns = list(dict.fromkeys(column for player_row in players_list for column in player_row))
 
-    if "minutesPlayed" in lineups_df.columns:
-        lineups_df = lineups_df[lineups_df["minutesPlayed"].notna()].copy()
+    if "minutesPlayed" in columns:
+        players_list = [player_row for player_row in players_list if pd.notna(player_row.get("minutesPlayed"))]
 
-    return formation, lineups_df
+    if not players_list:
+        return formation, {}
+
+    return formation, rows_to_columns(rows=players_list, columns=columns)
 
 # --------------------------------------------------------------------------------------
-# ESTADÍSTICAS DE EQUIPO EN PARTIDO - Procesa las estadísticas de equipo de un partido.
+# ESTADÍSTICAS DE EQUIPO EN PARTIDO - Procesa las estadísticas de equipo de un partido como {columna: [local, visitante]}.
 # --------------------------------------------------------------------------------------
-def match_stats_proc(match_data: dict) -> pd.DataFrame:
+def match_stats_proc(match_data: dict) -> dict:
 
     teams_stats = match_data.get("statistics", {}).get("statistics")
     if not teams_stats:
-        return pd.DataFrame()
+        return {}
 
     statistics_groups = teams_stats[0].get("groups", [])
-    statistics_df = pd.DataFrame({"ha": ["h", "a"]})
+    statistics_columns = {"ha": ["h", "a"]}
 
     for group in statistics_groups:
         group_stats = group.get("statisticsItems", [])
@@ -220,77 +213,157 @@ def match_stats_proc(match_data: dict) -> pd.DataFrame:
         for stat in group_stats:
             stat_name = stat.get("name")
             if stat_name:
-                statistics_df[stat_name] = [stat.get("homeValue"), stat.get("awayValue")]
+                statistics_columns[stat_name] = [stat.get("homeValue"), stat.get("awayValue")]
 
-    return statistics_df
+    return statistics_columns
+
+# --------------------------------------------------------------------------------------
+# PROCESADO DE UN PARTIDO - Devuelve la información, alineaciones y estadísticas de un JSON de partido como {columna: valores}.
+# --------------------------------------------------------------------------------------
+def match_file_columns(match_path: str) -> Tuple[dict, dict, dict]:
+
+    match_data = json_to_dict(json_path=match_path)
+
+    match_info = match_info_proc(match_data=match_data)
+    if not match_info:
+        return {}, {}, {}
+
+    match_id = match_info["match_id"]
+    home_team = match_info["home_team"]
+    away_team = match_info["away_team"]
+
+    match_lineups = match_data.get("lineups", {})
+    lineups_parts = []
+
+    for side, team_id, opponent_team_id in [("home", home_team, away_team), ("away", away_team, home_team)]:
+        formation, team_columns = single_team_lineups(match_lineups.get(side))
+        if team_columns:
+            team_rows = len(team_columns["player_id"])
+            lineups_parts.append({"match_id": [match_id] * team_rows, "team_id": [team_id] * team_rows, "opponent_team_id": [opponent_team_id] * team_rows,
+                                  "ha": [side[0]] * team_rows, **team_columns})
+
+    match_stats = match_stats_proc(match_data=match_data)
+    if match_stats:
+        match_stats = {"match_id": [match_id, match_id], "team_id": [home_team, away_team], "opponent_team_id": [away_team, home_team], **match_stats}
+
+    return {column: [value] for column, value in match_info.items()}, merge_columns(lineups_parts), match_stats
+
+# --------------------------------------------------------------------------------------
+# MANIFIESTO DE PARTIDOS - Tamaño y fecha de modificación de cada JSON ya procesado; su resultado se guarda por partido en _parts
+# como JSON ({"match", "lineups", "statistics"}, cada una como {columna: valores}).
+# --------------------------------------------------------------------------------------
+def load_matches_manifest(manifest_path: str) -> dict:
+
+    if not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        return json_to_dict(json_path=manifest_path)
+    except ValueError:
+        return {}
+
+def file_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def load_match_part(part_path: str) -> Tuple[dict, dict, dict]:
+    part = json_to_dict(json_path=part_path)
+    return part["match"], part["lineups"], part["statistics"]
 
 # --------------------------------------------------------------------------------------
 # PROCESADO DE TODOS LOS PARTIDOS - Procesa todos los partidos scrapeados de una temporada.
+# En modo incremental solo se leen los JSON nuevos o modificados. Si solo hay partidos nuevos, sus filas se añaden a las tablas
+# guardadas; las tablas se reconstruyen desde _parts solo si se ha modificado o eliminado algún partido (o si falta alguna tabla
+# o una adición anterior quedó a medias). incremental=False reprocesa todos los partidos (reconstrucción completa).
+# Devuelve las filas escritas en esta ejecución (todas al reconstruir, solo las nuevas al añadir).
+# Con workers > 1 los JSON se reparten en un pool de procesos y cada tabla se construye una sola vez al final.
 # --------------------------------------------------------------------------------------
-def all_matches_proc(league_raw_matches_path: str, league_clean_matches_path: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def all_matches_proc(league_raw_matches_path: str, league_clean_matches_path: str, incremental: bool = True, workers: int = 1) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     
-    list_matches_dfs = []
-    list_lineups_dfs = []
-    list_stats_dfs = []
-
     if not os.path.exists(league_raw_matches_path):
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-    for match_file in os.listdir(league_raw_matches_path):
-        match_data = json_to_dict(json_path=os.path.join(league_raw_matches_path, match_file))
+    parts_path = os.path.join(league_clean_matches_path, "_parts")
+    os.makedirs(parts_path, exist_ok=True)
 
-        match_info_df = match_info_proc(match_data=match_data)
-        if match_info_df.empty:
-            continue
+    # Marca de una adición en curso: si sigue ahí al empezar, las tablas pueden tener filas repetidas y se reconstruyen
+    appending_path = os.path.join(league_clean_matches_path, "_appending")
+    interrupted_append = os.path.exists(appending_path)
 
-        list_matches_dfs.append(match_info_df)
+    manifest_path = os.path.join(league_clean_matches_path, "_manifest.json")
+    manifest = load_matches_manifest(manifest_path=manifest_path) if incremental and not interrupted_append else {}
+    output_paths = [os.path.join(league_clean_matches_path, file) for file in ["matches.csv", "lineups.csv", "statistics.csv"]]
 
-        match_id = match_info_df["match_id"].iloc[0]
-        home_team = match_info_df["home_team"].iloc[0]
-        away_team = match_info_df["away_team"].iloc[0]
+    match_files = [file for file in os.listdir(league_raw_matches_path) if file.endswith(".json")]
+    new_manifest = {match_file: file_signature(os.path.join(league_raw_matches_path, match_file)) for match_file in match_files}
+    part_paths = {match_file: os.path.join(parts_path, match_file) for match_file in match_files}
 
-        match_lineups = match_data.get("lineups", {})
-        home_formation, home_df = single_team_lineups(match_lineups.get("home"))
-        away_formation, away_df = single_team_lineups(match_lineups.get("away"))
+    pending_files = [match_file for match_file in match_files if manifest.get(match_file) != new_manifest[match_file] or not os.path.exists(part_paths[match_file])]
+    pending_paths = [os.path.join(league_raw_matches_path, match_file) for match_file in pending_files]
 
-        if not home_df.empty:
-            home_df.insert(0, "match_id", match_id)
-            home_df.insert(1, "team_id", home_team)
-            home_df.insert(2, "opponent_team_id", away_team)
-            home_df.insert(3, "ha", "h")
+    # Partes de partidos que ya no están en raw (o de otro formato)
+    removed_parts = [part_file for part_file in os.listdir(parts_path) if part_file not in new_manifest]
+    changed_files = [match_file for match_file in pending_files if match_file in manifest]
+    tables_exist = all(os.path.exists(table_path(path)) for path in output_paths)
 
-        if not away_df.empty:
-            away_df.insert(0, "match_id", match_id)
-            away_df.insert(1, "team_id", away_team)
-            away_df.insert(2, "opponent_team_id", home_team)
-            away_df.insert(3, "ha", "a")
+    if not pending_files and not removed_parts and manifest == new_manifest and tables_exist:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    if workers > 1 and len(pending_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending_parts = list(executor.map(match_file_columns, pending_paths, chunksize=max(1, len(pending_paths) // (workers * 4))))
+    else:
+        pending_parts = [match_file_columns(match_path=match_path) for match_path in pending_paths]
+
+    parts = dict(zip(pending_files, pending_parts))
+    for match_file, part in parts.items():
+        atomic_json_dump(data=dict(zip(["match", "lineups", "statistics"], part)), path=part_paths[match_file])
 
-        lineups_parts = [df for df in [home_df, away_df] if not df.empty]
-        if lineups_parts:
-            lineups_df = pd.concat(lineups_parts, ignore_index=True)
-            list_lineups_dfs.append(lineups_df)
+    for part_file in removed_parts:
+        os.remove(os.path.join(parts_path, part_file))
 
-        match_stats_df = match_stats_proc(match_data=match_data)
-        if not match_stats_df.empty:
-            match_stats_df.insert(0, "match_id", match_id)
-            match_stats_df.insert(1, "team_id", [home_team, away_team])
-            match_stats_df.insert(2, "opponent_team_id", [away_team, home_team])
-            list_stats_dfs.append(match_stats_df)
+    # Solo partidos nuevos: se añaden sus filas a las tablas guardadas
+    if manifest and tables_exist and not removed_parts and not changed_files:
+        new_parts = [part for part in pending_parts if part[0]]
+        new_dfs = [columns_to_df([part[i] for part in new_parts]) for i in range(3)]
 
-    all_matches_df = pd.concat(list_matches_dfs, ignore_index=True) if list_matches_dfs else pd.DataFrame()
-    all_lineups_df = pd.concat(list_lineups_dfs, ignore_index=True) if list_lineups_dfs else pd.DataFrame()
-    all_stats_df = pd.concat(list_stats_dfs, ignore_index=True) if list_stats_dfs else pd.DataFrame()
+        with open(appending_path, "w", encoding="utf-8"):
+            pass
+
+        if all(append_table(df=df, path=path) for df, path in zip(new_dfs, output_paths)):
+            atomic_json_dump(data=new_manifest, path=manifest_path)
+            os.remove(appending_path)
+            return tuple(new_dfs)
+
+    list_matches, list_lineups, list_stats = [], [], []
+    for match_file in match_files:
+        match_columns, lineups_columns, stats_columns = parts[match_file] if match_file in parts else load_match_part(part_path=part_paths[match_file])
+        if not match_columns:
+            continue
 
-    all_matches_df.to_csv(os.path.join(league_clean_matches_path, "matches.csv"), index=False, sep=";")
-    all_lineups_df.to_csv(os.path.join(league_clean_matches_path, "lineups.csv"), index=False, sep=";")
-    all_stats_df.to_csv(os.path.join(league_clean_matches_path, "statistics.csv"), index=False, sep=";")
+        list_matches.append(match_columns)
+        list_lineups.append(lineups_columns)
+        list_stats.append(stats_columns)
+
+    all_matches_df = columns_to_df(list_matches)
+    all_lineups_df = columns_to_df(list_lineups)
+    all_stats_df = columns_to_df(list_stats)
+
+    write_table(df=all_matches_df, path=output_paths[0])
+    write_table(df=all_lineups_df, path=output_paths[1])
+    write_table(df=all_stats_df, path=output_paths[2])
+
+    # El manifiesto se escribe el último y de forma atómica: si algo falla antes, la siguiente ejecución repite el trabajo
+    atomic_json_dump(data=new_manifest, path=manifest_path)
+    if os.path.exists(appending_path):
+        os.remove(appending_path)
 
     return all_matches_df, all_lineups_df, all_stats_df
 
 # --------------------------------------------------------------------------------------
 # CLEANING PRINCIPAL DE LIGA - Ejecuta el proceso de limpieza de datos de Sofascore para una liga.
 # --------------------------------------------------------------------------------------
-def main_sofascore_league_cleaning(league_id: int, out_path: str, print_info: bool = True) -> None:
+def main_sofascore_league_cleaning(league_id: int, out_path: str, print_info: bool = True, only_changed: bool = True, seasons: list[str] = None, full_rebuild: bool = False, workers: int = 1) -> None:
     
     start_time = time.time()
 
@@ -312,8 +385,16 @@ def main_sofascore_league_cleaning(league_id: int, out_path: str, print_info: bo
         raise FileNotFoundError(f"No existe la ruta raw de Sofascore: {league_raw_path}")
 
     seasons_to_proc = [season for season in os.listdir(league_raw_path) if os.path.isdir(os.path.join(league_raw_path, season))]
+    if seasons is not None:
+        seasons_to_proc = [season for season in seasons_to_proc if season in seasons]
+    index = raw_index.open_raw_index(raw_path=out_path)
 
     for season in seasons_to_proc:
+        # Solo se limpian las temporadas cuyos archivos crudos han cambiado desde la última limpieza
+        season_start_time = time.time()
+        if only_changed and os.path.exists(os.path.join(league_clean_path, season)) and not index.needs_cleaning(scope_path=os.path.join(league_raw_path, season), watch_paths=[entity_store.store_path(os.path.join(league_raw_path, season))]):
+            continue
+
         league_raw_info_path = os.path.join(league_raw_path, season, "info")
         league_raw_matches_path = os.path.join(league_raw_path, season, "matches")
 
@@ -324,11 +405,12 @@ def main_sofascore_league_cleaning(league_id: int, out_path: str, print_info: bo
         os.makedirs(league_clean_matches_path, exist_ok=True)
 
         standings_tables_proc(standings_path=os.path.join(league_raw_info_path, "standings.json"), standings_output_path=os.path.join(league_clean_info_path, "standings"))
-        players_proc(players_json_path=os.path.join(league_raw_info_path, "player.json"), players_dir_path=os.path.join(league_raw_info_path, "player"), df_output_path=os.path.join(league_clean_info_path, "players.csv"))
-        teams_proc(teams_dir_path=os.path.join(league_raw_info_path, "team"), df_output_path=os.path.join(league_clean_info_path, "teams.csv"))
+        players_proc(players_json_path=os.path.join(league_raw_info_path, "player.json"), season_raw_path=os.path.join(league_raw_path, season), df_output_path=os.path.join(league_clean_info_path, "players.csv"))
+        teams_proc(season_raw_path=os.path.join(league_raw_path, season), df_output_path=os.path.join(league_clean_info_path, "teams.csv"))
         venues_proc(venues_json_path=os.path.join(league_raw_info_path, "venue.json"), df_output_path=os.path.join(league_clean_info_path, "venues.csv"))
-        managers_proc(managers_dir_path=os.path.join(league_raw_info_path, "manager"), df_output_path=os.path.join(league_clean_info_path, "managers.csv"))
-        all_matches_proc(league_raw_matches_path=league_raw_matches_path, league_clean_matches_path=league_clean_matches_path)
+        managers_proc(season_raw_path=os.path.join(league_raw_path, season), df_output_path=os.path.join(league_clean_info_path, "managers.csv"))
+        all_matches_proc(league_raw_matches_path=league_raw_matches_path, league_clean_matches_path=league_clean_matches_path, incremental=not full_rebuild, workers=workers)
+        index.mark_cleaned(scope_path=os.path.join(league_raw_path, season), cleaned=season_start_time)
 
         if print_info:
             print(f"     - Information cleaned for season {season}")
@@ -2,9 +2,12 @@ import os
 import time
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 from use.config import comps
-from use.functions import json_to_dict, create_slug, elapsed_time_str
+from use import raw_index
+from use.functions import json_to_dict, create_slug, elapsed_time_str, columns_to_df
+from use.storage import write_table
 
 # --------------------------------------------------------------------------------------
 # PROCESADO DE PARTIDOS - Procesa el JSON de partidos de Scoresway
@@ -22,7 +25,7 @@ def matches_proc(matches_json_path: str, df_output_path: str) -> pd.DataFrame:
                      "home_score": match.get("scores", {}).get("home_score", np.nan), "away_score": match.get("scores", {}).get("away_score", np.nan), "status": match.get("status", np.nan),
                      "date": match.get("date", np.nan), "venue": match.get("venue", {}).get("name", np.nan), "competition": match.get("competition", {}).get("name", np.nan)} for match in matches_data]
     matches_df = pd.DataFrame(matches_list)
-    matches_df.to_csv(df_output_path, index=False, sep=";")
+    write_table(df=matches_df, path=df_output_path)
 
     return matches_df
 
@@ -34,65 +37,79 @@ def match_stats_proc(match_json_path: str) -> pd.DataFrame:
     if not os.path.exists(match_json_path):
         return pd.DataFrame()
 
-    match_data = json_to_dict(json_path=match_json_path)
+    return pd.DataFrame(match_data_stats_proc(match_data=json_to_dict(json_path=match_json_path)))
+
+# Estadísticas como {columna: [local, visitante]}
+def match_data_stats_proc(match_data: dict) -> dict:
 
     stats = match_data.get("statistics")
     if not stats:
-        return pd.DataFrame()
+        return {}
 
-    stats_df = pd.DataFrame({"ha": ["h", "a"]})
+    stats_columns = {"ha": ["h", "a"]}
 
     for stat in stats:
         stat_name = stat.get("type")
         values = stat.get("values")
 
         if stat_name and values and len(values) == 2:
-            stats_df[stat_name] = values
+            stats_columns[stat_name] = list(values)
 
-    return stats_df
+    return stats_columns
 
 # --------------------------------------------------------------------------------------
-# PROCESADO DE TODOS LOS PARTIDOS - Procesa todos los partidos individuales.
+# PROCESADO DE UN PARTIDO - Devuelve la fila del partido y sus estadísticas como {columna: valores} (None si no hay partido).
 # --------------------------------------------------------------------------------------
-def all_matches_proc(matches_dir_path: str, df_output_path: str, stats_output_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    
-    matches_list = []
-    stats_list = []
+def match_file_columns(match_path: str) -> tuple[dict, dict] | None:
 
-    if not os.path.exists(matches_dir_path):
-        return pd.DataFrame(), pd.DataFrame()
+    match_data = json_to_dict(match_path)
 
-    for match_file in os.listdir(matches_dir_path):
-        match_path = os.path.join(matches_dir_path, match_file)
-        match_data = json_to_dict(match_path)
+    match_info = match_data.get("match")
+    if not match_info:
+        return None
 
-        match_info = match_data.get("match")
-        if not match_info:
-            continue
+    match_id = match_info.get("id")
 
-        match_id = match_info.get("id")
+    match_row = {"match_id": match_id, "home_team": match_info.get("home_team", {}).get("name", np.nan), "away_team": match_info.get("away_team", {}).get("name", np.nan),
+                 "home_score": match_info.get("scores", {}).get("home_score", np.nan), "away_score": match_info.get("scores", {}).get("away_score", np.nan),
+                 "date": match_info.get("date", np.nan), "status": match_info.get("status", np.nan)}
 
-        matches_list.append({"match_id": match_id, "home_team": match_info.get("home_team", {}).get("name", np.nan), "away_team": match_info.get("away_team", {}).get("name", np.nan),
-                             "home_score": match_info.get("scores", {}).get("home_score", np.nan), "away_score": match_info.get("scores", {}).get("away_score", np.nan),
-                             "date": match_info.get("date", np.nan), "status": match_info.get("status", np.nan)})
+    stats_columns = match_data_stats_proc(match_data=match_data)
+    if stats_columns:
+        stats_columns = {"match_id": [match_id, match_id], **stats_columns}
 
-        stats_df = match_stats_proc(match_json_path=match_path)
-        if not stats_df.empty:
-            stats_df.insert(0, "match_id", match_id)
-            stats_list.append(stats_df)
+    return {column: [value] for column, value in match_row.items()}, stats_columns
 
-    matches_df = pd.DataFrame(matches_list)
-    stats_df = pd.concat(stats_list, ignore_index=True) if stats_list else pd.DataFrame()
+# --------------------------------------------------------------------------------------
+# PROCESADO DE TODOS LOS PARTIDOS - Procesa todos los partidos individuales.
+# Con workers > 1 los JSON se reparten en un pool de procesos y cada tabla se construye una sola vez al final.
+# --------------------------------------------------------------------------------------
+def all_matches_proc(matches_dir_path: str, df_output_path: str, stats_output_path: str, workers: int = 1) -> tuple[pd.DataFrame, pd.DataFrame]:
+    
+    if not os.path.exists(matches_dir_path):
+        return pd.DataFrame(), pd.DataFrame()
+
+    match_paths = [os.path.join(matches_dir_path, match_file) for match_file in os.listdir(matches_dir_path)]
 
-    matches_df.to_csv(df_output_path, index=False, sep=";")
-    stats_df.to_csv(stats_output_path, index=False, sep=";")
+    if workers > 1 and len(match_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            match_parts = list(executor.map(match_file_columns, match_paths, chunksize=max(1, len(match_paths) // (workers * 4))))
+    else:
+        match_parts = [match_file_columns(match_path=match_path) for match_path in match_paths]
+
+    match_parts = [part for part in match_parts if part is not None]
+    matches_df = columns_to_df([match_columns for match_columns, _ in match_parts])
+    stats_df = columns_to_df([stats_columns for _, stats_columns in match_parts])
+
+    write_table(df=matches_df, path=df_output_path)
+    write_table(df=stats_df, path=stats_output_path)
 
     return matches_df, stats_df
 
 # --------------------------------------------------------------------------------------
 # CLEANING PRINCIPAL - Ejecuta el proceso de limpieza de Scoresway.
 # --------------------------------------------------------------------------------------
-def main_scoresway_league_cleaning(league_id: int, out_path: str, print_info: bool = True) -> None:
+def main_scoresway_league_cleaning(league_id: int, out_path: str, print_info: bool = True, only_changed: bool = True, seasons: list[str] = None, workers: int = 1) -> None:
     
     start_time = time.time()
 
@@ -114,15 +131,24 @@ def main_scoresway_league_cleaning(league_id: int, out_path: str, print_info: bo
         raise FileNotFoundError(f"No existe la ruta raw: {league_raw_path}")
 
     seasons_to_proc = [season for season in os.listdir(league_raw_path) if os.path.isdir(os.path.join(league_raw_path, season))]
+    if seasons is not None:
+        seasons_to_proc = [season for season in seasons_to_proc if season in seasons]
+    index = raw_index.open_raw_index(raw_path=out_path)
 
     for season in seasons_to_proc:
         season_raw_path = os.path.join(league_raw_path, season)
         season_clean_path = os.path.join(league_clean_path, season)
 
+        # Solo se limpian las temporadas cuyos archivos crudos han cambiado desde la última limpieza
+        season_start_time = time.time()
+        if only_changed and os.path.exists(season_clean_path) and not index.needs_cleaning(scope_path=season_raw_path):
+            continue
+
         os.makedirs(season_clean_path, exist_ok=True)
 
         matches_proc(matches_json_path=os.path.join(season_raw_path, "matches.json"), df_output_path=os.path.join(season_clean_path, "matches.csv"))
-        all_matches_proc(matches_dir_path=os.path.join(season_raw_path, "matches"), df_output_path=os.path.join(season_clean_path, "matches_detailed.csv"), stats_output_path=os.path.join(season_clean_path, "stats.csv"))
+        all_matches_proc(matches_dir_path=os.path.join(season_raw_path, "matches"), df_output_path=os.path.join(season_clean_path, "matches_detailed.csv"), stats_output_path=os.path.join(season_clean_path, "stats.csv"), workers=workers)
+        index.mark_cleaned(scope_path=season_raw_path, cleaned=season_start_time)
 
         if print_info:
             print(f"     - Season processed: {season}")
@@ -1,84 +1,206 @@
 import os
 import time
+import threading
 import pandas as pd
 
-from use.config import comps, comps_path
+from use.config import comps, comps_path, desired_seasons
+from use.functions import create_slug, elapsed_time_str
+from use.rate_limit import limiter_stats
+from use import entity_store
+from use.pipeline import Node, open_pipeline_state, run_dag
+from use.storage import set_storage_format, table_path
 
 # --------------------------------------------------------------------------------------
-# PIPELINE DE UNA LIGA - Ejecuta el pipeline completo de una liga.
+# ETAPA PENDIENTE - El scraping se repite si nunca se ejecutó o si su última ejecución es más antigua que max_age_days.
 # --------------------------------------------------------------------------------------
-def main_league_data(league_id: int, data_path: str, act_time_scr: float, act_time_cln: float, act_time_uni: float = None, max_age_days: int = 7, print_info: bool = True, matches_to_proc: int = None, scrape_images: bool = True, do_scr: bool = True, do_cln: bool = True, do_uni: bool = True, do_fm: bool = True, do_sw: bool = True, do_ss: bool = True) -> tuple[float | None, float | None, float | None]:
-    
+def stage_due(original_time: float | None, max_age_days: int = 7, now: float = None) -> bool:
+
+    if original_time is None or pd.isna(original_time):
+        return True
+
+    now = time.time() if now is None else now
+    return (now - original_time) >= max_age_days * 24 * 60 * 60
+
+# --------------------------------------------------------------------------------------
+# TAREAS DEL PIPELINE - Funciones de módulo para poder enviarlas al pool de procesos.
+# --------------------------------------------------------------------------------------
+SOURCES = {"fm": "fotmob", "sw": "scoresway", "ss": "sofascore"}
+
+def scrape_league_task(source: str, league_id: int, raw_data_path: str, matches_to_proc: int = None, scrape_images: bool = True, print_info: bool = True, ss_session=None) -> None:
+
+    if source == "fm":
+        import scr.fm_scr as fm_scr
+        fm_scr.main_fotmob_league_scraping(league_id=league_id, out_path=raw_data_path, print_info=print_info)
+    elif source == "sw":
+        import scr.sw_scr as sw_scr
+        sw_scr.main_scoresway_league_scraping(league_id=league_id, out_path=raw_data_path, matches_to_proc=matches_to_proc, print_info=print_info)
+    else:
+        import scr.ss_scr as ss_scr
+        ss_scr.main_sofascore_league_scraping(league_id=league_id, out_path=raw_data_path, scrape_images=scrape_images, matches_to_proc=matches_to_proc, print_info=print_info, session=ss_session)
+
+def clean_season_task(source: str, league_id: int, raw_data_path: str, season: str, print_info: bool = True, clean_workers: int = 1) -> None:
+
+    league_slug = create_slug(text=comps.loc[comps["id"] == league_id, "tournament"].iloc[0])
+    if not os.path.exists(os.path.join(raw_data_path, SOURCES[source], league_slug, season)):
+        return
+
+    # La huella decide si el nodo se ejecuta; dentro, el índice raw decide si la temporada necesita limpiarse (y la limpieza es incremental)
+    # clean_workers: procesos con los que Scoresway y Sofascore leen los JSON de partidos de la temporada (Fotmob no lo usa)
+    if source == "fm":
+        import cln.fm_cln as fm_cln
+        fm_cln.main_fotmob_league_cleaning(league_id=league_id, out_path=raw_data_path, print_info=print_info, only_changed=True, seasons=[season])
+    elif source == "sw":
+        import cln.sw_cln as sw_cln
+        sw_cln.main_scoresway_league_cleaning(league_id=league_id, out_path=raw_data_path, print_info=print_info, only_changed=True, seasons=[season], workers=clean_workers)
+    else:
+        import cln.ss_cln as ss_cln
+        ss_cln.main_sofascore_league_cleaning(league_id=league_id, out_path=raw_data_path, print_info=print_info, only_changed=True, seasons=[season], workers=clean_workers)
+
+def unify_league_task(league_id: int, raw_data_path: str, clean_data_path: str, processed_data_path: str, print_info: bool = True, uni_workers: int = 1, use_registry: bool = False) -> None:
+    import uni.unifier as unif
+    unif.league_data_unification(league_id=league_id, raw_data_path=raw_data_path, clean_data_path=clean_data_path, processed_data_path=processed_data_path, print_info=print_info,
+                                 use_registry=use_registry, workers=uni_workers)
+
+# --------------------------------------------------------------------------------------
+# GRAFO DE UNA LIGA - scraping (fuente x liga) -> limpieza (fuente x liga x temporada) -> unificación (liga).
+# Limpieza y unificación se repiten solo si cambia el contenido de sus entradas.
+# Cada nodo de limpieza ya corre en un proceso del pool del grafo (cpu_workers); con clean_workers > 1 abre además su propio pool,
+# así que puede haber hasta cpu_workers x clean_workers procesos a la vez. Conviene que ese producto no pase del número de núcleos.
+# uni_workers: hilos del emparejamiento de nombres (rapidfuzz y equipos en paralelo) dentro del proceso de unificación.
+# use_registry: la unificación empareja con el registro de identidades persistente (ver league_data_unification).
+# --------------------------------------------------------------------------------------
+def league_nodes(league_id: int, data_path: str, scrape: bool = True, print_info: bool = True, matches_to_proc: int = None, scrape_images: bool = True, do_cln: bool = True, do_uni: bool = True, sources: list[str] = None, ss_session=None, clean_workers: int = 1, uni_workers: int = 1, use_registry: bool = False) -> list[Node]:
+
     raw_data_path = os.path.join(data_path, "raw")
     clean_data_path = os.path.join(data_path, "clean")
     processed_data_path = os.path.join(data_path, "proc")
 
-    now = time.time()
-    max_age_seconds = max_age_days * 24 * 60 * 60
+    league_slug = create_slug(text=comps.loc[comps["id"] == league_id, "tournament"].iloc[0])
+    sources = list(SOURCES) if sources is None else sources
+    nodes = []
+    clean_names = []
+
+    for source in sources:
+        source_dir = SOURCES[source]
+        scrape_name = f"scr/{source}/{league_slug}"
+
+        # Cada fuente descarga de un único host: sus nodos de scraping comparten carril para no multiplicar el ritmo de peticiones
+        if scrape:
+            nodes.append(Node(name=scrape_name, func=scrape_league_task, lane=f"scr/{source}",
+                              kwargs={"source": source, "league_id": league_id, "raw_data_path": raw_data_path, "matches_to_proc": matches_to_proc, "scrape_images": scrape_images, "print_info": print_info, "ss_session": ss_session if source == "ss" else None}))
 
-    def should_run(original_time: float | None) -> bool:
-        if original_time is None or pd.isna(original_time):
-            return True
-        return (now - original_time) >= max_age_seconds
+        if not do_cln:
+            continue
 
-    time_scr = None
-    time_cln = None
-    time_uni = None
+        for season in desired_seasons:
+            season_raw_path = os.path.join(raw_data_path, source_dir, league_slug, season)
 
-    # ----------------------------------------------------------------------------------
-    # SCRAPING
-    # ----------------------------------------------------------------------------------
-    if do_scr and should_run(act_time_scr):
-        if do_fm:
-            import scr.fm_scr as fm_scr
-            fm_scr.main_fotmob_league_scraping(league_id=league_id, out_path=raw_data_path, print_info=print_info)
+            # Las entidades de Sofascore viven en el almacén compartido: solo cuentan las de la temporada
+            def inputs(season_raw_path: str = season_raw_path, source: str = source) -> list[str]:
+                if source != "ss":
+                    return [season_raw_path]
+                return [season_raw_path] + [entity_store.entity_path(season_path=season_raw_path, type=entity_type, id=id) for entity_type in ["player", "team", "manager"]
+                                            for id in entity_store.season_entity_ids(season_path=season_raw_path, type=entity_type)]
 
-        if do_sw:
-            import scr.sw_scr as sw_scr
-            sw_scr.main_scoresway_league_scraping(league_id=league_id, out_path=raw_data_path, matches_to_proc=matches_to_proc, print_info=print_info)
+            # Sin datos crudos de la temporada no hay salida que exigir
+            def outputs(season_raw_path: str = season_raw_path, season_clean_path: str = os.path.join(clean_data_path, source_dir, league_slug, season)) -> list[str]:
+                return [season_clean_path] if os.path.exists(season_raw_path) else []
 
-        if do_ss:
-            import scr.ss_scr as ss_scr
-            ss_scr.main_sofascore_league_scraping(league_id=league_id, out_path=raw_data_path, scrape_images=scrape_images, matches_to_proc=matches_to_proc, print_info=print_info)
+            clean_name = f"cln/{source}/{league_slug}/{season}"
+            clean_names.append(clean_name)
+            nodes.append(Node(name=clean_name, func=clean_season_task, deps=[scrape_name] if scrape else [], inputs=inputs, outputs=outputs, cpu=True,
+                              kwargs={"source": source, "league_id": league_id, "raw_data_path": raw_data_path, "season": season, "print_info": print_info, "clean_workers": clean_workers}))
 
-        time_scr = time.time()
+    # La salida se busca en el formato activo: al cambiar de formato la unificación se repite
+    if do_uni:
+        uni_inputs = [os.path.join(clean_data_path, source_dir, league_slug, season) for source_dir in SOURCES.values() for season in desired_seasons]
+        nodes.append(Node(name=f"uni/{league_slug}", func=unify_league_task, deps=clean_names, inputs=uni_inputs, cpu=True,
+                          outputs=lambda: [table_path(os.path.join(processed_data_path, league_slug, "All", "info", "team.csv"))],
+                          kwargs={"league_id": league_id, "raw_data_path": raw_data_path, "clean_data_path": clean_data_path, "processed_data_path": processed_data_path, "print_info": print_info, "uni_workers": uni_workers, "use_registry": use_registry}))
 
-    # ----------------------------------------------------------------------------------
-    # CLEANING
-    # ----------------------------------------------------------------------------------
-    if do_cln and should_run(act_time_cln):
-        if do_fm:
-            import cln.fm_cln as fm_cln
-            fm_cln.main_fotmob_league_cleaning(league_id=league_id, out_path=raw_data_path, print_info=print_info)
+    return nodes
 
-        if do_sw:
-            import cln.sw_cln as sw_cln
-            sw_cln.main_scoresway_league_cleaning(league_id=league_id, out_path=raw_data_path, print_info=print_info)
+# --------------------------------------------------------------------------------------
+# TIEMPOS DE UNA LIGA - Hora de fin de cada etapa si todos sus nodos terminaron bien y alguno llegó a ejecutarse.
+# --------------------------------------------------------------------------------------
+def league_stage_times(nodes: list[Node], results: dict) -> tuple[float | None, float | None, float | None]:
+
+    times = []
+    for stage in ["scr", "cln", "uni"]:
+        stage_results = [results.get(node.name, ("pending", None)) for node in nodes if node.name.startswith(f"{stage}/")]
+        finished = stage_results and all(status in ("ran", "skipped") for status, _ in stage_results)
+        ran_times = [finished_time for status, finished_time in stage_results if status == "ran"]
+        times.append(max(ran_times) if finished and ran_times else None)
 
-        if do_ss:
-            import cln.ss_cln as ss_cln
-            ss_cln.main_sofascore_league_cleaning(league_id=league_id, out_path=raw_data_path, print_info=print_info)
+    return tuple(times)
 
-        time_cln = time.time()
+# --------------------------------------------------------------------------------------
+# PIPELINE DE UNA LIGA - Ejecuta el pipeline completo de una liga.
+# act_time_cln / act_time_uni se mantienen por compatibilidad: limpieza y unificación dependen de la huella de sus entradas.
+# storage_format: formato de las tablas de clean y proc ("csv", "parquet" o "feather"); csv_export añade la copia en CSV.
+# clean_workers: procesos por nodo de limpieza; uni_workers: hilos de la unificación; use_registry: registro de identidades (ver league_nodes).
+# --------------------------------------------------------------------------------------
+def main_league_data(league_id: int, data_path: str, act_time_scr: float, act_time_cln: float = None, act_time_uni: float = None, max_age_days: int = 7, print_info: bool = True, matches_to_proc: int = None, scrape_images: bool = True, do_scr: bool = True, do_cln: bool = True, do_uni: bool = True, do_fm: bool = True, do_sw: bool = True, do_ss: bool = True, ss_session=None, storage_format: str = "csv", csv_export: bool = False, clean_workers: int = 1, uni_workers: int = 1, use_registry: bool = False) -> tuple[float | None, float | None, float | None]:
 
-    # ----------------------------------------------------------------------------------
-    # UNIFICACIÓN
-    # ----------------------------------------------------------------------------------
-    if do_uni and should_run(act_time_uni):
-        import uni.unifier as unif
-        unif.league_data_unification(league_id=league_id, raw_data_path=raw_data_path, clean_data_path=clean_data_path, processed_data_path=processed_data_path, print_info=print_info)
+    set_storage_format(storage_format=storage_format, csv_export=csv_export)
 
-        time_uni = time.time()
+    sources = [source for source, enabled in [("fm", do_fm), ("sw", do_sw), ("ss", do_ss)] if enabled]
+    scrape = do_scr and stage_due(original_time=act_time_scr, max_age_days=max_age_days)
 
-    return time_scr, time_cln, time_uni
+    nodes = league_nodes(league_id=league_id, data_path=data_path, scrape=scrape, print_info=print_info, matches_to_proc=matches_to_proc, scrape_images=scrape_images,
+                         do_cln=do_cln, do_uni=do_uni, sources=sources, ss_session=ss_session, clean_workers=clean_workers, uni_workers=uni_workers, use_registry=use_registry)
+    results = run_dag(nodes=nodes, state=open_pipeline_state(data_path=data_path), io_workers=len(SOURCES), print_info=print_info)
+
+    return league_stage_times(nodes=nodes, results=results)
 
 # --------------------------------------------------------------------------------------
 # FUNCIÓN PRINCIPAL - Ejecuta el pipeline para las ligas definidas en comps.csv.
 # --------------------------------------------------------------------------------------
 def main() -> None:
 
+    import scr.ss_scr as ss_scr
+
     data_path = r"C:\Users\ASUS\Desktop\TFM\data"
 
+    # Un único pool de Chrome para todas las ligas; cada navegador solo se arranca si llega a descargar páginas.
+    with ss_scr.SofascorePool(workers=4, requests_per_second=1.0) as ss_session:
+        main_all_leagues(data_path=data_path, ss_session=ss_session)
+
+# --------------------------------------------------------------------------------------
+# TIEMPOS EN COMPS.CSV - Actualiza las marcas de tiempo de una liga y reescribe el CSV de forma atómica.
+# --------------------------------------------------------------------------------------
+comps_lock = threading.Lock()
+
+def save_league_times(idx: int, time_scr: float = None, time_cln: float = None, time_uni: float = None) -> None:
+
+    with comps_lock:
+        for column, value in [("time_scr", time_scr), ("time_cln", time_cln), ("time_uni", time_uni)]:
+            if value is not None:
+                comps.loc[idx, column] = value
+
+        tmp_path = f"{comps_path}.tmp"
+        comps.to_csv(tmp_path, index=False, sep=";", encoding="latin1")
+        os.replace(tmp_path, comps_path)
+
+def print_limiter_stats() -> None:
+    for host, host_stats in limiter_stats().items():
+        print(f"     - {host}: {host_stats}")
+
+# --------------------------------------------------------------------------------------
+# PIPELINE DE TODAS LAS LIGAS - Ejecuta el pipeline de cada liga de comps.csv.
+# En paralelo, todas las ligas forman un único grafo: el scraping avanza a la vez en las tres fuentes
+# y la limpieza/unificación de cada liga va al pool de procesos en cuanto sus entradas están listas.
+# cpu_workers: procesos del pool del grafo; clean_workers: procesos de cada nodo de limpieza dentro de ese pool;
+# uni_workers: hilos de cada unificación; use_registry: registro de identidades (ver league_nodes).
+# --------------------------------------------------------------------------------------
+def main_all_leagues(data_path: str, ss_session=None, parallel: bool = True, cpu_workers: int = None, max_age_days: int = 7, storage_format: str = "csv", csv_export: bool = False, clean_workers: int = 1, uni_workers: int = 1, use_registry: bool = False) -> None:
+
+    set_storage_format(storage_format=storage_format, csv_export=csv_export)
+
+    if parallel:
+        main_all_leagues_parallel(data_path=data_path, ss_session=ss_session, cpu_workers=cpu_workers, max_age_days=max_age_days, clean_workers=clean_workers, uni_workers=uni_workers, use_registry=use_registry)
+        return
+
     for idx, row in comps.iterrows():
 
         league_name = row["tournament"]
@@ -88,30 +210,49 @@ def main() -> None:
 
         start_time = time.time()
 
-        time_scr, time_cln, time_uni = main_league_data(league_id=row["id"], data_path=data_path, print_info=True, act_time_scr=row["time_scr"], act_time_cln=row["time_cln"], act_time_uni=row["time_uni"], scrape_images=False)
+        time_scr, time_cln, time_uni = main_league_data(league_id=row["id"], data_path=data_path, print_info=True, act_time_scr=row["time_scr"], max_age_days=max_age_days, scrape_images=False, ss_session=ss_session,
+                                                          storage_format=storage_format, csv_export=csv_export, clean_workers=clean_workers, uni_workers=uni_workers, use_registry=use_registry)
+        save_league_times(idx=idx, time_scr=time_scr, time_cln=time_cln, time_uni=time_uni)
 
-        if time_scr is not None:
-            comps.loc[idx, "time_scr"] = time_scr
-        if time_cln is not None:
-            comps.loc[idx, "time_cln"] = time_cln
-        if time_uni is not None:
-            comps.loc[idx, "time_uni"] = time_uni
+        print(f"Finished the full data pipeline ({league_name}) in {elapsed_time_str(start_time=start_time)}")
+        print_limiter_stats()
+        print("================================================================================")
 
-        comps.to_csv(comps_path, index=False, sep=";", encoding="latin1")
+def main_all_leagues_parallel(data_path: str, ss_session=None, cpu_workers: int = None, max_age_days: int = 7, clean_workers: int = 1, uni_workers: int = 1, use_registry: bool = False) -> None:
 
-        elapsed_time = time.time() - start_time
-        if elapsed_time >= 60:
-            minutes = int(elapsed_time // 60)
-            seconds = int(elapsed_time % 60)
-            time_str = f"{minutes} minutes {seconds} seconds"
-        else:
-            time_str = f"{elapsed_time:.2f} seconds"
+    start_time = time.time()
+    now = time.time()
 
-        print(f"Finished the full data pipeline ({league_name}) in {time_str}")
-        print("================================================================================")
+    league_graphs = {}
+    for idx, row in comps.iterrows():
+        scrape = stage_due(original_time=row["time_scr"], max_age_days=max_age_days, now=now)
+        league_graphs[idx] = league_nodes(league_id=row["id"], data_path=data_path, scrape=scrape, print_info=True, scrape_images=False, ss_session=ss_session, clean_workers=clean_workers, uni_workers=uni_workers, use_registry=use_registry)
+
+    print("================================================================================")
+    print(f"Starting the full data pipeline ({len(league_graphs)} leagues)")
+
+    # Cada etapa de una liga se anota en comps.csv en cuanto terminan todos sus nodos
+    node_league = {node.name: idx for idx, league_graph in league_graphs.items() for node in league_graph}
+    saved_stages = set()
+
+    def on_finish(name: str, results: dict) -> None:
+        idx = node_league[name]
+        stage = name.split("/")[0]
+        stage_times = dict(zip(["scr", "cln", "uni"], league_stage_times(nodes=league_graphs[idx], results=results)))
+        if stage_times[stage] is not None and (idx, stage) not in saved_stages:
+            saved_stages.add((idx, stage))
+            save_league_times(idx=idx, **{f"time_{stage}": stage_times[stage]})
+
+    nodes = [node for league_graph in league_graphs.values() for node in league_graph]
+    results = run_dag(nodes=nodes, state=open_pipeline_state(data_path=data_path), io_workers=len(SOURCES), cpu_workers=cpu_workers, on_finish=on_finish)
+
+    statuses = pd.Series([status for status, _ in results.values()]).value_counts().to_dict()
+    print(f"Finished the full data pipeline in {elapsed_time_str(start_time=start_time)} ({statuses})")
+    print_limiter_stats()
+    print("================================================================================")
 
 # --------------------------------------------------------------------------------------
 # EJECUCIÓN
 # --------------------------------------------------------------------------------------
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
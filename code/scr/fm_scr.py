@@ -3,7 +3,8 @@ import json as jsonlib
 import time
 
 from use.config import comps, desired_seasons, act_season
-from use.functions import safe_json_dump, url_to_json, need_to_upload, create_slug, elapsed_time_str
+from use import raw_index
+from use.functions import json_to_dict, safe_json_dump, url_to_json, need_to_upload, create_slug, elapsed_time_str
 
 # --------------------------------------------------------------------------------------
 # TEMPORADAS DISPONIBLES DE UNA LIGA - Obtiene las temporadas disponibles de una liga en Fotmob y las guarda en disco.
@@ -12,12 +13,15 @@ def league_available_seasons(league_code: int, out_path: str) -> dict:
     
     json_path = os.path.join(out_path, "available_seasons.json")
 
-    if os.path.exists(json_path) and not need_to_upload(json_path, total_days=200):
+    if os.path.exists(json_path) and not need_to_upload(json_path):
         with open(json_path, "r", encoding="utf-8") as f:
             return jsonlib.load(f)
 
     fotmob_url = f"https://www.fotmob.com/api/leagues?id={league_code}"
-    available_seasons_json = url_to_json(url=fotmob_url)
+    available_seasons_json = url_to_json(url=fotmob_url, cache_path=json_path)
+    if available_seasons_json is None:
+        return json_to_dict(json_path=json_path)
+
     available_seasons = available_seasons_json.get("allAvailableSeasons", [])
 
     seasons_dict = {}
@@ -59,7 +63,9 @@ def season_data(seasons_dict: dict, season_key: str, out_path: str) -> dict:
                 return jsonlib.load(f)
 
     season_link = seasons_dict[season_key]
-    season_json = url_to_json(season_link)
+    season_json = url_to_json(url=season_link, cache_path=json_path)
+    if season_json is None:
+        return json_to_dict(json_path=json_path)
 
     if season_json.get("fixtures"):
         safe_json_dump(data=season_json, path=json_path)
@@ -86,6 +92,7 @@ def main_fotmob_league_scraping(league_id: int, out_path: str, print_info: bool
 
     out_league_path = os.path.join(out_path, "fotmob", league_slug)
     os.makedirs(out_league_path, exist_ok=True)
+    raw_index.open_raw_index(raw_path=out_path)
 
     available_seasons = league_available_seasons(league_code=fm_code, out_path=out_league_path)
     seasons_dict = {
@@ -1,18 +1,26 @@
 import os
 import json as jsonlib
-import subprocess
 import time
+import queue
+from io import BytesIO
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from use.config import comps, desired_seasons, act_season
 from use.functions import safe_json_dump, create_slug, need_to_upload, elapsed_time_str
+from use.rate_limit import RETRY_STATUS, call_limited, host_limiter, http_failure
+from use import raw_index, entity_store, work_queue
 
 # --------------------------------------------------------------------------------------
 # CONFIGURACIÓN GLOBAL DE CHROME / SELENIUM
@@ -31,53 +39,207 @@ def suppress_stderr():
 
 os.environ["CHROME_LOG_FILE"] = os.devnull
 
-options = Options()
-options.add_argument("--headless=new")
-options.add_argument("--disable-gpu")
-options.add_argument("--disable-software-rasterizer")
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--no-sandbox")
-options.add_argument("--log-level=3")
-options.add_argument("--silent")
-options.add_argument("--disable-logging")
-options.add_argument("--disable-webgl")
-options.add_argument("--disable-features=Vulkan")
-options.add_argument("--use-angle=swiftshader")
-options.add_argument("--use-gl=swiftshader")
-options.add_experimental_option("excludeSwitches", ["enable-logging"])
+def chrome_options() -> Options:
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-software-rasterizer")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--log-level=3")
+    options.add_argument("--silent")
+    options.add_argument("--disable-logging")
+    options.add_argument("--disable-webgl")
+    options.add_argument("--disable-features=Vulkan")
+    options.add_argument("--use-angle=swiftshader")
+    options.add_argument("--use-gl=swiftshader")
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+
+    return options
 
-service = Service(log_path=os.devnull)
+# --------------------------------------------------------------------------------------
+# SESIÓN DE SELENIUM - Arranca Chrome solo cuando se necesita la primera página y permite reutilizarlo entre ligas.
+# --------------------------------------------------------------------------------------
+class SofascoreSession:
+
+    workers = 1
+
+    def __init__(self, batch_fetch: bool = False, origin_url: str = "https://www.sofascore.com/"):
+        self.driver = None
+        self.batch_fetch = batch_fetch
+        self.origin_url = origin_url
+
+    def get_driver(self) -> webdriver.Chrome:
+
+        if self.driver is None:
+            with suppress_stderr():
+                self.driver = webdriver.Chrome(service=Service(log_path=os.devnull), options=chrome_options())
+
+        return self.driver
+
+    def fetch(self, url: str, timeout: int = 10) -> dict:
+        return call_limited(url=SOFASCORE_API, func=lambda: driver_json(driver=self.get_driver(), url=url, timeout=timeout),
+                            check=sofascore_failure, retry_exceptions=(TimeoutException,))
+
+    def fetch_batch(self, urls: list[str], timeout: int = 30) -> list[dict]:
+
+        # El navegador se queda en una página de sofascore.com y las URLs se piden con fetch() desde ella
+        driver = self.get_driver()
+        if not driver.current_url.startswith(self.origin_url):
+            driver.get(self.origin_url)
+
+        return call_limited(url=SOFASCORE_API, func=lambda: driver_json_batch(driver=driver, urls=urls, timeout=timeout),
+                            check=sofascore_batch_failure, retry_exceptions=(TimeoutException,), tokens=len(urls))
+
+    def close(self) -> None:
+
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+
+    def map(self, func, items) -> list:
+        return [func(item) for item in items]
+
+    def __enter__(self) -> "SofascoreSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+default_session = SofascoreSession()
+
+# --------------------------------------------------------------------------------------
+# POOL DE NAVEGADORES - Reparte las páginas entre varios Chrome con un límite de peticiones global.
+# --------------------------------------------------------------------------------------
+class SofascorePool:
+
+    def __init__(self, workers: int = 4, requests_per_second: float = 1.0, batch_fetch: bool = False):
+
+        if workers < 1:
+            raise ValueError("El parámetro 'workers' debe ser mayor o igual que 1.")
+
+        self.workers = workers
+        self.batch_fetch = batch_fetch
+        self.sessions = [SofascoreSession(batch_fetch=batch_fetch) for _ in range(workers)]
+        self.free_sessions = queue.Queue()
+        for session in self.sessions:
+            self.free_sessions.put(session)
+
+        host_limiter(url=SOFASCORE_API, max_rate=requests_per_second)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sofascore")
+
+    def fetch(self, url: str, timeout: int = 10) -> dict:
+
+        session = self.free_sessions.get()
+        try:
+            return session.fetch(url=url, timeout=timeout)
+        finally:
+            self.free_sessions.put(session)
 
-with suppress_stderr():
-    driver = webdriver.Chrome(service=service, options=options)
-driver.get("https://www.google.com")
+    def fetch_batch(self, urls: list[str], timeout: int = 30) -> list[dict]:
+
+        session = self.free_sessions.get()
+        try:
+            return session.fetch_batch(urls=urls, timeout=timeout)
+        finally:
+            self.free_sessions.put(session)
+
+    def map(self, func, items) -> list:
+        return list(self.executor.map(func, items))
+
+    def close(self) -> None:
+
+        self.executor.shutdown(wait=True)
+        for session in self.sessions:
+            session.close()
+
+    def __enter__(self) -> "SofascorePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 # --------------------------------------------------------------------------------------
 # SCRAPER BASE DE PÁGINAS JSON DE SOFASCORE - Accede a una URL con Selenium y devuelve el contenido JSON renderizado.
 # --------------------------------------------------------------------------------------
-def page_scraper(url: str, sleep_time: int = 3, timeout: int = 10) -> dict:
-   
+def driver_json(driver: webdriver.Chrome, url: str, timeout: int = 10) -> dict:
+
     driver.get(url)
     pre = WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.TAG_NAME, "pre")))
 
-    data_json = jsonlib.loads(pre.text)
-    time.sleep(sleep_time)
+    return jsonlib.loads(pre.text)
+
+def page_scraper(url: str, timeout: int = 10, session: SofascoreSession | SofascorePool = None) -> dict:
+    return (session or default_session).fetch(url=url, timeout=timeout)
+
+# --------------------------------------------------------------------------------------
+# ERRORES DE SOFASCORE - La API devuelve {"error": {"code": 429}} en el cuerpo; 403/429/5xx se tratan como fallos reintentables.
+# --------------------------------------------------------------------------------------
+SOFASCORE_API = "https://api.sofascore.com"
+
+def sofascore_failure(data_json: dict) -> tuple[int, None] | None:
+
+    error = data_json.get("error") if isinstance(data_json, dict) else None
+    code = error.get("code") if isinstance(error, dict) else None
+
+    return (code, None) if code in RETRY_STATUS else None
+
+def sofascore_batch_failure(batch_json: list[dict]) -> tuple[int, None] | None:
+    return next((failure for failure in map(sofascore_failure, batch_json) if failure is not None), None)
+
+def chunk_list(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+# --------------------------------------------------------------------------------------
+# SCRAPER POR LOTES - Pide varias URLs de la API a la vez desde la página abierta, sin navegar a cada una.
+# --------------------------------------------------------------------------------------
+FETCH_BATCH_SCRIPT = """
+const urls = arguments[0];
+const done = arguments[arguments.length - 1];
+Promise.all(urls.map(url => fetch(url).then(response => response.text()).catch(() => null))).then(done);
+"""
+
+def driver_json_batch(driver: webdriver.Chrome, urls: list[str], timeout: int = 30) -> list[dict]:
+
+    driver.set_script_timeout(timeout)
+    texts = driver.execute_async_script(FETCH_BATCH_SCRIPT, urls)
+
+    batch_json = []
+    for text in texts:
+        try:
+            batch_json.append(jsonlib.loads(text) if text else {})
+        except ValueError:
+            batch_json.append({})
+
+    return batch_json
+
+def page_scraper_batch(urls: list[str], timeout: int = 30, session: SofascoreSession | SofascorePool = None) -> list[dict]:
+
+    session = session or default_session
+    if not urls:
+        return []
+
+    if not session.batch_fetch:
+        return [page_scraper(url=url, session=session) for url in urls]
 
-    return data_json
+    return session.fetch_batch(urls=urls, timeout=timeout)
 
 # --------------------------------------------------------------------------------------
 # TEMPORADAS DISPONIBLES - Obtiene las temporadas disponibles de una liga en Sofascore.
 # --------------------------------------------------------------------------------------
-def league_available_seasons(league_code: int, out_path: str) -> dict:
+def league_available_seasons(league_code: int, out_path: str, session: SofascoreSession | SofascorePool = None) -> dict:
     
     json_path = os.path.join(out_path, "available_seasons.json")
 
-    if os.path.exists(json_path) and not need_to_upload(json_path, total_days=200):
+    if os.path.exists(json_path) and not need_to_upload(json_path):
         with open(json_path, "r", encoding="utf-8") as f:
             return jsonlib.load(f)
 
     url = f"https://api.sofascore.com/api/v1/unique-tournament/{league_code}/seasons/"
-    available_seasons_json = page_scraper(url=url)
+    available_seasons_json = page_scraper(url=url, session=session)
 
     if available_seasons_json.get("seasons"):
         safe_json_dump(data=available_seasons_json, path=json_path)
@@ -88,7 +250,7 @@ def league_available_seasons(league_code: int, out_path: str) -> dict:
 # --------------------------------------------------------------------------------------
 # DATOS DE TEMPORADA: PARTIDOS - Obtiene los partidos de una temporada de Sofascore, almacenados por bloques.
 # --------------------------------------------------------------------------------------
-def season_data_scraper(seasons_dict: dict, season_key: str, league_code: int, out_path: str) -> dict:
+def season_data_scraper(seasons_dict: dict, season_key: str, league_code: int, out_path: str, session: SofascoreSession | SofascorePool = None, incremental: bool = True) -> dict:
     
     if season_key not in seasons_dict:
         return {}
@@ -97,37 +259,129 @@ def season_data_scraper(seasons_dict: dict, season_key: str, league_code: int, o
     out_matches_path = os.path.join(out_path, "info", "matches")
     os.makedirs(out_matches_path, exist_ok=True)
 
+    session = session or default_session
     is_current_season = season_key == act_season
+    state_path = os.path.join(out_path, "info", "matches_state.json")
+
+    def block_url(idx: int) -> str:
+        return f"https://api.sofascore.com/api/v1/unique-tournament/{league_code}/season/{season_id}/events/last/{idx}"
+
+    if is_current_season and incremental and os.path.exists(state_path):
+        return season_data_incremental(block_url=block_url, out_matches_path=out_matches_path, state_path=state_path, session=session)
+
     blocks_dict = {}
     block_idx = 0
 
-    while True:
-        json_path = os.path.join(out_matches_path, f"{block_idx}.json")
+    def load_block(idx: int) -> tuple[dict, bool]:
+        json_path = os.path.join(out_matches_path, f"{idx}.json")
 
         if os.path.exists(json_path):
             if not is_current_season or not need_to_upload(json_path):
                 with open(json_path, "r", encoding="utf-8") as f:
-                    season_json = jsonlib.load(f)
-                blocks_dict[block_idx] = season_json
-                block_idx += 1
-                continue
+                    return jsonlib.load(f), False
 
-        matches_url = (f"https://api.sofascore.com/api/v1/unique-tournament/{league_code}/season/{season_id}/events/last/{block_idx}")
-        matches_json = page_scraper(url=matches_url)
+        return page_scraper(url=block_url(idx), session=session), True
 
-        if not matches_json.get("events", []):
-            break
+    # Con un pool se piden tantos bloques a la vez como navegadores; el último lote puede pasarse del final
+    end_reached = False
+    while not end_reached:
+        wave = list(range(block_idx, block_idx + session.workers))
+        for idx, (matches_json, scraped) in zip(wave, session.map(load_block, wave)):
+            if not matches_json.get("events", []):
+                end_reached = True
+                break
 
-        safe_json_dump(data=matches_json, path=json_path)
-        blocks_dict[block_idx] = matches_json
-        block_idx += 1
+            if scraped:
+                safe_json_dump(data=matches_json, path=os.path.join(out_matches_path, f"{idx}.json"))
+            blocks_dict[idx] = matches_json
+
+        block_idx = wave[-1] + 1
+
+    if is_current_season and blocks_dict:
+        save_blocks_state(state_path=state_path, blocks_dict=blocks_dict)
+
+    return blocks_dict
+
+# --------------------------------------------------------------------------------------
+# ESTADO DE LOS BLOQUES DE PARTIDOS - Guarda el último bloque y el evento más reciente conocidos de la temporada actual.
+# --------------------------------------------------------------------------------------
+def save_blocks_state(state_path: str, blocks_dict: dict) -> None:
+
+    events = [event for block in blocks_dict.values() for event in block.get("events", [])]
+    newest_event = max(events, key=lambda event: event.get("startTimestamp", 0), default={})
+
+    state = {"last_block": max(blocks_dict), "newest_event_id": newest_event.get("id"), "updated": time.time()}
+    safe_json_dump(data=state, path=state_path)
+
+# --------------------------------------------------------------------------------------
+# ACTUALIZACIÓN INCREMENTAL DE PARTIDOS - Pide bloques desde el más reciente hasta llegar a partidos ya terminados conocidos.
+# --------------------------------------------------------------------------------------
+def season_data_incremental(block_url, out_matches_path: str, state_path: str, session: SofascoreSession | SofascorePool, total_days: int = raw_index.TTL_DAYS["current"]) -> dict:
+
+    with open(state_path, "r", encoding="utf-8") as f:
+        state = jsonlib.load(f)
+
+    last_block = state["last_block"]
+    blocks_dict = {}
+    for idx in range(last_block + 1):
+        json_path = os.path.join(out_matches_path, f"{idx}.json")
+        if os.path.exists(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                blocks_dict[idx] = jsonlib.load(f)
+
+    if time.time() - state.get("updated", 0) <= total_days * 86400:
+        return blocks_dict
+
+    # Estado más reciente guardado de cada evento: los bloques posteriores corrigen a los anteriores
+    known_status = {event["id"]: event.get("status", {}).get("type") for idx in sorted(blocks_dict) for event in blocks_dict[idx].get("events", [])}
+
+    # Con un pool, el siguiente bloque se pide mientras se procesa el actual, pero solo si el actual no tiene ya
+    # partidos terminados conocidos (en ese caso no hará falta y la petición se malgastaría)
+    prefetch = isinstance(session, SofascorePool)
+    pending = session.executor.submit(page_scraper, url=block_url(0), session=session) if prefetch else None
+
+    new_events = {}
+    head_idx = 0
+    try:
+        while True:
+            if prefetch:
+                head_json, pending = pending.result(), None
+            else:
+                head_json = page_scraper(url=block_url(head_idx), session=session)
+
+            events = head_json.get("events", [])
+            last_head = not events or any(known_status.get(event["id"]) == "finished" for event in events)
+            if prefetch and not last_head:
+                pending = session.executor.submit(page_scraper, url=block_url(head_idx + 1), session=session)
+
+            for event in events:
+                if known_status.get(event["id"]) != event.get("status", {}).get("type"):
+                    new_events[event["id"]] = event
+
+            if last_head:
+                break
+            head_idx += 1
+    finally:
+        # Si algo falla con un bloque ya pedido, se espera a que termine y se descarta en lugar de dejarlo huérfano
+        if pending is not None:
+            pending.exception()
+
+    # Los partidos nuevos o con estado cambiado se guardan como un bloque adicional
+    if new_events:
+        last_block += 1
+        delta_block = {"events": list(new_events.values())}
+        safe_json_dump(data=delta_block, path=os.path.join(out_matches_path, f"{last_block}.json"))
+        blocks_dict[last_block] = delta_block
+
+    if blocks_dict:
+        save_blocks_state(state_path=state_path, blocks_dict=blocks_dict)
 
     return blocks_dict
 
 # --------------------------------------------------------------------------------------
 # TABLAS DE CLASIFICACIÓN - Obtiene las clasificaciones total/home/away de una temporada.
 # --------------------------------------------------------------------------------------
-def season_standings(seasons_dict: dict, season_key: str, league_code: int, out_path: str) -> dict:
+def season_standings(seasons_dict: dict, season_key: str, league_code: int, out_path: str, session: SofascoreSession | SofascorePool = None) -> dict:
     
     if season_key not in seasons_dict:
         return {}
@@ -150,7 +404,7 @@ def season_standings(seasons_dict: dict, season_key: str, league_code: int, out_
 
     standings = {}
     for key, url_to_scrape in urls.items():
-        standings_json = page_scraper(url=url_to_scrape)
+        standings_json = page_scraper(url=url_to_scrape, session=session)
         standings[key] = standings_json if standings_json.get("standings") else {}
 
     safe_json_dump(data=standings, path=standings_path)
@@ -159,7 +413,7 @@ def season_standings(seasons_dict: dict, season_key: str, league_code: int, out_
 # --------------------------------------------------------------------------------------
 # INFORMACIÓN DE JUGADORES, EQUIPOS Y ESTADIOS - Obtiene información general de jugadores, equipos y estadios de una temporada.
 # --------------------------------------------------------------------------------------
-def season_information(seasons_dict: dict, season_key: str, league_code: int, out_path: str) -> dict:
+def season_information(seasons_dict: dict, season_key: str, league_code: int, out_path: str, session: SofascoreSession | SofascorePool = None) -> dict:
     
     if season_key not in seasons_dict:
         return {}
@@ -184,62 +438,115 @@ def season_information(seasons_dict: dict, season_key: str, league_code: int, ou
                     info_dict[info_key] = jsonlib.load(f)
                 continue
 
-        info_scraped = page_scraper(url=url)
+        info_scraped = page_scraper(url=url, session=session)
         safe_json_dump(data=info_scraped, path=info_path)
         info_dict[info_key] = info_scraped
 
     return info_dict
 
 # --------------------------------------------------------------------------------------
-# DESCARGA DE IMÁGENES MEDIANTE SCRIPT EN R - Descarga la imagen de una entidad de Sofascore usando un script de R.
+# DESCARGA DE IMÁGENES - Descarga en paralelo las imágenes de entidades de Sofascore y las valida antes de guardarlas.
 # --------------------------------------------------------------------------------------
-def image_downloader(type: str, id: int, out_path: str, sleep_time: int = 3, rscript_path: str = r"C:\Program Files\R\R-4.4.1\bin\x64\Rscript.exe", r_script: str = "ss_pict.R",) -> None:
+IMAGE_HEADERS = {"User-Agent": "Mozilla/5.0", "Referer": "https://www.sofascore.com/"}
 
-    out_images_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(out_path))),
-        "images"
-    )
-    os.makedirs(out_images_path, exist_ok=True)
+def image_paths(type: str, id: int, out_path: str) -> tuple[str, str]:
 
-    out_type_path = os.path.join(out_images_path, type)
+    out_type_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(out_path))), "images", type)
     os.makedirs(out_type_path, exist_ok=True)
 
     image_url = f"https://img.sofascore.com/api/v1/{type}/{id}/image"
     out_file = os.path.join(out_type_path, f"{id}.png")
 
-    must_download = (not os.path.exists(out_file) or need_to_upload(path=out_file, total_days=90))
+    return image_url, out_file
+
+def download_image(http: requests.Session, image_url: str, out_file: str, timeout: int = 30) -> bool:
+
+    try:
+        response = call_limited(url=image_url, func=lambda: http.get(image_url, timeout=timeout), check=lambda r: http_failure(status=r.status_code, headers=r.headers),
+                                retry_exceptions=(requests.ConnectionError, requests.Timeout))
+        response.raise_for_status()
+        with Image.open(BytesIO(response.content)) as image:
+            image.verify()
+    except (requests.RequestException, OSError, SyntaxError):
+        return False
+
+    # Escritura atómica: nunca queda una imagen a medio escribir
+    tmp_file = f"{out_file}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp_file, out_file)
+    raw_index.record_file(path=out_file, content=response.content)
+
+    return True
+
+def images_downloader(type: str, ids: list[int], out_path: str, workers: int = 8, requests_per_second: float = 4.0) -> int:
+
+    image_files = dict(image_paths(type=type, id=id, out_path=out_path) for id in ids)
+    stale_files = set(raw_index.stale_paths(paths=list(image_files.values())))
+    pending = [(image_url, out_file) for image_url, out_file in image_files.items() if out_file in stale_files]
+
+    if not pending:
+        return 0
+
+    host_limiter(url="https://img.sofascore.com", max_rate=requests_per_second)
+
+    with requests.Session() as http:
+        http.headers.update(IMAGE_HEADERS)
+        http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+
+        def fetch(item: tuple[str, str]) -> bool:
+            return download_image(http=http, image_url=item[0], out_file=item[1])
 
-    if must_download:
-        cmd = [rscript_path, r_script, image_url, out_file]
-        subprocess.run(cmd, text=True, capture_output=True)
-        time.sleep(sleep_time)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sofascore-img") as executor:
+            return sum(executor.map(fetch, pending))
+
+def image_downloader(type: str, id: int, out_path: str) -> None:
+    images_downloader(type=type, ids=[id], out_path=out_path, workers=1)
 
 # --------------------------------------------------------------------------------------
 # INFORMACIÓN INDIVIDUAL DE ENTIDADES - Obtiene información individual de player, team, manager o venue.
 # --------------------------------------------------------------------------------------
-def obtain_information(type: str, id: int, out_season_path: str) -> dict:
-
-    info_url = f"https://api.sofascore.com/api/v1/{type}/{id}"
-    out_dir = os.path.join(out_season_path, "info", type)
-    os.makedirs(out_dir, exist_ok=True)
+def obtain_information(type: str, id: int, out_season_path: str, session: SofascoreSession | SofascorePool = None) -> dict:
+    return obtain_information_batch(type=type, ids=[id], out_season_path=out_season_path, session=session)[id]
 
-    out_json = os.path.join(out_dir, f"{id}.json")
+def obtain_information_batch(type: str, ids: list[int], out_season_path: str, session: SofascoreSession | SofascorePool = None) -> dict:
 
-    if os.path.exists(out_json) and not need_to_upload(path=out_json, total_days=30):
-        with open(out_json, "r", encoding="utf-8") as f:
-            return jsonlib.load(f)
+    # Las entidades se guardan en el almacén compartido entre ligas y temporadas
+    out_jsons = {id: entity_store.entity_path(season_path=out_season_path, type=type, id=id) for id in ids}
+    stale_jsons = set(raw_index.stale_paths(paths=list(out_jsons.values())))
 
-    info_json = page_scraper(url=info_url)
+    # Un JSON reciente de la carpeta de la temporada (descargas anteriores al almacén) se copia sin pedirlo otra vez
+    legacy_jsons = {id: entity_store.legacy_entity_path(season_path=out_season_path, type=type, id=id) for id, out_json in out_jsons.items() if out_json in stale_jsons}
+    legacy_jsons = {id: path for id, path in legacy_jsons.items() if os.path.exists(path)}
+    stale_legacy = set(raw_index.stale_paths(paths=list(legacy_jsons.values())))
 
-    if info_json.get(type):
-        safe_json_dump(data=info_json, path=out_json)
+    info_dict = {}
+    pending_ids = []
+
+    for id, out_json in out_jsons.items():
+        if out_json not in stale_jsons:
+            with open(out_json, "r", encoding="utf-8") as f:
+                info_dict[id] = jsonlib.load(f)
+        elif id in legacy_jsons and legacy_jsons[id] not in stale_legacy:
+            with open(legacy_jsons[id], "r", encoding="utf-8") as f:
+                info_dict[id] = jsonlib.load(f)
+            safe_json_dump(data=info_dict[id], path=out_json)
+        else:
+            pending_ids.append(id)
+
+    info_urls = [f"https://api.sofascore.com/api/v1/{type}/{id}" for id in pending_ids]
+
+    for id, info_json in zip(pending_ids, page_scraper_batch(urls=info_urls, session=session)):
+        if info_json.get(type):
+            safe_json_dump(data=info_json, path=out_jsons[id])
+        info_dict[id] = info_json
 
-    return info_json
+    return info_dict
 
 # --------------------------------------------------------------------------------------
 # SCRAPING DE UN PARTIDO - Obtiene la información completa de un partido.
 # --------------------------------------------------------------------------------------
-def match_scraping(matches_dict: dict, match_id: int, out_path: str) -> dict:
+def match_scraping(matches_dict: dict, match_id: int, out_path: str, session: SofascoreSession | SofascorePool = None) -> dict:
     
     if match_id not in matches_dict:
         return {}
@@ -257,9 +564,7 @@ def match_scraping(matches_dict: dict, match_id: int, out_path: str) -> dict:
     match_lineups_url = f"https://api.sofascore.com/api/v1/event/{match_id}/lineups"
     match_stats_url = f"https://api.sofascore.com/api/v1/event/{match_id}/statistics"
 
-    match_info_json = page_scraper(url=match_info_url)
-    match_lineups_json = page_scraper(url=match_lineups_url)
-    match_stats_json = page_scraper(url=match_stats_url)
+    match_info_json, match_lineups_json, match_stats_json = page_scraper_batch(urls=[match_info_url, match_lineups_url, match_stats_url], session=session)
 
     if (match_info_json.get("event") and match_lineups_json.get("confirmed") and match_stats_json.get("statistics")):
         full_match_info = {"match": match_info_json, "lineups": match_lineups_json, "statistics": match_stats_json}
@@ -271,7 +576,7 @@ def match_scraping(matches_dict: dict, match_id: int, out_path: str) -> dict:
 # --------------------------------------------------------------------------------------
 # SCRAPING PRINCIPAL DE LIGA EN SOFASCORE - Ejecuta el scraping completo de una liga en Sofascore.
 # --------------------------------------------------------------------------------------
-def main_sofascore_league_scraping(league_id: int, out_path: str, scrape_images: bool = True, matches_to_proc: int = None, print_info: bool = True) -> None:
+def main_sofascore_league_scraping(league_id: int, out_path: str, scrape_images: bool = True, matches_to_proc: int = None, print_info: bool = True, session: SofascoreSession | SofascorePool = None, workers: int = 1, requests_per_second: float = 1.0, batch_fetch: bool = False, batch_size: int = 20) -> None:
     
     start_time = time.time()
 
@@ -288,69 +593,110 @@ def main_sofascore_league_scraping(league_id: int, out_path: str, scrape_images:
 
     out_league_path = os.path.join(out_path, "sofascore", league_slug)
     os.makedirs(out_league_path, exist_ok=True)
+    raw_index.open_raw_index(raw_path=out_path)
+    queue_db = work_queue.open_work_queue(raw_path=out_path)
+
+    own_session = session is None
+    if own_session:
+        session = SofascorePool(workers=workers, requests_per_second=requests_per_second, batch_fetch=batch_fetch) if workers > 1 else SofascoreSession(batch_fetch=batch_fetch)
 
-    available_seasons = league_available_seasons(league_code=ss_code, out_path=out_league_path)
-    seasons_dict = {season_data["year"].replace("/", ""): season_data["id"] for season_data in available_seasons.get("seasons", []) if season_data.get("year", "").replace("/", "") in desired_seasons}
-
-    for season_key in seasons_dict:
-        if print_info:
-            print(f"     - Scraping information for season {season_key}")
-
-        out_season_path = os.path.join(out_league_path, season_key)
-        os.makedirs(out_season_path, exist_ok=True)
-
-        season_data_dict = season_data_scraper(seasons_dict=seasons_dict, season_key=season_key, league_code=ss_code, out_path=out_season_path)
-        print("season data")
-        season_standings(seasons_dict=seasons_dict, season_key=season_key, league_code=ss_code, out_path=out_season_path)
-        print("season standings")
-        season_info = season_information(seasons_dict=seasons_dict, season_key=season_key, league_code=ss_code, out_path=out_season_path)
-        print("season information")
-
-        dict_matches = {match["id"]: match["slug"] for events in season_data_dict.values() for match in events.get("events", []) if match.get("status", {}).get("description") == "Ended"}
-        dict_players = {player["playerId"]: player["playerName"].lower().replace(" ", "-") for player in season_info.get("player", {}).get("players", [])}
-        dict_teams = {team["id"]: team["slug"] for team in season_info.get("team", {}).get("teams", [])}
-        dict_venues = {venue["id"]: venue["slug"] for venue in season_info.get("venue", {}).get("venues", [])}
-
-        player_ids = list(dict_players.keys())
-        team_ids = list(dict_teams.keys())
-        venue_ids = list(dict_venues.keys())
-        match_ids = list(dict_matches.keys())
-
-        if matches_to_proc is not None:
-            player_ids = player_ids[:matches_to_proc]
-            team_ids = team_ids[:matches_to_proc]
-            venue_ids = venue_ids[:matches_to_proc]
-            match_ids = match_ids[:matches_to_proc]
-
-        for player_id in player_ids:
-            obtain_information(type="player", id=player_id, out_season_path=out_season_path)
-            if scrape_images:
-                image_downloader(type="player", id=player_id, out_path=out_season_path)
-
-        for team_id in team_ids:
-            obtain_information(type="team", id=team_id, out_season_path=out_season_path)
-            if scrape_images:
-                image_downloader(type="team", id=team_id, out_path=out_season_path)
-
-        for venue_id in venue_ids:
-            if scrape_images:
-                image_downloader(type="venue", id=venue_id, out_path=out_season_path)
-
-        total_matches = len(match_ids)
-        for idx, match_id in enumerate(match_ids, start=1):
+    try:
+        available_seasons = league_available_seasons(league_code=ss_code, out_path=out_league_path, session=session)
+        seasons_dict = {season_data["year"].replace("/", ""): season_data["id"] for season_data in available_seasons.get("seasons", []) if season_data.get("year", "").replace("/", "") in desired_seasons}
+
+        for season_key in seasons_dict:
             if print_info:
-                print(f"          - Scraping information for match {match_id} ({idx}/{total_matches})")
+                print(f"     - Scraping information for season {season_key}")
+
+            out_season_path = os.path.join(out_league_path, season_key)
+            os.makedirs(out_season_path, exist_ok=True)
 
-            match_info = match_scraping(matches_dict=dict_matches, match_id=match_id, out_path=out_season_path)
+            season_data_dict = season_data_scraper(seasons_dict=seasons_dict, season_key=season_key, league_code=ss_code, out_path=out_season_path, session=session)
+            print("season data")
+            season_standings(seasons_dict=seasons_dict, season_key=season_key, league_code=ss_code, out_path=out_season_path, session=session)
+            print("season standings")
+            season_info = season_information(seasons_dict=seasons_dict, season_key=season_key, league_code=ss_code, out_path=out_season_path, session=session)
+            print("season information")
 
-            home_manager_id = (match_info.get("match", {}).get("event", {}).get("homeTeam", {}).get("manager", {}).get("id"))
-            away_manager_id = (match_info.get("match", {}).get("event", {}).get("awayTeam", {}).get("manager", {}).get("id"))
-            manager_ids = [manager_id for manager_id in [home_manager_id, away_manager_id] if manager_id is not None]
+            dict_matches = {match["id"]: match["slug"] for events in season_data_dict.values() for match in events.get("events", []) if match.get("status", {}).get("description") == "Ended"}
+
+            # Plan de descarga de la temporada; si la ejecución anterior se cortó se reanuda donde quedó
+            def season_plan() -> dict:
+                dict_players = {player["playerId"]: player["playerName"].lower().replace(" ", "-") for player in season_info.get("player", {}).get("players", [])}
+                dict_teams = {team["id"]: team["slug"] for team in season_info.get("team", {}).get("teams", [])}
+                dict_venues = {venue["id"]: venue["slug"] for venue in season_info.get("venue", {}).get("venues", [])}
+
+                # De los estadios solo se descargan las imágenes, no su información
+                plan = {"player": list(dict_players.keys()), "team": list(dict_teams.keys()), "match": list(dict_matches.keys())}
+                venue_ids = list(dict_venues.keys())
+                if matches_to_proc is not None:
+                    plan = {kind: ids[:matches_to_proc] for kind, ids in plan.items()}
+                    venue_ids = venue_ids[:matches_to_proc]
 
-            for manager_id in manager_ids:
-                obtain_information(type="manager", id=manager_id, out_season_path=out_season_path)
                 if scrape_images:
-                    image_downloader(type="manager", id=manager_id, out_path=out_season_path)
+                    plan.update({f"image/{kind}": ids for kind, ids in plan.items() if kind in ("player", "team")})
+                    plan["image/venue"] = venue_ids
+                return plan
+
+            queue_name = f"sofascore/{league_slug}/{season_key}"
+            queue_kinds = ["player", "team", "match", "manager"] + ([f"image/{kind}" for kind in ("player", "team", "venue", "manager")] if scrape_images else [])
+            resumed = work_queue.prepare_queue(work_queue=queue_db, queue=queue_name, plan_func=season_plan, kinds=queue_kinds)
+            if resumed and print_info:
+                print(f"          - Resuming scraping queue {queue_db.counts(queue=queue_name)}")
+
+            # En modo por lotes cada tarea pide un lote de entidades; si no, una entidad por tarea
+            chunk_size = batch_size if session.batch_fetch else 1
+
+            def entities_handler(type: str):
+                def handler(ids_chunk: list[str]) -> None:
+                    info_dict = obtain_information_batch(type=type, ids=[int(id) for id in ids_chunk], out_season_path=out_season_path, session=session)
+                    missing_ids = [id for id, info_json in info_dict.items() if not info_json.get(type)]
+                    if missing_ids:
+                        raise ValueError(f"Sin datos de {type}: {missing_ids}")
+                return handler
+
+            def images_handler(type: str):
+                def handler(ids_chunk: list[str]) -> None:
+                    images_downloader(type=type, ids=[int(id) for id in ids_chunk], out_path=out_season_path)
+                return handler
+
+            for entity_type in ["player", "team"]:
+                entity_store.add_season_entity_ids(season_path=out_season_path, type=entity_type, ids=[int(id) for id in queue_db.item_ids(queue=queue_name, kind=entity_type)])
+                work_queue.run_kind(work_queue=queue_db, queue=queue_name, kind=entity_type, handler=entities_handler(entity_type), mapper=session.map, chunk_size=chunk_size)
+
+            for entity_type in ["player", "team", "venue"]:
+                work_queue.run_kind(work_queue=queue_db, queue=queue_name, kind=f"image/{entity_type}", handler=images_handler(entity_type), chunk_size=500)
+
+            # Cada partido descargado añade sus entrenadores a la cola
+            def scrape_match(match_ids_chunk: list[str]) -> None:
+                for match_id in map(int, match_ids_chunk):
+                    if print_info:
+                        print(f"          - Scraping information for match {match_id}")
+
+                    match_info = match_scraping(matches_dict=dict_matches, match_id=match_id, out_path=out_season_path, session=session)
+                    if not match_info:
+                        raise ValueError(f"Partido {match_id} incompleto")
+
+                    home_manager_id = (match_info.get("match", {}).get("event", {}).get("homeTeam", {}).get("manager", {}).get("id"))
+                    away_manager_id = (match_info.get("match", {}).get("event", {}).get("awayTeam", {}).get("manager", {}).get("id"))
+                    manager_ids = [manager_id for manager_id in [home_manager_id, away_manager_id] if manager_id is not None]
+
+                    queue_db.enqueue(queue=queue_name, kind="manager", item_ids=manager_ids)
+                    if scrape_images:
+                        queue_db.enqueue(queue=queue_name, kind="image/manager", item_ids=manager_ids)
+
+            work_queue.run_kind(work_queue=queue_db, queue=queue_name, kind="match", handler=scrape_match, mapper=session.map)
+
+            entity_store.add_season_entity_ids(season_path=out_season_path, type="manager", ids=[int(id) for id in queue_db.item_ids(queue=queue_name, kind="manager")])
+            work_queue.run_kind(work_queue=queue_db, queue=queue_name, kind="manager", handler=entities_handler("manager"), mapper=session.map, chunk_size=chunk_size)
+            work_queue.run_kind(work_queue=queue_db, queue=queue_name, kind="image/manager", handler=images_handler("manager"), chunk_size=500)
+
+            failed = {key: total for key, total in queue_db.counts(queue=queue_name).items() if key.endswith("/failed")}
+            if failed and print_info:
+                print(f"          - Items failed after {queue_db.max_attempts} attempts: {failed}")
+    finally:
+        if own_session:
+            session.close()
 
     if print_info:
         print(f"Finished Sofascore scraping ({league_name}) in {elapsed_time_str(start_time=start_time)}")
@@ -1,3 +1,4 @@
+import asyncio
 import requests
 import re
 import os
@@ -5,16 +6,39 @@ import json as jsonlib
 import time
 from datetime import datetime, timedelta
 
+import aiohttp
+
 from use.config import comps, desired_seasons, act_season
-from use.functions import safe_json_dump, create_slug, need_to_upload, elapsed_time_str
+from use import http_cache, raw_index, work_queue
+from use.functions import json_to_dict, safe_json_dump, create_slug, need_to_upload, elapsed_time_str
+from use.rate_limit import call_limited, host_limiter, http_failure
+
+SW_REFERER = "https://www.scoresway.com/"
+
+# --------------------------------------------------------------------------------------
+# CABECERAS HTTP - Cabeceras utilizadas en las peticiones a Scoresway.
+# --------------------------------------------------------------------------------------
+def sw_headers(referer: str = SW_REFERER) -> dict:
+    return {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/145.0.0.0 Safari/537.36",
+            "referer": referer, "accept": "*/*", "accept-language": "en-US,en;q=0.9", "connection": "keep-alive"}
+
+# --------------------------------------------------------------------------------------
+# LECTURA DE JSONP - Extrae el JSON de una respuesta JSONP de Scoresway.
+# --------------------------------------------------------------------------------------
+def parse_jsonp(text: str) -> dict:
+
+    match = re.match(r"^[\w$]+\((.*)\)\s*;?\s*$", text.strip(), flags=re.DOTALL)
+    if not match:
+        return {}
+
+    return jsonlib.loads(match.group(1))
 
 # --------------------------------------------------------------------------------------
 # SCRAPING DE DATOS - Descarga datos del URL de Scoresway en formato JSON.
 # --------------------------------------------------------------------------------------
-def scrape_json(url: str, referer: str = 'https://www.scoresway.com/', sleep_time: int = 3) -> dict:
+def scrape_json(url: str, referer: str = SW_REFERER, cache_path: str = None, retries: int = 3) -> dict | None:
 
-    headers = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/145.0.0.0 Safari/537.36",
-               "referer": referer, "accept": "*/*", "accept-language": "en-US,en;q=0.9", "connection": "keep-alive"}
+    headers = sw_headers(referer=referer)
 
     with requests.Session() as s:
         try:
@@ -22,18 +46,57 @@ def scrape_json(url: str, referer: str = 'https://www.scoresway.com/', sleep_tim
         except requests.RequestException:
             pass
 
-        r = s.get(url, headers=headers, timeout=30)
+        request_headers = {**headers, **http_cache.conditional_headers(path=cache_path)}
+        r = call_limited(url=url, func=lambda: s.get(url, headers=request_headers, timeout=30), check=lambda r: http_failure(status=r.status_code, headers=r.headers),
+                         retry_exceptions=(requests.ConnectionError, requests.Timeout), retries=retries)
+
+        # Con cache_path, None indica que el JSON guardado sigue vigente (304 o mismo contenido)
+        if http_cache.response_unchanged(path=cache_path, url=url, status_code=r.status_code, headers=r.headers, content=r.content):
+            return None
+
         if r.status_code != 200:
             return {}
 
-        text = r.text.strip()
-        match = re.match(r"^[\w$]+\((.*)\)\s*;?\s*$", text, flags=re.DOTALL)
-        if not match:
+        data = parse_jsonp(r.text)
+        if not data:
             return {}
 
-        json_str = match.group(1)
-        time.sleep(sleep_time)
-        return jsonlib.loads(json_str)
+        http_cache.remember_response(path=cache_path, url=url, headers=r.headers, content=r.content)
+
+        return data
+
+# --------------------------------------------------------------------------------------
+# SCRAPING ASÍNCRONO DE DATOS - Descarga un JSONP de Scoresway con límite de peticiones por host y reintentos.
+# --------------------------------------------------------------------------------------
+async def scrape_json_async(session: aiohttp.ClientSession, url: str, retries: int = 3) -> dict:
+
+    limiter = host_limiter(url=url)
+
+    for attempt in range(retries + 1):
+        await limiter.acquire_async()
+        retry_after = None
+
+        try:
+            async with session.get(url) as r:
+                if r.status == 200:
+                    data = parse_jsonp(await r.text())
+                    limiter.success()
+                    return data
+
+                failure = http_failure(status=r.status, headers=r.headers)
+                if failure is None:
+                    limiter.success()
+                    return {}
+
+                status, retry_after = failure
+                limiter.failure(status=status, retry_after=retry_after)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            limiter.failure()
+
+        if attempt < retries:
+            await asyncio.sleep(max(limiter.backoff(attempt), retry_after or 0.0))
+
+    return {}
 
 # --------------------------------------------------------------------------------------
 # PARTIDOS - Obtiene los partidos de una temporada.
@@ -57,7 +120,9 @@ def season_matches(season: str, league_code: int, out_path: str) -> dict:
     if f'scoresway{season}' in comps.columns:
         league_sw = comps[comps['id'] == league_code][f'scoresway{season}'].iloc[0]
         matches_url = f'https://api.performfeeds.com/soccerdata/match/ft1tiv1inq7v1sk3y9tv12yh5/?_rt=c&tmcl={league_sw}&live=yes&_pgSz=400&_lcl=en&_fmt=jsonp&sps=widgets&_clbk=cb'
-        matches_json = scrape_json(url=matches_url)
+        matches_json = scrape_json(url=matches_url, cache_path=json_path)
+        if matches_json is None:
+            return json_to_dict(json_path=json_path)
 
         if matches_json.get('match'):
             os.makedirs(out_league_path, exist_ok=True)
@@ -88,7 +153,9 @@ def season_standings(season: str, league_code: int, out_path: str) -> None:
     if f'scoresway{season}' in comps.columns:
         league_sw = comps[comps['id'] == league_code][f'scoresway{season}'].iloc[0]
         standings_url = f'https://api.performfeeds.com/soccerdata/standings/ft1tiv1inq7v1sk3y9tv12yh5/?_rt=c&tmcl={league_sw}&live=yes&_lcl=en&_fmt=jsonp&sps=widgets&_clbk=cb'
-        standings_json = scrape_json(url=standings_url)
+        standings_json = scrape_json(url=standings_url, cache_path=json_path)
+        if standings_json is None:
+            return
 
         if standings_json.get('stage'):
             os.makedirs(out_league_path, exist_ok=True)
@@ -118,7 +185,9 @@ def season_squads(season: str, league_code: int, out_path: str) -> None:
     if f'scoresway{season}' in comps.columns:
         league_sw = comps[comps['id'] == league_code][f'scoresway{season}'].iloc[0]
         squads_url = f'https://api.performfeeds.com/soccerdata/squads/ft1tiv1inq7v1sk3y9tv12yh5/?_rt=c&tmcl={league_sw}&_pgSz=200&_lcl=en&_fmt=jsonp&sps=widgets&_clbk=cb'
-        squads_json = scrape_json(url=squads_url)
+        squads_json = scrape_json(url=squads_url, cache_path=json_path)
+        if squads_json is None:
+            return json_to_dict(json_path=json_path)
 
         if squads_json.get('squad'):
             os.makedirs(out_league_path, exist_ok=True)
@@ -128,36 +197,125 @@ def season_squads(season: str, league_code: int, out_path: str) -> None:
     return {}
 
 # --------------------------------------------------------------------------------------
-# ESTADÍSTICAS DE UN PARTIDO - Obtiene las estadísticas de un partido
+# URL Y RUTA DE UN PARTIDO - Devuelve la URL de estadísticas y la ruta del JSON de un partido.
 # --------------------------------------------------------------------------------------
-def match_stats(match_id: str, out_path: str) -> None:
+def match_stats_paths(match_id: str, out_path: str) -> tuple[str, str]:
 
-    out_league_path = os.path.join(out_path, 'matches')
-    os.makedirs(out_league_path, exist_ok=True)
-    json_path = os.path.join(out_league_path, f'{match_id}.json')
+    stats_url = f'https://api.performfeeds.com/soccerdata/matchstats/ft1tiv1inq7v1sk3y9tv12yh5/{match_id}?_rt=c&_lcl=en&_fmt=jsonp&sps=widgets&_clbk=cb'
+    json_path = os.path.join(out_path, 'matches', f'{match_id}.json')
+
+    return stats_url, json_path
+
+# --------------------------------------------------------------------------------------
+# CONTROL DE PARTIDOS DESCARGADOS - Indica si hay que descargar las estadísticas de un partido.
+# --------------------------------------------------------------------------------------
+def match_stats_needed(json_path: str) -> bool:
 
     if os.path.exists(json_path) and os.path.getsize(json_path) > 0:
         try:
             with open(json_path, "r", encoding="utf-8") as f:
                 match_json = jsonlib.load(f)
             if isinstance(match_json, dict) and match_json.get('matchInfo'):
-                return
+                return False
         except Exception:
             try:
                 os.remove(json_path)
             except OSError:
                 pass
-    
-    stats_url = f'https://api.performfeeds.com/soccerdata/matchstats/ft1tiv1inq7v1sk3y9tv12yh5/{match_id}?_rt=c&_lcl=en&_fmt=jsonp&sps=widgets&_clbk=cb'
+
+    return True
+
+# --------------------------------------------------------------------------------------
+# ESTADÍSTICAS DE UN PARTIDO - Obtiene las estadísticas de un partido
+# --------------------------------------------------------------------------------------
+def match_stats(match_id: str, out_path: str) -> None:
+
+    stats_url, json_path = match_stats_paths(match_id=match_id, out_path=out_path)
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+
+    if not match_stats_needed(json_path=json_path):
+        return
+
     stats_json = scrape_json(stats_url) or {}   
 
     if isinstance(stats_json, dict) and stats_json.get('matchInfo'):
         safe_json_dump(data=stats_json, path=json_path)
 
+# --------------------------------------------------------------------------------------
+# SESIÓN ASÍNCRONA DE SCORESWAY - Una sesión (y un pool de conexiones) para todos los partidos de una temporada.
+# La visita inicial al referer pasa también por el limitador de su host.
+# --------------------------------------------------------------------------------------
+async def open_sw_session(concurrency: int = 4) -> aiohttp.ClientSession:
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+    session = aiohttp.ClientSession(headers=sw_headers(), connector=connector, timeout=timeout)
+
+    limiter = host_limiter(url=SW_REFERER)
+    await limiter.acquire_async()
+    try:
+        async with session.get(SW_REFERER) as r:
+            await r.read()
+        limiter.success()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        limiter.failure()
+
+    return session
+
+# --------------------------------------------------------------------------------------
+# ESTADÍSTICAS DE VARIOS PARTIDOS - Descarga en paralelo (dentro de una sesión abierta) las estadísticas de los partidos pendientes.
+# Devuelve los partidos que siguen sin JSON válido.
+# --------------------------------------------------------------------------------------
+async def fetch_matches_stats(session: aiohttp.ClientSession, match_ids: list, out_path: str, concurrency: int = 4, retries: int = 3, print_info: bool = True) -> list:
+
+    os.makedirs(os.path.join(out_path, 'matches'), exist_ok=True)
+
+    pending = []
+    for match_id in match_ids:
+        stats_url, json_path = match_stats_paths(match_id=match_id, out_path=out_path)
+        if match_stats_needed(json_path=json_path):
+            pending.append((match_id, stats_url, json_path))
+
+    total_matches = len(pending)
+    done = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_match(match_id: str, stats_url: str, json_path: str) -> None:
+        nonlocal done
+
+        async with semaphore:
+            stats_json = await scrape_json_async(session=session, url=stats_url, retries=retries)
+
+        if isinstance(stats_json, dict) and stats_json.get('matchInfo'):
+            safe_json_dump(data=stats_json, path=json_path)
+
+        done += 1
+        if print_info:
+            print(f'          - Scraping information for match {match_id} ({done}/{total_matches})')
+
+    await asyncio.gather(*(fetch_match(*item) for item in pending))
+
+    return [match_id for match_id, _, json_path in pending if match_stats_needed(json_path=json_path)]
+
+# --------------------------------------------------------------------------------------
+# PARTIDOS DE LA COLA - Vacía la cola de partidos de una temporada con un solo bucle de eventos y una sola sesión;
+# cada lote se marca como hecho (o fallido) al terminarlo.
+# --------------------------------------------------------------------------------------
+async def queue_matches_stats_async(queue_db: work_queue.WorkQueue, queue_name: str, out_path: str, concurrency: int = 4, requests_per_second: float = 1.0, retries: int = 3, print_info: bool = True) -> None:
+
+    host_limiter(url=match_stats_paths(match_id='', out_path=out_path)[0], max_rate=requests_per_second)
+
+    session = await open_sw_session(concurrency=concurrency)
+    async with session:
+        async def handler(match_ids: list[str]) -> list[str]:
+            return await fetch_matches_stats(session=session, match_ids=match_ids, out_path=out_path, concurrency=concurrency, retries=retries, print_info=print_info)
+
+        await work_queue.run_kind_async(work_queue=queue_db, queue=queue_name, kind='match', handler=handler, chunk_size=concurrency * 4)
+
 # --------------------------------------------------------------------------------------
 # DATOS DE UNA LIGA - Función principal para la extracción de datos de una liga
 # --------------------------------------------------------------------------------------
-def main_scoresway_league_scraping(league_id:int, out_path:str, matches_to_proc:int=None, print_info:bool=True) -> None:
+def main_scoresway_league_scraping(league_id:int, out_path:str, matches_to_proc:int=None, print_info:bool=True, async_fetch:bool=True, concurrency:int=4, requests_per_second:float=1.0) -> None:
 
     start_time = time.time()
 
@@ -169,6 +327,8 @@ def main_scoresway_league_scraping(league_id:int, out_path:str, matches_to_proc:
 
     out_league_path = os.path.join(out_path, 'scoresway', league_slug)
     os.makedirs(out_league_path, exist_ok=True)
+    raw_index.open_raw_index(raw_path=out_path)
+    queue_db = work_queue.open_work_queue(raw_path=out_path)
 
     for season in desired_seasons:
         season_path = os.path.join(out_league_path, season)
@@ -184,17 +344,25 @@ def main_scoresway_league_scraping(league_id:int, out_path:str, matches_to_proc:
             played_matches = {m.get('matchInfo', {}).get('id'):f"{m.get('matchInfo', {}).get('contestant', [{}])[0].get('name','')}-{m.get('matchInfo', {}).get('contestant', [{},{}])[1].get('name','')}".lower().replace(' ', '-')
                               for m in matches_json.get('match', []) if m.get('liveData', {}).get('matchDetails', {}).get('matchStatus')=='Played'}
 
-            match_ids = list(played_matches.keys())
-            if matches_to_proc is not None:
-                match_ids = match_ids[:matches_to_proc]
+            # Los partidos pendientes se guardan en la cola persistente; si la ejecución anterior se cortó se reanuda donde quedó
+            queue_name = f'scoresway/{league_slug}/{season}'
+            work_queue.prepare_queue(work_queue=queue_db, queue=queue_name,
+                                     plan_func=lambda: {'match': list(played_matches.keys())[:matches_to_proc] if matches_to_proc is not None else list(played_matches.keys())})
+
+            # Cada lote se marca como hecho al terminarlo; un partido sin JSON válido vuelve a la cola hasta agotar sus intentos
+            if async_fetch:
+                asyncio.run(queue_matches_stats_async(queue_db=queue_db, queue_name=queue_name, out_path=season_path, concurrency=concurrency, requests_per_second=requests_per_second, print_info=print_info))
+            else:
+                def scrape_matches(match_ids: list[str]) -> list[str]:
+                    for match_id in match_ids:
+                        if print_info:
+                            print(f'          - Scraping information for match {match_id}')
 
-            total_matches = len(match_ids)
+                        match_stats(match_id=match_id, out_path=season_path)
 
-            for i, match_id in enumerate(match_ids, start=1):
-                if print_info:
-                    print(f'          - Scraping information for match {match_id} ({i}/{total_matches})')
+                    return [match_id for match_id in match_ids if match_stats_needed(json_path=match_stats_paths(match_id=match_id, out_path=season_path)[1])]
 
-                match_stats(match_id=match_id, out_path=season_path)
+                work_queue.run_kind(work_queue=queue_db, queue=queue_name, kind='match', handler=scrape_matches)
 
     if print_info:
         print(f'Finished Scoresway scraping ({league_name}) in {elapsed_time_str(start_time=start_time)}')
\ No newline at end of file
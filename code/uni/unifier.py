@@ -2,9 +2,11 @@ import os
 import re
 import json as jsonlib
 import shutil
+import threading
 import time
 import warnings
 from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -12,7 +14,9 @@ from PIL import Image
 from rapidfuzz import process, fuzz
 
 from use.config import comps, desired_seasons, utils
-from use.functions import create_slug, safe_div, elapsed_time_str
+from use.functions import create_slug, slugify_series, safe_div_series, round_array, elapsed_time_str
+from use.storage import read_table, write_table, concat_tables
+from use.identity_registry import IdentityRegistry, open_identity_registry, close_identity_registry, source_key, confident_score
 
 warnings.filterwarnings("ignore", category=pd.errors.PerformanceWarning)
 
@@ -34,13 +38,13 @@ def read_fotmob_data(fotmob_clean_path: str) -> Tuple[pd.DataFrame, pd.DataFrame
     st_form_path = os.path.join(standings_path, "form.csv")
     st_xg_path = os.path.join(standings_path, "xg.csv")
 
-    info_df = pd.read_csv(info_path, sep=";") if os.path.exists(info_path) else None
-    matches_df = pd.read_csv(matches_path, sep=";") if os.path.exists(matches_path) else None
-    all_st_df = pd.read_csv(st_all_path, sep=";") if os.path.exists(st_all_path) else None
-    home_st_df = pd.read_csv(st_home_path, sep=";") if os.path.exists(st_home_path) else None
-    away_st_df = pd.read_csv(st_away_path, sep=";") if os.path.exists(st_away_path) else None
-    form_st_df = pd.read_csv(st_form_path, sep=";") if os.path.exists(st_form_path) else None
-    xg_st_df = pd.read_csv(st_xg_path, sep=";") if os.path.exists(st_xg_path) else None
+    info_df = read_table(path=info_path)
+    matches_df = read_table(path=matches_path)
+    all_st_df = read_table(path=st_all_path)
+    home_st_df = read_table(path=st_home_path)
+    away_st_df = read_table(path=st_away_path)
+    form_st_df = read_table(path=st_form_path)
+    xg_st_df = read_table(path=st_xg_path)
 
     return info_df, matches_df, all_st_df, home_st_df, away_st_df, form_st_df, xg_st_df
 
@@ -63,10 +67,26 @@ def obtain_fotmob_teams(matches_df: pd.DataFrame, all_st_df: pd.DataFrame, home_
 
     return sorted(set(teams_list))
 
+# --------------------------------------------------------------------------------------
+# PROYECCIÓN DE ESTADÍSTICAS DE PARTIDO - Columnas de las tablas de partido que usa la unificación:
+# identificadores y campos fijos más las columnas de la fuente que aparecen en cols_map.json.
+# --------------------------------------------------------------------------------------
+MATCH_STATS_KEY_COLUMNS = {("team", "ss"): ["match_id", "team_id", "opponent_team_id", "ha"],
+                           ("team", "sw"): ["match_id", "team_id", "ha", "kit", "formation", "manager", "average_age"],
+                           ("player", "ss"): ["match_id", "team_id", "opponent_team_id", "player_id", "ha", "starter"],
+                           ("player", "sw"): ["match_id", "team_id", "playerId", "ha", "shirtNumber", "position", "positionSide", "subPosition"]}
+
+def match_stats_columns(stats_type: str, source: str) -> list[str]:
+
+    suffix = f"_{source}"
+    source_cols = [c[:-len(suffix)] for c in stats_schema_plan(stats_type=stats_type).sources if c.endswith(suffix)]
+
+    return list(dict.fromkeys(MATCH_STATS_KEY_COLUMNS[(stats_type, source)] + source_cols))
+
 # --------------------------------------------------------------------------------------
 # LECTURA DE DATOS DE SCORESWAY
 # --------------------------------------------------------------------------------------
-def read_scoresway_data(scoresway_clean_path: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def read_scoresway_data(scoresway_clean_path: str, player_stats_columns: list[str] = None, team_stats_columns: list[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     
     if not os.path.exists(scoresway_clean_path):
         return (None,) * 18
@@ -96,24 +116,24 @@ def read_scoresway_data(scoresway_clean_path: str) -> Tuple[pd.DataFrame, pd.Dat
     matches_referees_path = os.path.join(matches_dir_path, "referees.csv")
     matches_team_stats_path = os.path.join(matches_dir_path, "team_stats.csv")
 
-    managers_df = pd.read_csv(managers_path, sep=";") if os.path.exists(managers_path) else None
-    matches_df = pd.read_csv(matches_path, sep=";") if os.path.exists(matches_path) else None
-    players_df = pd.read_csv(players_path, sep=";") if os.path.exists(players_path) else None
-    teams_df = pd.read_csv(teams_path, sep=";") if os.path.exists(teams_path) else None
-    total_st_df = pd.read_csv(st_total_path, sep=";") if os.path.exists(st_total_path) else None
-    home_st_df = pd.read_csv(st_home_path, sep=";") if os.path.exists(st_home_path) else None
-    away_st_df = pd.read_csv(st_away_path, sep=";") if os.path.exists(st_away_path) else None
-    httotal_st_df = pd.read_csv(st_httotal_path, sep=";") if os.path.exists(st_httotal_path) else None
-    hthome_st_df = pd.read_csv(st_hthome_path, sep=";") if os.path.exists(st_hthome_path) else None
-    htaway_st_df = pd.read_csv(st_htaway_path, sep=";") if os.path.exists(st_htaway_path) else None
-    formhome_st_df = pd.read_csv(st_formhome_path, sep=";") if os.path.exists(st_formhome_path) else None
-    formaway_st_df = pd.read_csv(st_formaway_path, sep=";") if os.path.exists(st_formaway_path) else None
-    overunder_st_df = pd.read_csv(st_overunder_path, sep=";") if os.path.exists(st_overunder_path) else None
-    attendance_st_df = pd.read_csv(st_attendance_path, sep=";") if os.path.exists(st_attendance_path) else None
-    matches_info_df = pd.read_csv(matches_info_path, sep=";") if os.path.exists(matches_info_path) else None
-    matches_player_stats_df = pd.read_csv(matches_player_stats_path, sep=";") if os.path.exists(matches_player_stats_path) else None
-    matches_team_stats_df = pd.read_csv(matches_team_stats_path, sep=";") if os.path.exists(matches_team_stats_path) else None
-    matches_referees_df = pd.read_csv(matches_referees_path, sep=";") if os.path.exists(matches_referees_path) else None
+    managers_df = read_table(path=managers_path)
+    matches_df = read_table(path=matches_path)
+    players_df = read_table(path=players_path)
+    teams_df = read_table(path=teams_path)
+    total_st_df = read_table(path=st_total_path)
+    home_st_df = read_table(path=st_home_path)
+    away_st_df = read_table(path=st_away_path)
+    httotal_st_df = read_table(path=st_httotal_path)
+    hthome_st_df = read_table(path=st_hthome_path)
+    htaway_st_df = read_table(path=st_htaway_path)
+    formhome_st_df = read_table(path=st_formhome_path)
+    formaway_st_df = read_table(path=st_formaway_path)
+    overunder_st_df = read_table(path=st_overunder_path)
+    attendance_st_df = read_table(path=st_attendance_path)
+    matches_info_df = read_table(path=matches_info_path)
+    matches_player_stats_df = read_table(path=matches_player_stats_path, columns=player_stats_columns)
+    matches_team_stats_df = read_table(path=matches_team_stats_path, columns=team_stats_columns)
+    matches_referees_df = read_table(path=matches_referees_path)
 
     return (managers_df, matches_df, players_df, teams_df, total_st_df, home_st_df, away_st_df, httotal_st_df, hthome_st_df, htaway_st_df, formhome_st_df, formaway_st_df,
             overunder_st_df, attendance_st_df, matches_info_df, matches_player_stats_df, matches_team_stats_df, matches_referees_df)
@@ -121,7 +141,7 @@ def read_scoresway_data(scoresway_clean_path: str) -> Tuple[pd.DataFrame, pd.Dat
 # --------------------------------------------------------------------------------------
 # LECTURA DE DATOS DE SOFASCORE
 # --------------------------------------------------------------------------------------
-def read_sofascore_data(sofascore_clean_path: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def read_sofascore_data(sofascore_clean_path: str, lineups_columns: list[str] = None, statistics_columns: list[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
 
     if not os.path.exists(sofascore_clean_path):
         return (None,) * 10
@@ -143,62 +163,232 @@ def read_sofascore_data(sofascore_clean_path: str) -> Tuple[pd.DataFrame, pd.Dat
     matches_lineups_path = os.path.join(matches_dir_path, "lineups.csv")
     matches_statistics_path = os.path.join(matches_dir_path, "statistics.csv")
 
-    managers_df = pd.read_csv(managers_path, sep=";") if os.path.exists(managers_path) else None
-    players_df = pd.read_csv(players_path, sep=";") if os.path.exists(players_path) else None
-    teams_df = pd.read_csv(teams_path, sep=";") if os.path.exists(teams_path) else None
-    venues_df = pd.read_csv(venues_path, sep=";") if os.path.exists(venues_path) else None
-    total_st_df = pd.read_csv(st_total_path, sep=";") if os.path.exists(st_total_path) else None
-    home_st_df = pd.read_csv(st_home_path, sep=";") if os.path.exists(st_home_path) else None
-    away_st_df = pd.read_csv(st_away_path, sep=";") if os.path.exists(st_away_path) else None
-    matches_info_df = pd.read_csv(matches_info_path, sep=";") if os.path.exists(matches_info_path) else None
-    matches_lineups_df = pd.read_csv(matches_lineups_path, sep=";") if os.path.exists(matches_lineups_path) else None
-    matches_statistics_df = pd.read_csv(matches_statistics_path, sep=";") if os.path.exists(matches_statistics_path) else None
+    managers_df = read_table(path=managers_path)
+    players_df = read_table(path=players_path)
+    teams_df = read_table(path=teams_path)
+    venues_df = read_table(path=venues_path)
+    total_st_df = read_table(path=st_total_path)
+    home_st_df = read_table(path=st_home_path)
+    away_st_df = read_table(path=st_away_path)
+    matches_info_df = read_table(path=matches_info_path)
+    matches_lineups_df = read_table(path=matches_lineups_path, columns=lineups_columns)
+    matches_statistics_df = read_table(path=matches_statistics_path, columns=statistics_columns)
 
     return (managers_df, players_df, teams_df, venues_df, total_st_df, home_st_df, away_st_df, matches_info_df, matches_lineups_df, matches_statistics_df)
 
 # --------------------------------------------------------------------------------------
-# MATCH FUZZY DE EQUIPOS
+# ASIGNACIÓN ÓPTIMA - Asignación uno a uno de coste mínimo (la matriz se completa a cuadrada con ceros).
+# Arranque con reducción por columnas y por filas y caminos de aumento más cortos solo para las filas en conflicto.
+# Devuelve la columna asignada a cada fila (-1 si queda sin asignar).
+# --------------------------------------------------------------------------------------
+def linear_assignment(cost: np.ndarray) -> np.ndarray:
+
+    n, m = cost.shape
+    size = max(n, m)
+    square = np.zeros((size, size))
+    square[:n, :m] = cost
+    costs = square.tolist()
+
+    v = square.min(axis=0).tolist()
+    u = [0.0] * size
+    row4col, col4row = [-1] * size, [-1] * size
+    for j, i in enumerate(square.argmin(axis=0).tolist()):
+        if col4row[i] == -1:
+            row4col[j], col4row[i] = i, j
+
+    free_rows = []
+    for i in range(size):
+        if col4row[i] != -1:
+            continue
+        reduced = [c - vj for c, vj in zip(costs[i], v)]
+        u[i] = min(reduced)
+        j = reduced.index(u[i])
+        if row4col[j] == -1:
+            row4col[j], col4row[i] = i, j
+        else:
+            free_rows.append(i)
+
+    for cur_row in free_rows:
+        shortest, path = [np.inf] * size, [-1] * size
+        remaining = list(range(size))
+        scanned_rows, scanned_cols = [], []
+        min_val, i = 0.0, cur_row
+
+        while True:
+            scanned_rows.append(i)
+            row, base = costs[i], min_val - u[i]
+            for j in remaining:
+                r = base + row[j] - v[j]
+                if r < shortest[j]:
+                    shortest[j], path[j] = r, i
+
+            j = min(remaining, key=shortest.__getitem__)
+            min_val = shortest[j]
+            if row4col[j] == -1:
+                break
+            i = row4col[j]
+            scanned_cols.append(j)
+            remaining.remove(j)
+
+        u[cur_row] += min_val
+        for i in scanned_rows[1:]:
+            u[i] += min_val - shortest[col4row[i]]
+        for col in scanned_cols:
+            v[col] -= min_val - shortest[col]
+
+        while True:
+            i = path[j]
+            row4col[j] = i
+            col4row[i], j = j, col4row[i]
+            if i == cur_row:
+                break
+
+    return np.array([j if j < m else -1 for j in col4row[:n]], dtype=int)
+
+# --------------------------------------------------------------------------------------
+# MATCH FUZZY UNO A UNO - Similitud de todos los pares con rapidfuzz cdist y asignación óptima con umbral.
+# Cada nombre de choices se asigna como mucho a un nombre de queries. Devuelve (nombres asignados, puntuaciones); None / NaN si no hay pareja.
+# allowed: matriz booleana opcional con los pares que se pueden emparejar.
+# --------------------------------------------------------------------------------------
+def fuzzy_match(queries: list, choices: list, threshold: float, workers: int = 1, allowed: np.ndarray = None) -> tuple[list, list]:
+
+    if not queries or not choices:
+        return [None] * len(queries), [np.nan] * len(queries)
+
+    scores = process.cdist(queries, choices, scorer=fuzz.token_sort_ratio, workers=workers)
+    eligible = scores >= threshold if allowed is None else (scores >= threshold) & allowed
+    assigned = linear_assignment(cost=-np.where(eligible, scores, 0))
+
+    matches, match_scores = [], []
+    for i, j in enumerate(assigned.tolist()):
+        matched = j >= 0 and bool(eligible[i, j])
+        matches.append(choices[j] if matched else None)
+        match_scores.append(float(scores[i, j]) if matched else np.nan)
+
+    return matches, match_scores
+
+# --------------------------------------------------------------------------------------
+# MATCH CON REGISTRO DE IDENTIDADES - Los ids ya registrados que pertenecen a la misma entidad se emparejan directamente.
+# El resto pasa por el match fuzzy, salvo los pares en que ambos ids ya están emparejados con otra entidad de la otra fuente;
+# los ids registrados pero sin pareja en la otra fuente se pueden volver a emparejar.
+# query_ids / choice_ids: id de cada nombre en su fuente (por defecto, el propio nombre).
 # --------------------------------------------------------------------------------------
-def match_teams(fm_list: list, sw_list: list, ss_list: list, threshold: int = 30) -> pd.DataFrame:
+def registry_match(queries: list, choices: list, threshold: float, registry: IdentityRegistry = None, kind: str = None, query_source: str = None, choice_source: str = None,
+                   query_ids: list = None, choice_ids: list = None, workers: int = 1) -> tuple[list, list]:
+
+    if registry is None:
+        return fuzzy_match(queries=queries, choices=choices, threshold=threshold, workers=workers)
+
+    query_ids = queries if query_ids is None else query_ids
+    choice_ids = choices if choice_ids is None else choice_ids
+    query_known = registry.lookup(kind=kind, source=query_source, source_ids=query_ids)
+    choice_known = registry.lookup(kind=kind, source=choice_source, source_ids=choice_ids)
+
+    choice_by_entity = {}
+    for j, choice_id in enumerate(choice_ids):
+        known = choice_known.get(source_key(choice_id))
+        if known is not None:
+            choice_by_entity.setdefault(known[0], j)
+
+    matches, match_scores = [None] * len(queries), [np.nan] * len(queries)
+    used_choices = set()
+    for i, query_id in enumerate(query_ids):
+        known = query_known.get(source_key(query_id))
+        j = choice_by_entity.get(known[0]) if known is not None else None
+        if j is not None and j not in used_choices:
+            used_choices.add(j)
+            matches[i], match_scores[i] = choices[j], choice_known[source_key(choice_ids[j])][1]
+
+    free_queries = [i for i in range(len(queries)) if matches[i] is None]
+    free_choices = [j for j in range(len(choices)) if j not in used_choices]
+    query_linked = registry.linked_entities(kind=kind, source=choice_source, entity_ids=[entity_id for entity_id, _ in query_known.values()])
+    choice_linked = registry.linked_entities(kind=kind, source=query_source, entity_ids=[entity_id for entity_id, _ in choice_known.values()])
+    query_seen = np.array([query_known.get(source_key(query_ids[i]), (None,))[0] in query_linked for i in free_queries], dtype=bool)
+    choice_seen = np.array([choice_known.get(source_key(choice_ids[j]), (None,))[0] in choice_linked for j in free_choices], dtype=bool)
+
+    if free_queries and free_choices and not (query_seen.all() and choice_seen.all()):
+        free_matches, free_scores = fuzzy_match(queries=[queries[i] for i in free_queries], choices=[choices[j] for j in free_choices], threshold=threshold, workers=workers,
+                                                allowed=~(query_seen[:, None] & choice_seen[None, :]))
+        for i, match, score in zip(free_queries, free_matches, free_scores):
+            matches[i], match_scores[i] = match, score
+
+    return matches, match_scores
+
+# Nombre canónico de cada fila emparejada: el de su entidad en el registro.
+# Solo se registran las filas con al menos dos ids emparejados con seguridad (las fuentes sin puntuación son la referencia de la fila);
+# las demás toman el nombre de su entidad si ya existe y si no conservan el suyo.
+def registry_names(registry: IdentityRegistry, kind: str, rows: list[dict], names: list, scores: list[dict]) -> list:
+
+    entity_ids = []
+    for row, name, row_scores in zip(rows, names, scores):
+        row = {source: source_id for source, source_id in row.items() if source_key(source_id) is not None}
+        confident = {source: source_id for source, source_id in row.items() if source not in row_scores or confident_score(row_scores[source])}
+
+        if len(confident) >= 2:
+            entity_ids.append(registry.link(kind=kind, source_ids=confident, name=name, scores=row_scores))
+        else:
+            entity_ids.append(registry.find(kind=kind, source_ids=row))
 
-    rows = []
-    for team in fm_list:
-        match_sw, score_sw, _ = process.extractOne(team, sw_list, scorer=fuzz.token_sort_ratio) if sw_list else ("", 0, "")
-        match_ss, score_ss, _ = process.extractOne(team, ss_list, scorer=fuzz.token_sort_ratio) if ss_list else ("", 0, "")
+    entity_names = registry.entity_names(entity_ids=[entity_id for entity_id in entity_ids if entity_id is not None])
 
-        rows.append({"fotmob": team, "scoresway": match_sw if score_sw >= threshold else None, "sofascore": match_ss if score_ss >= threshold else None})
+    return [entity_names.get(entity_id, name) for entity_id, name in zip(entity_ids, names)]
 
-    df = pd.DataFrame(rows)
-    if df.empty:
-        return pd.DataFrame(columns=["team", "fotmob", "scoresway", "sofascore"])
+# --------------------------------------------------------------------------------------
+# MATCH FUZZY DE EQUIPOS
+# --------------------------------------------------------------------------------------
+def match_teams(fm_list: list, sw_list: list, ss_list: list, threshold: int = 30, workers: int = 1, registry: IdentityRegistry = None) -> pd.DataFrame:
 
+    if not fm_list:
+        return pd.DataFrame(columns=["team", "fotmob", "scoresway", "sofascore", "score_scoresway", "score_sofascore"])
+
+    match_sw, score_sw = registry_match(queries=fm_list, choices=sw_list, threshold=threshold, registry=registry, kind="team", query_source="fotmob", choice_source="scoresway", workers=workers)
+    match_ss, score_ss = registry_match(queries=fm_list, choices=ss_list, threshold=threshold, registry=registry, kind="team", query_source="fotmob", choice_source="sofascore", workers=workers)
+
+    df = pd.DataFrame({"fotmob": fm_list, "scoresway": match_sw, "sofascore": match_ss, "score_scoresway": score_sw, "score_sofascore": score_ss})
     df.insert(0, "team", df["fotmob"].combine_first(df["sofascore"]).combine_first(df["scoresway"]))
+
+    if registry is not None:
+        rows = [{"fotmob": fm, "scoresway": sw, "sofascore": ss} for fm, sw, ss in zip(fm_list, match_sw, match_ss)]
+        scores = [{"scoresway": sw, "sofascore": ss} for sw, ss in zip(score_sw, score_ss)]
+        df["team"] = registry_names(registry=registry, kind="team", rows=rows, names=df["team"].tolist(), scores=scores)
+
     return df
 
 # --------------------------------------------------------------------------------------
 # MATCH FUZZY DE JUGADORES / MANAGERS
 # --------------------------------------------------------------------------------------
-def match_players(sw_list: list, ss_list: list, threshold: int = 10) -> pd.DataFrame:
+# sw_ids / ss_ids: id de cada nombre en su fuente; kind: "player" o "manager" en el registro.
+def match_players(sw_list: list, ss_list: list, threshold: int = 10, workers: int = 1, registry: IdentityRegistry = None, kind: str = "player", sw_ids: list = None, ss_ids: list = None) -> pd.DataFrame:
 
     sw_list = sw_list if sw_list is not None else []
     ss_list = ss_list if ss_list is not None else []
+    sw_ids = sw_list if sw_ids is None else sw_ids
+    ss_ids = ss_list if ss_ids is None else ss_ids
 
     if not ss_list and not sw_list:
-        return pd.DataFrame(columns=["player", "sofascore", "scoresway"])
+        return pd.DataFrame(columns=["player", "sofascore", "scoresway", "score"])
 
     if not ss_list:
         df = pd.DataFrame({"scoresway": sw_list})
         df["sofascore"] = np.nan
+        df["score"] = np.nan
         df.insert(0, "player", df["scoresway"])
+
+        if registry is not None:
+            df["player"] = registry_names(registry=registry, kind=kind, rows=[{"scoresway": sw_id} for sw_id in sw_ids], names=df["player"].tolist(), scores=[{}] * len(sw_ids))
         return df
 
-    rows = []
-    for player in ss_list:
-        match_sw, score_sw, _ = process.extractOne(player, sw_list, scorer=fuzz.token_sort_ratio) if sw_list else ("", 0, "")
-        rows.append({"sofascore": player, "scoresway": match_sw if score_sw >= threshold else np.nan})
+    match_sw, score_sw = registry_match(queries=ss_list, choices=sw_list, threshold=threshold, registry=registry, kind=kind, query_source="sofascore", choice_source="scoresway",
+                                        query_ids=ss_ids, choice_ids=sw_ids, workers=workers)
 
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame({"sofascore": ss_list, "scoresway": [match if match is not None else np.nan for match in match_sw], "score": score_sw})
     df.insert(0, "player", df["sofascore"].combine_first(df["scoresway"]))
+
+    if registry is not None:
+        sw_id_by_name = dict(zip(sw_list, sw_ids))
+        rows = [{"sofascore": ss_id, "scoresway": sw_id_by_name.get(match)} for ss_id, match in zip(ss_ids, match_sw)]
+        df["player"] = registry_names(registry=registry, kind=kind, rows=rows, names=df["player"].tolist(), scores=[{"scoresway": score} for score in score_sw])
+
     return df
 
 # --------------------------------------------------------------------------------------
@@ -263,7 +453,7 @@ def clean_unified_teams(df: pd.DataFrame) -> pd.DataFrame:
     df_cleaned["IdSS"] = pd.to_numeric(df_cleaned["IdSS"], errors="coerce").astype("Int64")
     df_cleaned["IdSW"] = pd.to_numeric(df_cleaned["IdSW"], errors="coerce").astype("Int64")
 
-    df_cleaned.insert(0, "Slug", df_cleaned["Name"].apply(create_slug))
+    df_cleaned.insert(0, "Slug", slugify_series(df_cleaned["Name"]))
     return df_cleaned
 
 # --------------------------------------------------------------------------------------
@@ -308,21 +498,29 @@ def unify_players_info(team: str, matched_players: pd.DataFrame, ss_df: pd.DataF
 
 # --------------------------------------------------------------------------------------
 # UNIFICACIÓN DE JUGADORES - Limpieza.
+# Admite los jugadores de varios equipos a la vez: HasSS indica si el equipo de la fila tenía datos de Sofascore
+# (los campos con alternativa en Scoresway solo la usan en ese caso) y TeamPos mantiene el orden de los equipos.
 # --------------------------------------------------------------------------------------
 def clean_unified_players(df: pd.DataFrame) -> pd.DataFrame:
 
     list_columns = df.columns
     df_cleaned = pd.DataFrame()
+    has_ss = df["HasSS"].astype(bool) if "HasSS" in list_columns else pd.Series(True, index=df.index)
+
+    def ss_or_sw(ss_col: str, sw_col: str):
+        if ss_col not in list_columns:
+            return df[sw_col] if sw_col in list_columns else np.nan
+        return df[ss_col].where(has_ss, df[sw_col]) if sw_col in list_columns else df[ss_col]
 
     df_cleaned["Name"] = df["PlayerName"]
     df_cleaned["Team"] = df["Team"]
-    df_cleaned["ShortName"] = df["shortName_ss"] if "shortName_ss" in list_columns else df["match_name_sw"] if "match_name_sw" in list_columns else np.nan
+    df_cleaned["ShortName"] = ss_or_sw("shortName_ss", "match_name_sw")
     df_cleaned["FirstName"] = df["first_name_sw"] if "first_name_sw" in list_columns else np.nan
     df_cleaned["SecondName"] = df["last_name_sw"] if "last_name_sw" in list_columns else np.nan
     df_cleaned["ShortFirstName"] = df["short_first_name_sw"] if "short_first_name_sw" in list_columns else np.nan
     df_cleaned["ShortSecondName"] = df["short_last_name_sw"] if "short_last_name_sw" in list_columns else np.nan
-    df_cleaned["Country"] = df["country_ss"] if "country_ss" in list_columns else df["nationality_sw"] if "nationality_sw" in list_columns else np.nan
-    df_cleaned["ShirtNumber"] = df["shirt_num_ss"] if "shirt_num_ss" in list_columns else df["shirt_number_sw"] if "shirt_number_sw" in list_columns else np.nan
+    df_cleaned["Country"] = ss_or_sw("country_ss", "nationality_sw")
+    df_cleaned["ShirtNumber"] = ss_or_sw("shirt_num_ss", "shirt_number_sw")
     df_cleaned["PrefFoot"] = df["pref_foot_ss"] if "pref_foot_ss" in list_columns else np.nan
     df_cleaned["Height"] = df["height_ss"] if "height_ss" in list_columns else np.nan
     df_cleaned["DateBirth"] = df["date_birth_ss"] if "date_birth_ss" in list_columns else np.nan
@@ -343,13 +541,36 @@ def clean_unified_players(df: pd.DataFrame) -> pd.DataFrame:
     df_cleaned["IdSS"] = pd.to_numeric(df_cleaned["IdSS"], errors="coerce").astype("Int64")
     df_cleaned["IdSW"] = pd.to_numeric(df_cleaned["IdSW"], errors="coerce").astype("Int64")
 
-    df_cleaned.insert(0, "Slug", df_cleaned["Name"].apply(create_slug))
-    return df_cleaned.sort_values(by="ShirtNumber", na_position="last").reset_index(drop=True)
+    df_cleaned.insert(0, "Slug", slugify_series(df_cleaned["Name"]))
+
+    if "TeamPos" not in list_columns:
+        return df_cleaned.sort_values(by="ShirtNumber", na_position="last").reset_index(drop=True)
+
+    df_cleaned["TeamPos"] = df["TeamPos"]
+    df_cleaned = df_cleaned.sort_values(by=["TeamPos", "ShirtNumber"], na_position="last", kind="stable")
+    return df_cleaned.drop(columns="TeamPos").reset_index(drop=True)
+
+# --------------------------------------------------------------------------------------
+# NOMBRES E IDS - Nombres distintos de una tabla (en orden de aparición) y el id en la fuente de cada uno.
+# --------------------------------------------------------------------------------------
+def names_and_ids(df: pd.DataFrame, name_col: str, id_col: str, unique: bool = True) -> tuple[list, list]:
+
+    if df is None or df.empty:
+        return [], []
+
+    df = df.dropna(subset=[name_col])
+    if unique:
+        df = df.drop_duplicates(subset=[name_col])
+
+    names = df[name_col].tolist()
+    return names, df[id_col].tolist() if id_col in df.columns else names
 
 # --------------------------------------------------------------------------------------
 # UNIFICACIÓN DE JUGADORES - Creación del Dataframe.
+# Cada fuente se parte una sola vez por equipo; con workers > 1 los equipos se emparejan en un pool de hilos
+# (el registro de identidades comparte una conexión SQLite) y la limpieza se hace una vez sobre todos los jugadores.
 # --------------------------------------------------------------------------------------
-def create_players_info_df(matched_teams: pd.DataFrame, sw_players_df: pd.DataFrame, ss_players_df: pd.DataFrame) -> pd.DataFrame:
+def create_players_info_df(matched_teams: pd.DataFrame, sw_players_df: pd.DataFrame, ss_players_df: pd.DataFrame, registry: IdentityRegistry = None, workers: int = 1) -> pd.DataFrame:
 
     sw_to_team = matched_teams.set_index("longname_scoresway")["team"].dropna().to_dict() if "longname_scoresway" in matched_teams.columns else {}
     ss_to_team = matched_teams.set_index("sofascore")["team"].dropna().to_dict() if "sofascore" in matched_teams.columns else {}
@@ -364,26 +585,33 @@ def create_players_info_df(matched_teams: pd.DataFrame, sw_players_df: pd.DataFr
         ss_players_df["TeamName"] = ss_players_df["teamName"].map(ss_to_team)
         ss_players_df = ss_players_df.rename(columns={c: f"{c}_ss" for c in ss_players_df.columns if c != "TeamName"})
 
-    list_teams = []
-
-    for team in matched_teams["team"].dropna().tolist():
-        sw_players_df_ = sw_players_df.loc[sw_players_df["TeamName"] == team] if sw_players_df is not None else None
-        ss_players_df_ = ss_players_df.loc[ss_players_df["TeamName"] == team] if ss_players_df is not None else None
+    # Una sola partición por equipo de cada fuente en lugar de filtrar las tablas completas para cada equipo
+    sw_parts = dict(tuple(sw_players_df.groupby("TeamName", sort=False))) if sw_players_df is not None and not sw_players_df.empty else {}
+    ss_parts = dict(tuple(ss_players_df.groupby("TeamName", sort=False))) if ss_players_df is not None and not ss_players_df.empty else {}
 
-        if sw_players_df_ is not None and sw_players_df_.empty:
-            sw_players_df_ = None
-        if ss_players_df_ is not None and ss_players_df_.empty:
-            ss_players_df_ = None
+    def team_players(team_pos: int, team: str) -> pd.DataFrame:
+        sw_players_df_, ss_players_df_ = sw_parts.get(team), ss_parts.get(team)
 
-        players_names_sw = sw_players_df_["match_name_sw"].dropna().unique().tolist() if sw_players_df_ is not None else []
-        players_names_ss = ss_players_df_["playerName_ss"].dropna().unique().tolist() if ss_players_df_ is not None else []
+        players_names_sw, players_ids_sw = names_and_ids(df=sw_players_df_, name_col="match_name_sw", id_col="id_sw")
+        players_names_ss, players_ids_ss = names_and_ids(df=ss_players_df_, name_col="playerName_ss", id_col="playerId_ss")
 
-        matched_players = match_players(sw_list=players_names_sw, ss_list=players_names_ss)
+        matched_players = match_players(sw_list=players_names_sw, ss_list=players_names_ss, registry=registry, kind="player", sw_ids=players_ids_sw, ss_ids=players_ids_ss)
         unified_players_df = unify_players_info(team=team, matched_players=matched_players, ss_df=ss_players_df_, sw_df=sw_players_df_)
-        cleaned_players_df = clean_unified_players(df=unified_players_df)
-        list_teams.append(cleaned_players_df)
+        unified_players_df["HasSS"] = ss_players_df_ is not None
+        unified_players_df["TeamPos"] = team_pos
+        return unified_players_df
+
+    teams = matched_teams["team"].dropna().tolist()
+    if not teams:
+        return pd.DataFrame()
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list_teams = list(executor.map(team_players, range(len(teams)), teams))
+    else:
+        list_teams = [team_players(team_pos=team_pos, team=team) for team_pos, team in enumerate(teams)]
 
-    return pd.concat(list_teams, ignore_index=True) if list_teams else pd.DataFrame()
+    return clean_unified_players(df=pd.concat(list_teams, ignore_index=True))
 
 # --------------------------------------------------------------------------------------
 # UNIFICACIÓN DE MANAGERS - Información.
@@ -449,24 +677,22 @@ def clean_unified_managers(df: pd.DataFrame) -> pd.DataFrame:
     for col in ["Matches", "Wins", "Draws", "Losses", "GoalsFor", "GoalsAgainst", "Points", "IdSS", "IdSW"]:
         df_cleaned[col] = pd.to_numeric(df_cleaned[col], errors="coerce").astype("Int64")
 
-    df_cleaned.insert(0, "Slug", df_cleaned["Name"].apply(create_slug))
+    df_cleaned.insert(0, "Slug", slugify_series(df_cleaned["Name"]))
     return df_cleaned
 
 # --------------------------------------------------------------------------------------
 # UNIFICACIÓN DE MANAGERS - Creación del Dataframe.
 # --------------------------------------------------------------------------------------
-def create_managers_info_df(teams_df: pd.DataFrame, sw_managers_df: pd.DataFrame, ss_managers_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def create_managers_info_df(teams_df: pd.DataFrame, sw_managers_df: pd.DataFrame, ss_managers_df: pd.DataFrame, registry: IdentityRegistry = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
 
     if sw_managers_df is not None and not sw_managers_df.empty:
         sw_managers_df = sw_managers_df.copy()
         sw_managers_df["manager_name"] = (sw_managers_df["short_first_name"].fillna("") + " " + sw_managers_df["short_last_name"].fillna("")).str.strip()
-        list_sw = sw_managers_df["manager_name"].dropna().tolist()
-    else:
-        list_sw = []
 
-    list_ss = ss_managers_df["name"].dropna().tolist() if ss_managers_df is not None and not ss_managers_df.empty else []
+    list_sw, ids_sw = names_and_ids(df=sw_managers_df, name_col="manager_name", id_col="id", unique=False)
+    list_ss, ids_ss = names_and_ids(df=ss_managers_df, name_col="name", id_col="id", unique=False)
 
-    matched_managers = match_players(sw_list=list_sw, ss_list=list_ss)
+    matched_managers = match_players(sw_list=list_sw, ss_list=list_ss, registry=registry, kind="manager", sw_ids=ids_sw, ss_ids=ids_ss)
     managers_df = unify_managers_info(matched_managers=matched_managers, sw_df=sw_managers_df, ss_df=ss_managers_df)
     managers_df = clean_unified_managers(df=managers_df)
 
@@ -489,7 +715,7 @@ def create_venues_info_df(teams_df: pd.DataFrame, ss_venues_df: pd.DataFrame) ->
     venues_df.columns = ["IdSS", "Name", "Capacity", "City", "Latitude", "Longitude"]
     venues_df = venues_df[["Name", "Capacity", "City", "Latitude", "Longitude", "IdSS"]]
     venues_df["IdSS"] = pd.to_numeric(venues_df["IdSS"], errors="coerce").astype("Int64")
-    venues_df.insert(0, "Slug", venues_df["Name"].apply(create_slug))
+    venues_df.insert(0, "Slug", slugify_series(venues_df["Name"]))
 
     venues_name_dict = venues_df.set_index("IdSS")["Slug"].dropna().to_dict()
     teams_df = teams_df.copy()
@@ -585,7 +811,7 @@ def clean_standing(df: pd.DataFrame, rank_status: bool = True) -> pd.DataFrame:
         df_cleaned[col] = pd.to_numeric(df_cleaned[col], errors="coerce").astype("Int64")
 
     df_cleaned["GoalDiff"] = df_cleaned["GoalsFor"] - df_cleaned["GoalsAgainst"]
-    df_cleaned["Team"] = df_cleaned["Team"].apply(create_slug)
+    df_cleaned["Team"] = slugify_series(df_cleaned["Team"])
 
     if rank_status:
         df_cleaned.insert(2, "Status", df["promotion_ss"] if "promotion_ss" in df.columns else np.nan)
@@ -648,7 +874,7 @@ def create_expected_standing_table(matched_teams: pd.DataFrame, df: pd.DataFrame
 
     df_clean.columns = ["name", "ExpectedGoalsFor", "ExpectedGoalsAgainst", "ExpectedPoints", "Rank", "ExpectedGoalsForDiff", "ExpectedGoalsAgainstDiff", "ExpectedPointsDiff", "ExpectedRank", "ExpectedRankDiff", "Team"]
     df_clean = df_clean[["Team", "Rank", "ExpectedRank", "ExpectedRankDiff", "ExpectedPoints", "ExpectedPointsDiff", "ExpectedGoalsFor", "ExpectedGoalsAgainst", "ExpectedGoalsAgainstDiff", "ExpectedPointsDiff"]]
-    df_clean["Team"] = df_clean["Team"].apply(create_slug)
+    df_clean["Team"] = slugify_series(df_clean["Team"])
 
     return df_clean.sort_values(by="ExpectedRank", na_position="last").reset_index(drop=True)
 
@@ -671,15 +897,158 @@ def add_goals(matches_df: pd.DataFrame, team_stats_df: pd.DataFrame) -> pd.DataF
 
     return team_stats_df.drop(columns=["HomeScore", "AwayScore", "Slug"])
 
+# --------------------------------------------------------------------------------------
+# PLAN DE ESQUEMA DE ESTADÍSTICAS - cols_map.json, cols_order.json y positions_map.json compilados una vez por proceso.
+# Cada columna destino queda como fila de una matriz de índices a sus columnas candidatas (en orden de prioridad),
+# de modo que la primera no nula de todas las columnas se obtiene con una sola operación sobre el array 2-D de la tabla.
+# --------------------------------------------------------------------------------------
+STATS_NOT_INTEGER_COLS = {"team": ["Match", "Team", "Opponent", "HomeAway", "Kit", "Formation", "Manager", "AverageAge", "ExpectedGoals", "GoalsPrevented"],
+                          "player": ["Match", "Team", "Opponent", "Player", "HomeAway", "Starter", "Position", "PositionSide", "SubPosition", "Rating", "ExpectedAssists", "TotalBallCarriesDistance",
+                                     "TotalProgression", "BestBallCarryProgression", "TotalProgressiveBallCarriesDistance", "PassValue", "DribbleValue", "DefensiveValue", "ExpectedGoals", "ShotValue",
+                                     "ExpectedGoalsOnTarget", "KeeperSaveValue", "GoalkeeperValue", "GoalsPrevented"]}
+STATS_NOT_FILL_NA_COLS = {"team": ["Match", "Team", "Opponent", "HomeAway", "Kit", "Formation", "Manager", "AverageAge"],
+                          "player": ["Match", "Team", "Opponent", "Player", "HomeAway", "Starter", "Position", "PositionSide", "SubPosition", "ShirtNumber"]}
+
+class StatsSchemaPlan:
+
+    def __init__(self, stats_type: str):
+
+        stats_path = os.path.join(utils, f"{stats_type}_stats_proc")
+        with open(os.path.join(stats_path, "cols_map.json"), "r", encoding="utf-8") as f:
+            self.cols_map = jsonlib.load(f)
+        with open(os.path.join(stats_path, "cols_order.json"), "r", encoding="utf-8") as f:
+            self.cols_order = jsonlib.load(f)
+
+        positions_path = os.path.join(stats_path, "positions_map.json")
+        self.positions_map = {}
+        if os.path.exists(positions_path):
+            with open(positions_path, "r", encoding="utf-8") as f:
+                self.positions_map = jsonlib.load(f)
+
+        # Los destinos que no salen en cols_order se descartarían al final, así que no se calculan
+        self.targets = [col for col in self.cols_map if col in self.cols_order]
+        self.sources = list(dict.fromkeys(c for possible_cols in self.cols_map.values() for c in possible_cols))
+
+        # Matriz (destinos x candidatas) de posiciones en sources; el hueco de relleno apunta a len(sources), una columna vacía
+        source_pos = {source: pos for pos, source in enumerate(self.sources)}
+        width = max((len(self.cols_map[col]) for col in self.targets), default=1)
+        self.candidates = np.full((len(self.targets), width), len(self.sources), dtype=np.intp)
+        for i, col in enumerate(self.targets):
+            self.candidates[i, :len(self.cols_map[col])] = [source_pos[c] for c in self.cols_map[col]]
+
+        self.integer = np.array([col not in STATS_NOT_INTEGER_COLS[stats_type] for col in self.targets], dtype=bool)
+        self.fill_na = np.array([col not in STATS_NOT_FILL_NA_COLS[stats_type] for col in self.targets], dtype=bool)
+
+    # Tipo de cada destino igual que al rellenar hacia atrás sus candidatas existentes: el de la columna si es una, el común numérico o object
+    def target_dtypes(self, df: pd.DataFrame, present: list) -> list:
+
+        present = set(present)
+        dtypes = []
+        for col in self.targets:
+            existing = [df[c].dtype for c in self.cols_map[col] if c in present]
+            if not existing:
+                dtypes.append(np.dtype("float64"))
+            elif len(existing) == 1:
+                dtypes.append(existing[0])
+            elif all(isinstance(dtype, np.dtype) and dtype.kind in "iuf" for dtype in existing):
+                dtypes.append(np.result_type(*existing))
+            else:
+                dtypes.append(np.dtype("object"))
+
+        return dtypes
+
+    # Columnas destino {columna: valores} ya convertidas (enteros como Int64) y con los nulos rellenados a 0 donde corresponde
+    def coalesce(self, df: pd.DataFrame) -> dict:
+
+        present = [c for c in self.sources if c in df.columns]
+        block = df[present].to_numpy() if present else np.empty((len(df), 0))
+        if block.dtype.kind not in "f":
+            block = block.astype(object) if block.dtype.kind not in "iub" else block.astype(np.float64)
+        block = np.concatenate([block, np.full((len(df), 1), np.nan, dtype=block.dtype)], axis=1)
+
+        block_pos = np.full(len(self.sources) + 1, len(present), dtype=np.intp)
+        block_pos[[self.sources.index(c) for c in present]] = np.arange(len(present))
+
+        # (filas x destinos x candidatas) -> primera candidata no nula de cada destino
+        stacked = block[:, block_pos[self.candidates]]
+        not_null = ~pd.isna(stacked) if block.dtype == object else ~np.isnan(stacked)
+        first = not_null.argmax(axis=2)
+        values = np.take_along_axis(stacked, first[:, :, None], axis=2)[:, :, 0]
+
+        dtypes = self.target_dtypes(df=df, present=present)
+        if values.dtype == object:
+            return self.cast_columns(values=values, dtypes=dtypes, index=df.index)
+
+        # Con todas las candidatas numéricas la conversión y el relleno se hacen sobre el bloque entero
+        missing = np.isnan(values)
+        values = np.asfortranarray(np.where(missing & self.fill_na, 0, values))
+        missing = np.asfortranarray(missing & ~self.fill_na)
+
+        # Valores no enteros en una columna entera: se deja que la conversión de pandas dé su error
+        integer_values = values[:, self.integer]
+        valid_values = integer_values[~missing[:, self.integer]]
+        if not (np.isfinite(valid_values).all() and np.array_equal(valid_values, np.trunc(valid_values))):
+            return self.cast_columns(values=np.where(missing, np.nan, values), dtypes=dtypes, index=df.index)
+        integer_values = np.asfortranarray(np.where(missing[:, self.integer], 0, integer_values).astype(np.int64))
+
+        columns = {}
+        integer_pos = 0
+        for i, col in enumerate(self.targets):
+            if self.integer[i]:
+                columns[col] = pd.Series(pd.arrays.IntegerArray(integer_values[:, integer_pos], missing[:, i]), index=df.index)
+                integer_pos += 1
+            else:
+                columns[col] = pd.Series(values[:, i], index=df.index).astype(dtypes[i])
+
+        return columns
+
+    # Conversión columna a columna (candidatas con texto u otros tipos no numéricos)
+    def cast_columns(self, values: np.ndarray, dtypes: list, index: pd.Index) -> dict:
+
+        columns = {}
+        for i, col in enumerate(self.targets):
+            column = pd.Series(values[:, i], index=index, dtype=dtypes[i] if values.dtype == object else None)
+            if self.integer[i]:
+                column = pd.to_numeric(column, errors="coerce").astype("Int64")
+            columns[col] = column.fillna(0) if self.fill_na[i] else column
+
+        return columns
+
+_stats_plans = {}
+_stats_plans_lock = threading.Lock()
+
+def stats_schema_plan(stats_type: str) -> StatsSchemaPlan:
+
+    with _stats_plans_lock:
+        if stats_type not in _stats_plans:
+            _stats_plans[stats_type] = StatsSchemaPlan(stats_type=stats_type)
+        return _stats_plans[stats_type]
+
+# --------------------------------------------------------------------------------------
+# FORMACIÓN - "4-3-3" a partir de cualquier formato de la fuente (433, 433.0, "4-3-3"...); se calcula una vez por valor distinto.
+# --------------------------------------------------------------------------------------
+def formation_str(value) -> str | float:
+
+    digits = re.sub(r"[^0-9]", "", str(value).replace(".0", ""))
+    return "-".join(digits) if digits != "" else np.nan
+
+def clean_formations(formations: pd.Series) -> pd.Series:
+
+    if not isinstance(formations, pd.Series):
+        return formations
+
+    uniques = formations.dropna().unique()
+    return formations.map(dict(zip(uniques, map(formation_str, uniques))))
+
 # --------------------------------------------------------------------------------------
 # ESTADÍSTICAS DE EQUIPO
 # --------------------------------------------------------------------------------------
-def team_stats_proc(df: pd.DataFrame, managers_dict: dict, cols_map: dict, cols_order: list) -> pd.DataFrame:
+def team_stats_proc(df: pd.DataFrame, managers_dict: dict, plan: StatsSchemaPlan) -> pd.DataFrame:
 
     if df is None or df.empty:
-        return pd.DataFrame(columns=cols_order)
+        return pd.DataFrame(columns=plan.cols_order)
 
-    df_cleaned = pd.DataFrame()
+    df_cleaned = pd.DataFrame(index=df.index)
     list_columns = df.columns
 
     df_cleaned["Match"] = df["MatchSlug"]
@@ -688,43 +1057,23 @@ def team_stats_proc(df: pd.DataFrame, managers_dict: dict, cols_map: dict, cols_
 
     df_cleaned["HomeAway"] = df["ha_ss"] if "ha_ss" in list_columns else df["ha_sw"] if "ha_sw" in list_columns else np.nan
     df_cleaned["Kit"] = df["kit_sw"] if "kit_sw" in list_columns else np.nan
-    df_cleaned["Formation"] = df["formation_sw"] if "formation_sw" in list_columns else np.nan
+    df_cleaned["Formation"] = clean_formations(df["formation_sw"]) if "formation_sw" in list_columns else np.nan
     df_cleaned["Manager"] = df["manager_sw"].map(managers_dict) if "manager_sw" in list_columns else np.nan
     df_cleaned["AverageAge"] = df["average_age_sw"] if "average_age_sw" in list_columns else np.nan
 
-    for col, possible_cols in cols_map.items():
-        existing_cols = [c for c in possible_cols if c in list_columns]
-        if existing_cols:
-            df_cleaned[col] = df[existing_cols].bfill(axis=1).iloc[:, 0]
-        else:
-            df_cleaned[col] = np.nan
-
-    not_integer_cols = ["Match", "Team", "Opponent", "HomeAway", "Kit", "Formation", "Manager", "AverageAge", "ExpectedGoals", "GoalsPrevented"]
-    for c in df_cleaned.columns:
-        if c not in not_integer_cols:
-            df_cleaned[c] = pd.to_numeric(df_cleaned[c], errors="coerce").astype("Int64")
-
-    not_fill_na_cols = ["Match", "Team", "Opponent", "HomeAway", "Kit", "Formation", "Manager", "AverageAge"]
-    fill_na_cols = [c for c in df_cleaned.columns if c not in not_fill_na_cols]
-    df_cleaned[fill_na_cols] = df_cleaned[fill_na_cols].fillna(0)
-
-    df_cleaned["Formation"] = df_cleaned["Formation"].apply(lambda x: "-".join(re.sub(r"[^0-9]", "", str(x).replace(".0", ""))) if pd.notna(x) and re.sub(r"[^0-9]", "", str(x).replace(".0", "")) != "" else np.nan)
-
-    for col in cols_order:
-        if col not in df_cleaned.columns:
-            df_cleaned[col] = np.nan
+    df_cleaned = pd.concat([df_cleaned, pd.DataFrame(plan.coalesce(df=df), index=df.index)], axis=1)
 
-    return df_cleaned[cols_order]
+    return df_cleaned.reindex(columns=plan.cols_order)
 
 # --------------------------------------------------------------------------------------
 # ESTADÍSTICAS DE JUGADOR
 # --------------------------------------------------------------------------------------
-def player_stats_proc(df: pd.DataFrame, cols_map: dict, cols_order: list, positions_dict: dict) -> pd.DataFrame:
+def player_stats_proc(df: pd.DataFrame, plan: StatsSchemaPlan) -> pd.DataFrame:
 
     if df is None or df.empty:
-        return pd.DataFrame(columns=cols_order)
+        return pd.DataFrame(columns=plan.cols_order)
 
-    df_cleaned = pd.DataFrame()
+    df_cleaned = pd.DataFrame(index=df.index)
     list_columns = df.columns
 
     df_cleaned["Match"] = df["MatchSlug"]
@@ -741,31 +1090,67 @@ def player_stats_proc(df: pd.DataFrame, cols_map: dict, cols_order: list, positi
 
     df_cleaned["Position"] = np.where(df_cleaned["Position"] == "Substitute", df_cleaned["SubPosition"], df_cleaned["Position"].fillna("") + " " + df_cleaned["PositionSide"].fillna(""))
     df_cleaned["Position"] = df_cleaned["Position"].replace("", "Undefined")
-    df_cleaned["Position"] = df_cleaned["Position"].map(positions_dict).fillna("Undefined")
+    df_cleaned["Position"] = df_cleaned["Position"].map(plan.positions_map).fillna("Undefined")
+    df_cleaned["ShirtNumber"] = pd.to_numeric(df_cleaned["ShirtNumber"], errors="coerce").astype("Int64")
 
-    for col, possible_cols in cols_map.items():
-        existing_cols = [c for c in possible_cols if c in list_columns]
-        if existing_cols:
-            df_cleaned[col] = df[existing_cols].bfill(axis=1).iloc[:, 0]
-        else:
-            df_cleaned[col] = np.nan
+    df_cleaned = pd.concat([df_cleaned, pd.DataFrame(plan.coalesce(df=df), index=df.index)], axis=1)
+
+    return df_cleaned.reindex(columns=plan.cols_order)
+
+# --------------------------------------------------------------------------------------
+# ETIQUETADO DE FILAS POR PARTIDO - Asigna a cada fila de una fuente la posición y el slug del partido unificado.
+# --------------------------------------------------------------------------------------
+def tag_match_rows(df: pd.DataFrame, match_ids: pd.Series, match_slugs: pd.Series, suffix: str) -> pd.DataFrame:
+
+    if df is None or df.empty:
+        return None
+
+    match_pos = {}
+    for pos, match_id in enumerate(match_ids.tolist()):
+        if pd.notna(match_id):
+            match_pos.setdefault(match_id, []).append(pos)
 
-    not_integer_cols = ["Match", "Team", "Opponent", "Player", "HomeAway", "Starter", "Position", "PositionSide", "SubPosition", "Rating", "ExpectedAssists", "TotalBallCarriesDistance", "TotalProgression", 
-                        "BestBallCarryProgression", "TotalProgressiveBallCarriesDistance", "PassValue", "DribbleValue", "DefensiveValue", "ExpectedGoals", "ShotValue", "ExpectedGoalsOnTarget", 
-                        "KeeperSaveValue", "GoalkeeperValue", "GoalsPrevented"]
-    for c in df_cleaned.columns:
-        if c not in not_integer_cols:
-            df_cleaned[c] = pd.to_numeric(df_cleaned[c], errors="coerce").astype("Int64")
+    tagged_df = df.rename(columns={c: f"{c}{suffix}" for c in df.columns})
+    tagged_df.insert(0, "MatchPos", df["match_id"].map(match_pos))
+    tagged_df = tagged_df.dropna(subset=["MatchPos"])
 
-    not_fill_na_cols = ["Match", "Team", "Opponent", "Player", "HomeAway", "Starter", "Position", "PositionSide", "SubPosition", "ShirtNumber"]
-    fill_na_cols = [c for c in df_cleaned.columns if c not in not_fill_na_cols]
-    df_cleaned[fill_na_cols] = df_cleaned[fill_na_cols].fillna(0)
+    if tagged_df.empty:
+        return None
 
-    for col in cols_order:
-        if col not in df_cleaned.columns:
-            df_cleaned[col] = np.nan
+    tagged_df = tagged_df.explode("MatchPos")
+    tagged_df["MatchPos"] = tagged_df["MatchPos"].astype(int)
+    tagged_df = tagged_df.sort_values(by="MatchPos", kind="stable")
+    tagged_df.insert(1, "MatchSlug", match_slugs.to_numpy()[tagged_df["MatchPos"].to_numpy()])
 
-    return df_cleaned[cols_order]
+    return tagged_df
+
+# --------------------------------------------------------------------------------------
+# UNIÓN DE FUENTES POR PARTIDO - Une las filas de Sofascore y Scoresway de todos los partidos en una sola operación.
+# --------------------------------------------------------------------------------------
+def merge_match_sources(ss_df: pd.DataFrame, sw_df: pd.DataFrame, keys: list) -> pd.DataFrame:
+
+    if ss_df is None:
+        return sw_df
+    if sw_df is None:
+        return ss_df
+
+    in_both = np.intersect1d(ss_df["MatchPos"].unique(), sw_df["MatchPos"].unique())
+    ss_in_both = ss_df["MatchPos"].isin(in_both)
+    sw_in_both = sw_df["MatchPos"].isin(in_both)
+
+    merged_df = ss_df[ss_in_both].merge(sw_df[sw_in_both], how="outer", on=["MatchPos", "MatchSlug"] + keys, suffixes=("", "_dup"))
+    merged_df["Opponent"] = merged_df["Opponent"].combine_first(merged_df.get("Opponent_dup"))
+    merged_df = merged_df.drop(columns=[c for c in merged_df.columns if c.endswith("_dup")], errors="ignore")
+
+    # Los partidos con una sola fuente conservan el orden original de sus filas, igual que al procesarlos uno a uno.
+    raw_df = pd.concat([merged_df, ss_df[~ss_in_both], sw_df[~sw_in_both]], ignore_index=True)
+    raw_df = raw_df.sort_values(by="MatchPos", kind="stable")
+
+    # En los partidos sin datos de Sofascore el lado (h/a) se toma de Scoresway.
+    if "ha_ss" in raw_df.columns and "ha_sw" in raw_df.columns:
+        raw_df["ha_ss"] = raw_df["ha_ss"].where(raw_df["MatchPos"].isin(ss_df["MatchPos"]), raw_df["ha_sw"])
+
+    return raw_df
 
 # --------------------------------------------------------------------------------------
 # UNIFICACIÓN DE ESTADÍSTICAS DE PARTIDO
@@ -778,96 +1163,88 @@ def matches_proc(matches_df: pd.DataFrame, players_df: pd.DataFrame, teams_df: p
     sw_player_dict = players_df.set_index("IdSW")["Slug"].dropna().to_dict() if not players_df.empty else {}
     sw_managers_dict = managers_df.set_index("IdSW")["Slug"].dropna().to_dict() if not managers_df.empty and "IdSW" in managers_df.columns else {}
 
-    teams_stats_list = []
-    players_stats_list = []
-
-    with open(os.path.join(utils, "team_stats_proc", "cols_map.json"), "r", encoding="utf-8") as f:
-        teams_cols_map = jsonlib.load(f)
-    with open(os.path.join(utils, "team_stats_proc", "cols_order.json"), "r", encoding="utf-8") as f:
-        teams_cols_order = jsonlib.load(f)
-    with open(os.path.join(utils, "player_stats_proc", "cols_map.json"), "r", encoding="utf-8") as f:
-        players_cols_map = jsonlib.load(f)
-    with open(os.path.join(utils, "player_stats_proc", "cols_order.json"), "r", encoding="utf-8") as f:
-        players_cols_order = jsonlib.load(f)
-    with open(os.path.join(utils, "player_stats_proc", "positions_map.json"), "r", encoding="utf-8") as f:
-        positions_dict = jsonlib.load(f)
+    team_plan, player_plan = stats_schema_plan(stats_type="team"), stats_schema_plan(stats_type="player")
 
     if matches_df is None or matches_df.empty:
-        return pd.DataFrame(columns=teams_cols_order), pd.DataFrame(columns=players_cols_order)
-
-    for _, row in matches_df.iterrows():
-        id_ss = row["IdSS"]
-        id_sw = row["IdSW"]
-        slug = row["Slug"]
-
-        dfs_teams = []
-        dfs_players = []
-
-        ss_part_team = ss_team[ss_team["match_id"] == id_ss] if ss_team is not None and pd.notna(id_ss) else None
-        if ss_part_team is not None and not ss_part_team.empty:
-            ss_part_team = ss_part_team.copy().rename(columns={c: f"{c}_ss" for c in ss_part_team.columns})
-            ss_part_team.insert(0, "MatchSlug", slug)
-            ss_part_team.insert(1, "Team", ss_part_team["team_id_ss"].map(ss_team_dict))
-            ss_part_team.insert(2, "Opponent", ss_part_team["opponent_team_id_ss"].map(ss_team_dict))
-            dfs_teams.append(ss_part_team)
-
-        sw_part_team = sw_team[sw_team["match_id"] == id_sw] if sw_team is not None and pd.notna(id_sw) else None
-        if sw_part_team is not None and not sw_part_team.empty:
-            sw_part_team = sw_part_team.copy().rename(columns={c: f"{c}_sw" for c in sw_part_team.columns})
-            sw_part_team.insert(0, "MatchSlug", slug)
-            sw_part_team.insert(1, "Team", sw_part_team["team_id_sw"].map(sw_team_dict))
-            sw_part_team.insert(2, "Opponent", np.nan)
-            dfs_teams.append(sw_part_team)
-
-        ss_part_player = ss_player[ss_player["match_id"] == id_ss] if ss_player is not None and pd.notna(id_ss) else None
-        if ss_part_player is not None and not ss_part_player.empty:
-            ss_part_player = ss_part_player.copy().rename(columns={c: f"{c}_ss" for c in ss_part_player.columns})
-            ss_part_player.insert(0, "MatchSlug", slug)
-            ss_part_player.insert(1, "Team", ss_part_player["team_id_ss"].map(ss_team_dict))
-            ss_part_player.insert(2, "Opponent", ss_part_player["opponent_team_id_ss"].map(ss_team_dict))
-            ss_part_player.insert(3, "Player", ss_part_player["player_id_ss"].map(ss_player_dict))
-            dfs_players.append(ss_part_player)
-
-        sw_part_player = sw_player[sw_player["match_id"] == id_sw] if sw_player is not None and pd.notna(id_sw) else None
-        if sw_part_player is not None and not sw_part_player.empty:
-            sw_part_player = sw_part_player.copy().rename(columns={c: f"{c}_sw" for c in sw_part_player.columns})
-            sw_part_player.insert(0, "MatchSlug", slug)
-            sw_part_player.insert(1, "Team", sw_part_player["team_id_sw"].map(sw_team_dict))
-            sw_part_player.insert(2, "Opponent", np.nan)
-            sw_part_player.insert(3, "Player", sw_part_player["playerId_sw"].map(sw_player_dict))
-            dfs_players.append(sw_part_player)
-
-        if len(dfs_teams) == 2:
-            raw_team_stats_df = dfs_teams[0].merge(dfs_teams[1], how="outer", on=["MatchSlug", "Team"], suffixes=("", "_dup"))
-            raw_team_stats_df["Opponent"] = raw_team_stats_df["Opponent"].combine_first(raw_team_stats_df.get("Opponent_dup"))
-            raw_team_stats_df = raw_team_stats_df.drop(columns=[c for c in raw_team_stats_df.columns if c.endswith("_dup")], errors="ignore")
-        elif len(dfs_teams) == 1:
-            raw_team_stats_df = dfs_teams[0]
-        else:
-            raw_team_stats_df = None
-
-        if len(dfs_players) == 2:
-            raw_player_stats_df = dfs_players[0].merge(dfs_players[1], how="outer", on=["MatchSlug", "Team", "Player"], suffixes=("", "_dup"))
-            raw_player_stats_df["Opponent"] = raw_player_stats_df["Opponent"].combine_first(raw_player_stats_df.get("Opponent_dup"))
-            raw_player_stats_df = raw_player_stats_df.drop(columns=[c for c in raw_player_stats_df.columns if c.endswith("_dup")], errors="ignore")
-        elif len(dfs_players) == 1:
-            raw_player_stats_df = dfs_players[0]
-        else:
-            raw_player_stats_df = None
+        return pd.DataFrame(columns=team_plan.cols_order), pd.DataFrame(columns=player_plan.cols_order)
+
+    slugs = matches_df["Slug"]
+
+    ss_part_team = tag_match_rows(df=ss_team, match_ids=matches_df["IdSS"], match_slugs=slugs, suffix="_ss")
+    if ss_part_team is not None:
+        ss_part_team.insert(2, "Team", ss_part_team["team_id_ss"].map(ss_team_dict))
+        ss_part_team.insert(3, "Opponent", ss_part_team["opponent_team_id_ss"].map(ss_team_dict))
+
+    sw_part_team = tag_match_rows(df=sw_team, match_ids=matches_df["IdSW"], match_slugs=slugs, suffix="_sw")
+    if sw_part_team is not None:
+        sw_part_team.insert(2, "Team", sw_part_team["team_id_sw"].map(sw_team_dict))
+        sw_part_team.insert(3, "Opponent", np.nan)
 
-        clean_team_stats_df = team_stats_proc(df=raw_team_stats_df, managers_dict=sw_managers_dict, cols_map=teams_cols_map, cols_order=teams_cols_order)
-        clean_player_stats_df = player_stats_proc(df=raw_player_stats_df, cols_map=players_cols_map, cols_order=players_cols_order, positions_dict=positions_dict)
+    ss_part_player = tag_match_rows(df=ss_player, match_ids=matches_df["IdSS"], match_slugs=slugs, suffix="_ss")
+    if ss_part_player is not None:
+        ss_part_player.insert(2, "Team", ss_part_player["team_id_ss"].map(ss_team_dict))
+        ss_part_player.insert(3, "Opponent", ss_part_player["opponent_team_id_ss"].map(ss_team_dict))
+        ss_part_player.insert(4, "Player", ss_part_player["player_id_ss"].map(ss_player_dict))
 
-        if not clean_team_stats_df.empty:
-            teams_stats_list.append(clean_team_stats_df)
-        if not clean_player_stats_df.empty:
-            players_stats_list.append(clean_player_stats_df)
+    sw_part_player = tag_match_rows(df=sw_player, match_ids=matches_df["IdSW"], match_slugs=slugs, suffix="_sw")
+    if sw_part_player is not None:
+        sw_part_player.insert(2, "Team", sw_part_player["team_id_sw"].map(sw_team_dict))
+        sw_part_player.insert(3, "Opponent", np.nan)
+        sw_part_player.insert(4, "Player", sw_part_player["playerId_sw"].map(sw_player_dict))
 
-    team_stats_df = pd.concat(teams_stats_list, ignore_index=True) if teams_stats_list else pd.DataFrame(columns=teams_cols_order)
-    player_stats_df = pd.concat(players_stats_list, ignore_index=True) if players_stats_list else pd.DataFrame(columns=players_cols_order)
+    raw_team_stats_df = merge_match_sources(ss_df=ss_part_team, sw_df=sw_part_team, keys=["Team"])
+    raw_player_stats_df = merge_match_sources(ss_df=ss_part_player, sw_df=sw_part_player, keys=["Team", "Player"])
+
+    team_stats_df = team_stats_proc(df=raw_team_stats_df, managers_dict=sw_managers_dict, plan=team_plan).reset_index(drop=True)
+    player_stats_df = player_stats_proc(df=raw_player_stats_df, plan=player_plan).reset_index(drop=True)
 
     return team_stats_df, player_stats_df
 
+# --------------------------------------------------------------------------------------
+# MODA POR GRUPO - Valor más frecuente de una columna en cada grupo (el menor en caso de empate, como Series.mode).
+# --------------------------------------------------------------------------------------
+def group_mode(df: pd.DataFrame, group_col: str, value_col: str) -> pd.Series:
+
+    if value_col not in df.columns:
+        return pd.Series(dtype="object")
+
+    counts = df.groupby([group_col, value_col], sort=False).size().reset_index(name="Count")
+    counts = counts.sort_values(by=[group_col, "Count", value_col], ascending=[True, False, True], kind="stable")
+
+    return counts.drop_duplicates(subset=group_col).set_index(group_col)[value_col]
+
+# --------------------------------------------------------------------------------------
+# AGREGACIÓN DE TEMPORADA - Suma por grupo las columnas indicadas en una sola pasada de groupby.
+# --------------------------------------------------------------------------------------
+def season_sums(stats_df: pd.DataFrame, group_col: str, sum_cols: list) -> pd.DataFrame:
+
+    grouped = stats_df.groupby(group_col, sort=False)
+    sums_df = grouped.size().to_frame("Matches")
+
+    existing_cols = [c for c in sum_cols if c in stats_df.columns]
+    sums_df = sums_df.join(grouped[existing_cols].sum())
+
+    for c in sum_cols:
+        if c not in existing_cols:
+            sums_df[c] = 0
+
+    return sums_df
+
+# --------------------------------------------------------------------------------------
+# RATIOS DE TEMPORADA - Calcula los totales combinados y los ratios declarados en la configuración.
+# --------------------------------------------------------------------------------------
+def season_ratios(season_df: pd.DataFrame, totals: dict, ratios: dict) -> pd.DataFrame:
+
+    derived = {}
+    for col, cols_to_add in totals.items():
+        derived[col] = season_df[cols_to_add].sum(axis=1)
+    season_df = season_df.assign(**derived)
+
+    for col, (num_cols, den_cols) in ratios.items():
+        derived[col] = safe_div_series(season_df[num_cols].sum(axis=1), season_df[den_cols].sum(axis=1))
+
+    return season_df.assign(**derived)
+
 # --------------------------------------------------------------------------------------
 # ESTADÍSTICAS DE TEMPORADA POR EQUIPO
 # --------------------------------------------------------------------------------------
@@ -876,82 +1253,20 @@ def season_stats_team(teams_df: pd.DataFrame, team_stats_df: pd.DataFrame) -> pd
     if teams_df is None or teams_df.empty or team_stats_df is None or team_stats_df.empty:
         return pd.DataFrame()
 
-    teams_season_df_list = []
-    for team in teams_df["Slug"].dropna().unique().tolist():
-        single_team_stats = team_stats_df[team_stats_df["Team"] == team]
-        matches = len(single_team_stats)
+    with open(os.path.join(utils, "team_stats_proc", "season_stats.json"), "r", encoding="utf-8") as f:
+        season_cfg = jsonlib.load(f)
 
-        if matches == 0:
-            continue
+    season_df = season_sums(stats_df=team_stats_df, group_col="Team", sum_cols=season_cfg["sum_cols"])
+    season_df["Formation"] = group_mode(df=team_stats_df, group_col="Team", value_col="Formation")
+    season_df = season_ratios(season_df=season_df, totals=season_cfg.get("totals", {}), ratios=season_cfg["ratios"])
+
+    season_df["GoalsMinusXG"] = season_df["Goals"].astype("float64") - season_df["ExpectedGoals"].astype("float64")
+    season_df["GoalDifference"] = season_df["Goals"] - season_df["GoalsConceded"]
+
+    teams = pd.DataFrame({"Team": teams_df["Slug"].dropna().unique()})
+    season_df = teams.merge(season_df, how="inner", left_on="Team", right_index=True)
 
-        df = pd.DataFrame()
-        df["Team"] = [team]
-        df["Matches"] = matches
-        formations = single_team_stats["Formation"].mode()
-        df["Formation"] = formations.iloc[0] if len(formations) > 0 else np.nan
-
-        cols_to_sum = ["Goals", "GoalsConceded", "ExpectedGoals", "GoalsPrevented", "OwnGoals", "GoalAssist", "CleanSheet", "TotalShots", "ShotsOnTarget", "ShotsOffTarget", "BlockedShots", 
-                       "ShotsInsideBox", "ShotsOutsideBox", "HitWoodwork", "BigChances", "TouchesInPenaltyArea", "ThroughBalls", "Crosses", "Dribbles", "BallPossession", "Passes", 
-                       "AccuratePasses", "LongBalls", "FinalThirdEntries", "FinalThirdPhase", "CornerKicks", "LostCorners", "ThrowIns", "Offsides", "Fouls", "FoulsWon", "FoulsLost",
-                       "YellowCards", "RedCards", "SecondYellow", "Tackles", "TacklesWon", "TotalTackles", "Interceptions", "Recoveries", "Clearances", "Duels", "GroundDuels", "AerialDuels", 
-                       "Dispossessed", "FouledFinalThird", "ErrorsLeadToShot", "ErrorsLeadToGoal", "GoalkeeperSaves", "TotalSaves", "BigSaves", "Punches", "HighClaims", "GoalKicks", 
-                       "PenaltySaves", "PenaltyWon", "PenaltyConceded", "PenaltyFaced", "PenGoalsConceded", "SubsMade", "SubsGoals"]
-
-        for col in cols_to_sum:
-            df[col] = single_team_stats[col].sum() if col in single_team_stats.columns else 0
-
-        df["GoalsPerMatch"] = safe_div(df["Goals"].sum(), matches)
-        df["GoalsConcededsPerMatch"] = safe_div(df["GoalsConceded"].sum(), matches)
-        df["ExpectedGoalsPerMatch"] = safe_div(df["ExpectedGoals"].sum(), matches)
-        df["GoalsPreventedPerMatch"] = safe_div(df["GoalsPrevented"].sum(), matches)
-
-        df["ShotAccuracy"] = safe_div(df["ShotsOnTarget"].sum(), df["TotalShots"].sum())
-        df["ShotOffTargetRate"] = safe_div(df["ShotsOffTarget"].sum(), df["TotalShots"].sum())
-        df["BlockedShotRate"] = safe_div(df["BlockedShots"].sum(), df["TotalShots"].sum())
-        df["GoalConversion"] = safe_div(df["Goals"].sum(), df["TotalShots"].sum())
-        df["OnTargetConversion"] = safe_div(df["Goals"].sum(), df["ShotsOnTarget"].sum())
-        df["BigChanceRate"] = safe_div(df["BigChances"].sum(), df["TotalShots"].sum())
-        df["BigChanceConversion"] = safe_div(df["Goals"].sum(), df["BigChances"].sum())
-        df["BoxShotRate"] = safe_div(df["ShotsInsideBox"].sum(), df["TotalShots"].sum())
-        df["OutsideShotRate"] = safe_div(df["ShotsOutsideBox"].sum(), df["TotalShots"].sum())
-        df["XGPerShot"] = safe_div(df["ExpectedGoals"].sum(), df["TotalShots"].sum())
-        df["GoalsMinusXG"] = df["Goals"].sum() - df["ExpectedGoals"].sum()
-
-        df["PassAccuracy"] = safe_div(df["AccuratePasses"].sum(), df["Passes"].sum())
-        df["LongBallsPerMatch"] = safe_div(df["LongBalls"].sum(), matches)
-        df["CrossesPerMatch"] = safe_div(df["Crosses"].sum(), matches)
-        df["FinalThirdEntriesPerMatch"] = safe_div(df["FinalThirdEntries"].sum(), matches)
-        df["TouchesInPenaltyAreaPerMatch"] = safe_div(df["TouchesInPenaltyArea"].sum(), matches)
-        df["ThroughBallsPerMatch"] = safe_div(df["ThroughBalls"].sum(), matches)
-        df["DribblesPerMatch"] = safe_div(df["Dribbles"].sum(), matches)
-
-        df["GoalsConcededPerMatch"] = safe_div(df["GoalsConceded"].sum(), matches)
-        df["CleanSheetRate"] = safe_div(df["CleanSheet"].sum(), matches)
-        df["TackleSuccess"] = safe_div(df["TacklesWon"].sum(), df["Tackles"].sum())
-        df["InterceptionsPerMatch"] = safe_div(df["Interceptions"].sum(), matches)
-        df["RecoveriesPerMatch"] = safe_div(df["Recoveries"].sum(), matches)
-        df["ClearancesPerMatch"] = safe_div(df["Clearances"].sum(), matches)
-        df["DuelsPerMatch"] = safe_div(df["Duels"].sum(), matches)
-        df["GroundDuelsPerMatch"] = safe_div(df["GroundDuels"].sum(), matches)
-        df["AerialDuelsPerMatch"] = safe_div(df["AerialDuels"].sum(), matches)
-        df["ErrorsLeadToShotRate"] = safe_div(df["ErrorsLeadToShot"].sum(), matches)
-        df["ErrorsLeadToGoalRate"] = safe_div(df["ErrorsLeadToGoal"].sum(), matches)
-
-        df["PenaltySaveRate"] = safe_div(df["PenaltySaves"].sum(), df["PenaltyFaced"].sum())
-        df["GoalkeeperSavesPerMatch"] = safe_div(df["GoalkeeperSaves"].sum(), matches)
-        df["TotalSavesPerMatch"] = safe_div(df["TotalSaves"].sum(), matches)
-
-        df["FoulsPerMatch"] = safe_div(df["Fouls"].sum(), matches)
-        df["FoulsWonPerMatch"] = safe_div(df["FoulsWon"].sum(), matches)
-        df["FoulsLostPerMatch"] = safe_div(df["FoulsLost"].sum(), matches)
-        df["YellowCardsPerMatch"] = safe_div(df["YellowCards"].sum(), matches)
-        df["RedCardsPerMatch"] = safe_div(df["RedCards"].sum(), matches)
-        df["OffsidesPerMatch"] = safe_div(df["Offsides"].sum(), matches)
-
-        df["GoalDifference"] = df["Goals"].sum() - df["GoalsConceded"].sum()
-        teams_season_df_list.append(df)
-
-    return pd.concat(teams_season_df_list, ignore_index=True) if teams_season_df_list else pd.DataFrame()
+    return season_df[season_cfg["cols_order"]].reset_index(drop=True)
 
 # --------------------------------------------------------------------------------------
 # ESTADÍSTICAS DE TEMPORADA POR JUGADOR
@@ -961,91 +1276,33 @@ def season_stats_player(players_df: pd.DataFrame, player_stats_df: pd.DataFrame)
     if players_df is None or players_df.empty or player_stats_df is None or player_stats_df.empty:
         return pd.DataFrame()
 
-    players_season_df_list = []
-    for _, row in players_df.iterrows():
-        player = row["Slug"]
+    with open(os.path.join(utils, "player_stats_proc", "season_stats.json"), "r", encoding="utf-8") as f:
+        season_cfg = jsonlib.load(f)
 
-        single_player_stats = player_stats_df[player_stats_df["Player"] == player]
-        matches = len(single_player_stats)
-        if matches == 0:
-            continue
+    stats_df = player_stats_df.copy()
+    stats_df["Starter"] = stats_df["Starter"].eq(True) if "Starter" in stats_df.columns else False
+    if "MinutesPlayed" not in stats_df.columns:
+        stats_df["MinutesPlayed"] = 0
+
+    season_df = season_sums(stats_df=stats_df, group_col="Player", sum_cols=["Starter", "MinutesPlayed"] + season_cfg["sum_cols"])
+    season_df = season_df.rename(columns={"Starter": "MatchesStarter"})
+    season_df["Position"] = group_mode(df=stats_df, group_col="Player", value_col="Position")
+    season_df["MatchesBench"] = season_df["Matches"] - season_df["MatchesStarter"]
+
+    grouped = stats_df.groupby("Player", sort=False)
+    season_df["MinutesPerMatch"] = round_array(grouped["MinutesPlayed"].mean().astype("float64"))
+    season_df["AvgRating"] = round_array(grouped["Rating"].mean().astype("float64")) if "Rating" in stats_df.columns else np.nan
+
+    per90_factor = safe_div_series(pd.Series(90, index=season_df.index), season_df["MinutesPlayed"]).to_numpy()
+    season_df = season_df.assign(**{f"{c}Per90": season_df[c].to_numpy(dtype="float64") * per90_factor for c in season_cfg["sum_cols"]})
+    season_df = season_ratios(season_df=season_df, totals=season_cfg.get("totals", {}), ratios=season_cfg["ratios"])
 
-        minutes = single_player_stats["MinutesPlayed"].sum() if "MinutesPlayed" in single_player_stats.columns else 0
-        avg_minutes = round(single_player_stats["MinutesPlayed"].mean(), 4) if "MinutesPlayed" in single_player_stats.columns and pd.notna(single_player_stats["MinutesPlayed"].mean()) else np.nan
-        per90_factor = safe_div(90, minutes)
-
-        df = pd.DataFrame()
-        df["Player"] = [player]
-        df["Team"] = row["Team"]
-        df["ShirtNumber"] = row["ShirtNumber"]
-        positions = single_player_stats["Position"].mode() if "Position" in single_player_stats.columns else pd.Series([], dtype="object")
-        df["Position"] = positions.iloc[0] if len(positions) > 0 else np.nan
-        df["Matches"] = matches
-        df["MatchesStarter"] = single_player_stats["Starter"].sum() if "Starter" in single_player_stats.columns else 0
-        df["MatchesBench"] = df["Matches"] - df["MatchesStarter"]
-        df["StartsRate"] = safe_div(df["MatchesStarter"].sum(), df["Matches"].sum())
-        df["MinutesPlayed"] = minutes
-        df["MinutesPerMatch"] = avg_minutes
-        df["AvgRating"] = round(single_player_stats["Rating"].mean(), 4) if "Rating" in single_player_stats.columns else np.nan
-
-        cols_to_sum = ["Touches", "Rating", "PossessionLost", "Passes", "AccuratePasses", "LongBalls", "AccurateLongBalls", "AccurateOwnHalfPasses", "TotalOwnHalfPasses", "TotalOppositionHalfPasses", 
-                       "AccurateOppositionHalfPasses", "Crosses", "AccurateCrosses", "KeyPasses", "GoalAssist", "ExpectedAssists", "BallCarriesCount", "TotalBallCarriesDistance", "TotalProgression", 
-                       "BestBallCarryProgression", "ProgressiveBallCarriesCount", "TotalProgressiveBallCarriesDistance", "TotalShots", "ShotsOnTarget", "ShotsOffTarget", "BlockedShots",
-                       "ExpectedGoals", "ExpectedGoalsOnTarget", "BigChanceCreated", "BigChanceMissed", "Goals", "HitWoodwork", "ShotValue", "DuelsWon", "DuelsLost", "AerialWon", "AerialLost", 
-                       "Tackles", "TacklesWon", "Interceptions", "Recoveries", "Clearances", "LastManTackle", "OutfielderBlocks", "ErrorsLeadToShot", "ErrorsLeadToGoal", "Saves", "SavedShotsFromInsideTheBox", 
-                       "GoalsPrevented", "KeeperSaveValue", "GoalkeeperValue", "Punches", "HighClaims", "ClearanceOffLine", "KeeperSweeperActions", "AccurateKeeperSweeperActions", "GoalKicks",
-                       "GoalsConceded", "CleanSheet", "Fouls", "WasFouled", "Offsides", "YellowCards", "RedCards", "SecondYellow", "PenaltyWon", "PenaltyConceded", "PenaltyFaced", "PenaltySave", 
-                       "PenaltyMiss", "PenGoalsConceded", "OwnGoals", "CrossNotClaimed", "ThrowIns", "CornerKicks", "LostCorners"]
-
-        for c in cols_to_sum:
-            total_value = single_player_stats[c].sum() if c in single_player_stats.columns else 0
-            df[c] = total_value
-            df[f"{c}Per90"] = total_value * per90_factor if pd.notna(per90_factor) else np.nan
-
-        df["PassAccuracy"] = safe_div(df["AccuratePasses"].sum(), df["Passes"].sum())
-        df["LongBallAccuracy"] = safe_div(df["AccurateLongBalls"].sum(), df["LongBalls"].sum())
-        df["OwnHalfPassAccuracy"] = safe_div(df["AccurateOwnHalfPasses"].sum(), df["TotalOwnHalfPasses"].sum())
-        df["OppositionHalfPassAccuracy"] = safe_div(df["AccurateOppositionHalfPasses"].sum(), df["TotalOppositionHalfPasses"].sum())
-        df["CrossAccuracy"] = safe_div(df["AccurateCrosses"].sum(), df["Crosses"].sum())
-
-        df["KeyPassesPerPass"] = safe_div(df["KeyPasses"].sum(), df["Passes"].sum())
-        df["ExpectedAssistsPerKeyPass"] = safe_div(df["ExpectedAssists"].sum(), df["KeyPasses"].sum())
-        df["ProgressiveCarriesShare"] = safe_div(df["ProgressiveBallCarriesCount"].sum(), df["BallCarriesCount"].sum())
-        df["AvgCarryDistance"] = safe_div(df["TotalBallCarriesDistance"].sum(), df["BallCarriesCount"].sum())
-        df["AvgProgressionPerCarry"] = safe_div(df["TotalProgression"].sum(), df["BallCarriesCount"].sum())
-        df["AvgProgressiveCarryDistance"] = safe_div(df["TotalProgressiveBallCarriesDistance"].sum(), df["ProgressiveBallCarriesCount"].sum())
-
-        df["ShotAccuracy"] = safe_div(df["ShotsOnTarget"].sum(), df["TotalShots"].sum())
-        df["ShotOffTargetRate"] = safe_div(df["ShotsOffTarget"].sum(), df["TotalShots"].sum())
-        df["BlockedShotRate"] = safe_div(df["BlockedShots"].sum(), df["TotalShots"].sum())
-        df["GoalConversion"] = safe_div(df["Goals"].sum(), df["TotalShots"].sum())
-        df["OnTargetConversion"] = safe_div(df["Goals"].sum(), df["ShotsOnTarget"].sum())
-        df["XGPerShot"] = safe_div(df["ExpectedGoals"].sum(), df["TotalShots"].sum())
-        df["GoalsMinusXG"] = round(df["Goals"].sum() - df["ExpectedGoals"].sum(), 4) if pd.notna(df["Goals"].sum()) and pd.notna(df["ExpectedGoals"].sum()) else np.nan
-        df["BigChanceMissRate"] = safe_div(df["BigChanceMissed"].sum(), df["BigChanceMissed"].sum() + df["Goals"].sum())
-        df["BigChanceCreateToAssist"] = safe_div(df["GoalAssist"].sum(), df["BigChanceCreated"].sum())
-        df["DuelWinRate"] = safe_div(df["DuelsWon"].sum(), df["DuelsWon"].sum() + df["DuelsLost"].sum())
-        df["AerialWinRate"] = safe_div(df["AerialWon"].sum(), df["AerialWon"].sum() + df["AerialLost"].sum())
-
-        df["TackleSuccess"] = safe_div(df["TacklesWon"].sum(), df["Tackles"].sum())
-        df["RecoveriesPerTouch"] = safe_div(df["Recoveries"].sum(), df["Touches"].sum())
-        df["InterceptionsPlusRecoveries"] = df["Interceptions"].sum() + df["Recoveries"].sum()
-        df["DefensiveActions"] = df["Tackles"].sum() + df["Interceptions"].sum() + df["Recoveries"].sum() + df["Clearances"].sum() + df["OutfielderBlocks"].sum()
-
-        df["FoulsPerWasFouled"] = safe_div(df["Fouls"].sum(), df["WasFouled"].sum())
-        df["PossessionLostPerTouch"] = safe_div(df["PossessionLost"].sum(), df["Touches"].sum())
-
-        df["SaveRate"] = safe_div(df["Saves"].sum(), df["Saves"].sum() + df["GoalsConceded"].sum())
-        df["PenaltySaveRate"] = safe_div(df["PenaltySave"].sum(), df["PenaltyFaced"].sum())
-        df["GoalsConcededPerSave"] = safe_div(df["GoalsConceded"].sum(), df["Saves"].sum())
-
-        df["GoalContributions"] = df["Goals"].sum() + df["GoalAssist"].sum()
-        df["GoalContributionsPerMatch"] = safe_div(df["GoalContributions"].sum(), df["Matches"].sum())
-        df["GoalContributionsPerStart"] = safe_div(df["GoalContributions"].sum(), df["MatchesStarter"].sum())
-
-        players_season_df_list.append(df)
-
-    return pd.concat(players_season_df_list, ignore_index=True) if players_season_df_list else pd.DataFrame()
+    season_df["GoalsMinusXG"] = round_array(season_df["Goals"].astype("float64") - season_df["ExpectedGoals"].astype("float64"))
+
+    players = players_df[["Slug", "Team", "ShirtNumber"]].rename(columns={"Slug": "Player"})
+    season_df = players.merge(season_df, how="inner", left_on="Player", right_index=True)
+
+    return season_df[season_cfg["cols_order"]].reset_index(drop=True)
 
 # --------------------------------------------------------------------------------------
 # IMÁGENES
@@ -1113,23 +1370,27 @@ def images_proc(players_df: pd.DataFrame, teams_df: pd.DataFrame, managers_df: p
 # --------------------------------------------------------------------------------------
 # UNIFICACIÓN DE UNA TEMPORADA
 # --------------------------------------------------------------------------------------
-def season_data_unification(fotmob_clean_path: str, scoresway_clean_path: str, sofascore_clean_path: str, print_info: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def season_data_unification(fotmob_clean_path: str, scoresway_clean_path: str, sofascore_clean_path: str, print_info: bool = True, registry: IdentityRegistry = None, workers: int = 1) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
 
     fm_info_df, fm_matches_df, fm_all_st_df, fm_home_st_df, fm_away_st_df, fm_form_st_df, fm_xg_st_df = read_fotmob_data(fotmob_clean_path=fotmob_clean_path)
     fotmob_teams = obtain_fotmob_teams(matches_df=fm_matches_df, all_st_df=fm_all_st_df, home_st_df=fm_home_st_df, away_st_df=fm_away_st_df, form_st_df=fm_form_st_df, xg_st_df=fm_xg_st_df)
 
+    # Las tablas de estadísticas de partido solo se leen con las columnas que usa la unificación
+    sw_player_cols, sw_team_cols = match_stats_columns(stats_type="player", source="sw"), match_stats_columns(stats_type="team", source="sw")
+    ss_player_cols, ss_team_cols = match_stats_columns(stats_type="player", source="ss"), match_stats_columns(stats_type="team", source="ss")
+
     (sw_managers_df, sw_matches_df, sw_players_df, sw_teams_df, sw_total_st_df, sw_home_st_df, sw_away_st_df,
      sw_httotal_st_df, sw_hthome_st_df, sw_htaway_st_df, sw_formhome_st_df, sw_formaway_st_df, sw_overunder_st_df,
-     sw_attendance_st_df, sw_matches_info_df, sw_matches_player_stats_df, sw_matches_team_stats_df, sw_matches_referees_df) = read_scoresway_data(scoresway_clean_path=scoresway_clean_path)
+     sw_attendance_st_df, sw_matches_info_df, sw_matches_player_stats_df, sw_matches_team_stats_df, sw_matches_referees_df) = read_scoresway_data(scoresway_clean_path=scoresway_clean_path, player_stats_columns=sw_player_cols, team_stats_columns=sw_team_cols)
 
     scoresway_teams = sorted(sw_teams_df["club_name"].dropna().unique().tolist()) if sw_teams_df is not None and not sw_teams_df.empty else []
 
     (ss_managers_df, ss_players_df, ss_teams_df, ss_venues_df, ss_total_st_df, ss_home_st_df, ss_away_st_df,
-     ss_matches_info_df, ss_matches_lineups_df, ss_matches_statistics_df) = read_sofascore_data(sofascore_clean_path=sofascore_clean_path)
+     ss_matches_info_df, ss_matches_lineups_df, ss_matches_statistics_df) = read_sofascore_data(sofascore_clean_path=sofascore_clean_path, lineups_columns=ss_player_cols, statistics_columns=ss_team_cols)
 
     sofascore_teams = sorted(ss_teams_df["name"].dropna().unique().tolist()) if ss_teams_df is not None and not ss_teams_df.empty else []
 
-    matched_teams = match_teams(fm_list=fotmob_teams, sw_list=scoresway_teams, ss_list=sofascore_teams)
+    matched_teams = match_teams(fm_list=fotmob_teams, sw_list=scoresway_teams, ss_list=sofascore_teams, workers=workers, registry=registry)
     if sw_teams_df is not None and not sw_teams_df.empty:
         sw_long_name_dict = sw_teams_df.set_index("club_name")["name"].dropna().to_dict()
         matched_teams["longname_scoresway"] = matched_teams["scoresway"].map(sw_long_name_dict)
@@ -1137,8 +1398,8 @@ def season_data_unification(fotmob_clean_path: str, scoresway_clean_path: str, s
         matched_teams["longname_scoresway"] = np.nan
 
     teams_df = create_teams_info_df(matched_teams=matched_teams, sw_teams_df=sw_teams_df, ss_teams_df=ss_teams_df)
-    players_df = create_players_info_df(matched_teams=matched_teams, sw_players_df=sw_players_df, ss_players_df=ss_players_df)
-    teams_df, managers_df = create_managers_info_df(teams_df=teams_df, sw_managers_df=sw_managers_df, ss_managers_df=ss_managers_df)
+    players_df = create_players_info_df(matched_teams=matched_teams, sw_players_df=sw_players_df, ss_players_df=ss_players_df, registry=registry, workers=workers)
+    teams_df, managers_df = create_managers_info_df(teams_df=teams_df, sw_managers_df=sw_managers_df, ss_managers_df=ss_managers_df, registry=registry)
     teams_df, venues_df = create_venues_info_df(teams_df=teams_df, ss_venues_df=ss_venues_df)
     matches_df = create_matches_info_df(teams_df=teams_df, ss_matches_info_df=ss_matches_info_df, sw_matches_info_df=sw_matches_info_df)
 
@@ -1173,8 +1434,10 @@ def season_data_unification(fotmob_clean_path: str, scoresway_clean_path: str, s
 
 # --------------------------------------------------------------------------------------
 # UNIFICADOR COMPLETO DE LIGA - Función principal.
+# use_registry: empareja equipos, jugadores y managers con el registro de identidades persistente (data/identity_registry.sqlite).
+# Desactivado por defecto para que el resultado dependa solo de los datos limpios.
 # --------------------------------------------------------------------------------------
-def league_data_unification(league_id: int, raw_data_path: str, clean_data_path: str, processed_data_path: str, print_info: bool = True) -> None:
+def league_data_unification(league_id: int, raw_data_path: str, clean_data_path: str, processed_data_path: str, print_info: bool = True, use_registry: bool = False, workers: int = 1) -> None:
     comp_row = comps.loc[comps["id"] == league_id]
     if comp_row.empty:
         raise ValueError(f"No existe ninguna liga con id={league_id} en comps.csv.")
@@ -1194,110 +1457,79 @@ def league_data_unification(league_id: int, raw_data_path: str, clean_data_path:
     processed_all_path = os.path.join(processed_league_path, "All")
     os.makedirs(processed_all_path, exist_ok=True)
 
-    teams_list, players_list, managers_list, venues_list = [], [], [], []
-    all_standings_list, home_standings_list, away_standings_list, half_time_standings_list, expected_standings_list = [], [], [], [], []
-    team_stats_df_list, player_stats_df_list, team_stats_season_df_list, player_stats_season_df_list = [], [], [], []
-
-    for season_key in desired_seasons:
-        if print_info:
-            print(f"     - Data unification of season {season_key}")
-
-        processed_season_path = os.path.join(processed_league_path, season_key)
-        os.makedirs(processed_season_path, exist_ok=True)
-
-        fotmob_clean_path = os.path.join(clean_data_path, "fotmob", league_slug, season_key)
-        scoresway_clean_path = os.path.join(clean_data_path, "scoresway", league_slug, season_key)
-        sofascore_clean_path = os.path.join(clean_data_path, "sofascore", league_slug, season_key)
-
-        (teams_df, players_df, managers_df, venues_df, all_standings, 
-         home_standings, away_standings, half_time_standings, expected_standings, 
-         team_stats_df, player_stats_df, team_stats_season_df, player_stats_season_df) = season_data_unification(fotmob_clean_path=fotmob_clean_path, scoresway_clean_path=scoresway_clean_path,
-                                                                                                                 sofascore_clean_path=sofascore_clean_path, print_info=print_info)
-
-        images_proc(players_df=players_df, managers_df=managers_df, teams_df=teams_df, venues_df=venues_df, images_path=images_path, processed_data_path=processed_data_path)
-        if print_info:
-            print("        - Images processed")
-
-        dfs = [teams_df, players_df, managers_df, venues_df, all_standings, home_standings, away_standings, half_time_standings, expected_standings, team_stats_df, player_stats_df, team_stats_season_df, player_stats_season_df]
-        for df in dfs:
-            if df is not None and not df.empty:
-                df.drop(columns=["IdSS", "IdFM", "IdSW"], errors="ignore", inplace=True)
-                if "League" not in df.columns:
-                    df.insert(0, "League", league_slug)
-                if "Season" not in df.columns:
-                    df.insert(1, "Season", season_key)
-
-        info_path = os.path.join(processed_season_path, "info")
-        standings_path = os.path.join(processed_season_path, "standings")
-        stats_path = os.path.join(processed_season_path, "statistics")
-        os.makedirs(info_path, exist_ok=True)
-        os.makedirs(standings_path, exist_ok=True)
-        os.makedirs(stats_path, exist_ok=True)
-
-        teams_list.append(teams_df)
-        teams_df.to_csv(os.path.join(info_path, "team.csv"), index=False, sep=";")
-        players_list.append(players_df)
-        players_df.to_csv(os.path.join(info_path, "player.csv"), index=False, sep=";")
-        managers_list.append(managers_df)
-        managers_df.to_csv(os.path.join(info_path, "manager.csv"), index=False, sep=";")
-        venues_list.append(venues_df)
-        venues_df.to_csv(os.path.join(info_path, "venue.csv"), index=False, sep=";")
-
-        all_standings_list.append(all_standings)
-        all_standings.to_csv(os.path.join(standings_path, "all.csv"), index=False, sep=";")
-        home_standings_list.append(home_standings)
-        home_standings.to_csv(os.path.join(standings_path, "home.csv"), index=False, sep=";")
-        away_standings_list.append(away_standings)
-        away_standings.to_csv(os.path.join(standings_path, "away.csv"), index=False, sep=";")
-        half_time_standings_list.append(half_time_standings)
-        half_time_standings.to_csv(os.path.join(standings_path, "half_time.csv"), index=False, sep=";")
-        expected_standings_list.append(expected_standings)
-        expected_standings.to_csv(os.path.join(standings_path, "expected.csv"), index=False, sep=";")
-
-        team_stats_df_list.append(team_stats_df)
-        team_stats_df.to_csv(os.path.join(stats_path, "team_match.csv"), index=False, sep=";")
-        player_stats_df_list.append(player_stats_df)
-        player_stats_df.to_csv(os.path.join(stats_path, "player_match.csv"), index=False, sep=";")
-        team_stats_season_df_list.append(team_stats_season_df)
-        team_stats_season_df.to_csv(os.path.join(stats_path, "team_season.csv"), index=False, sep=";")
-        player_stats_season_df_list.append(player_stats_season_df)
-        player_stats_season_df.to_csv(os.path.join(stats_path, "player_season.csv"), index=False, sep=";")
-
-    info_path = os.path.join(processed_all_path, "info")
-    standings_path = os.path.join(processed_all_path, "standings")
-    stats_path = os.path.join(processed_all_path, "statistics")
-    os.makedirs(info_path, exist_ok=True)
-    os.makedirs(standings_path, exist_ok=True)
-    os.makedirs(stats_path, exist_ok=True)
-
-    teams_df = pd.concat(teams_list, ignore_index=True) if teams_list else pd.DataFrame()
-    teams_df.to_csv(os.path.join(info_path, "team.csv"), index=False, sep=";")
-    players_df = pd.concat(players_list, ignore_index=True) if players_list else pd.DataFrame()
-    players_df.to_csv(os.path.join(info_path, "player.csv"), index=False, sep=";")
-    managers_df = pd.concat(managers_list, ignore_index=True) if managers_list else pd.DataFrame()
-    managers_df.to_csv(os.path.join(info_path, "manager.csv"), index=False, sep=";")
-    venues_df = pd.concat(venues_list, ignore_index=True) if venues_list else pd.DataFrame()
-    venues_df.to_csv(os.path.join(info_path, "venue.csv"), index=False, sep=";")
-
-    all_standings = pd.concat(all_standings_list, ignore_index=True) if all_standings_list else pd.DataFrame()
-    all_standings.to_csv(os.path.join(standings_path, "all.csv"), index=False, sep=";")
-    home_standings = pd.concat(home_standings_list, ignore_index=True) if home_standings_list else pd.DataFrame()
-    home_standings.to_csv(os.path.join(standings_path, "home.csv"), index=False, sep=";")
-    away_standings = pd.concat(away_standings_list, ignore_index=True) if away_standings_list else pd.DataFrame()
-    away_standings.to_csv(os.path.join(standings_path, "away.csv"), index=False, sep=";")
-    half_time_standings = pd.concat(half_time_standings_list, ignore_index=True) if half_time_standings_list else pd.DataFrame()
-    half_time_standings.to_csv(os.path.join(standings_path, "half_time.csv"), index=False, sep=";")
-    expected_standings = pd.concat(expected_standings_list, ignore_index=True) if expected_standings_list else pd.DataFrame()
-    expected_standings.to_csv(os.path.join(standings_path, "expected.csv"), index=False, sep=";")
-
-    team_stats_df = pd.concat(team_stats_df_list, ignore_index=True) if team_stats_df_list else pd.DataFrame()
-    team_stats_df.to_csv(os.path.join(stats_path, "team_match.csv"), index=False, sep=";")
-    player_stats_df = pd.concat(player_stats_df_list, ignore_index=True) if player_stats_df_list else pd.DataFrame()
-    player_stats_df.to_csv(os.path.join(stats_path, "player_match.csv"), index=False, sep=";")
-    team_stats_season_df = pd.concat(team_stats_season_df_list, ignore_index=True) if team_stats_season_df_list else pd.DataFrame()
-    team_stats_season_df.to_csv(os.path.join(stats_path, "team_season.csv"), index=False, sep=";")
-    player_stats_season_df = pd.concat(player_stats_season_df_list, ignore_index=True) if player_stats_season_df_list else pd.DataFrame()
-    player_stats_season_df.to_csv(os.path.join(stats_path, "player_season.csv"), index=False, sep=";")
+    # El registro se cierra al terminar (también si falla una temporada) para no dejar la conexión abierta en el proceso del pool
+    registry_path = os.path.dirname(os.path.abspath(processed_data_path))
+    registry = open_identity_registry(data_path=registry_path) if use_registry else None
+
+    try:
+        for season_key in desired_seasons:
+            if print_info:
+                print(f"     - Data unification of season {season_key}")
+
+            processed_season_path = os.path.join(processed_league_path, season_key)
+            os.makedirs(processed_season_path, exist_ok=True)
+
+            fotmob_clean_path = os.path.join(clean_data_path, "fotmob", league_slug, season_key)
+            scoresway_clean_path = os.path.join(clean_data_path, "scoresway", league_slug, season_key)
+            sofascore_clean_path = os.path.join(clean_data_path, "sofascore", league_slug, season_key)
+
+            (teams_df, players_df, managers_df, venues_df, all_standings, 
+             home_standings, away_standings, half_time_standings, expected_standings, 
+             team_stats_df, player_stats_df, team_stats_season_df, player_stats_season_df) = season_data_unification(fotmob_clean_path=fotmob_clean_path, scoresway_clean_path=scoresway_clean_path,
+                                                                                                                     sofascore_clean_path=sofascore_clean_path, print_info=print_info, registry=registry, workers=workers)
+
+            images_proc(players_df=players_df, managers_df=managers_df, teams_df=teams_df, venues_df=venues_df, images_path=images_path, processed_data_path=processed_data_path)
+            if print_info:
+                print("        - Images processed")
+
+            dfs = [teams_df, players_df, managers_df, venues_df, all_standings, home_standings, away_standings, half_time_standings, expected_standings, team_stats_df, player_stats_df, team_stats_season_df, player_stats_season_df]
+            for df in dfs:
+                if df is not None and not df.empty:
+                    df.drop(columns=["IdSS", "IdFM", "IdSW"], errors="ignore", inplace=True)
+                    if "League" not in df.columns:
+                        df.insert(0, "League", league_slug)
+                    if "Season" not in df.columns:
+                        df.insert(1, "Season", season_key)
+
+            info_path = os.path.join(processed_season_path, "info")
+            standings_path = os.path.join(processed_season_path, "standings")
+            stats_path = os.path.join(processed_season_path, "statistics")
+            os.makedirs(info_path, exist_ok=True)
+            os.makedirs(standings_path, exist_ok=True)
+            os.makedirs(stats_path, exist_ok=True)
+
+            write_table(df=teams_df, path=os.path.join(info_path, "team.csv"))
+            write_table(df=players_df, path=os.path.join(info_path, "player.csv"))
+            write_table(df=managers_df, path=os.path.join(info_path, "manager.csv"))
+            write_table(df=venues_df, path=os.path.join(info_path, "venue.csv"))
+
+            write_table(df=all_standings, path=os.path.join(standings_path, "all.csv"))
+            write_table(df=home_standings, path=os.path.join(standings_path, "home.csv"))
+            write_table(df=away_standings, path=os.path.join(standings_path, "away.csv"))
+            write_table(df=half_time_standings, path=os.path.join(standings_path, "half_time.csv"))
+            write_table(df=expected_standings, path=os.path.join(standings_path, "expected.csv"))
+
+            write_table(df=team_stats_df, path=os.path.join(stats_path, "team_match.csv"))
+            write_table(df=player_stats_df, path=os.path.join(stats_path, "player_match.csv"))
+            write_table(df=team_stats_season_df, path=os.path.join(stats_path, "team_season.csv"))
+            write_table(df=player_stats_season_df, path=os.path.join(stats_path, "player_season.csv"))
+
+            # Las tablas de la temporada ya están en disco: se liberan antes de procesar la siguiente
+            del df, dfs, teams_df, players_df, managers_df, venues_df, all_standings, home_standings, away_standings, half_time_standings, expected_standings
+            del team_stats_df, player_stats_df, team_stats_season_df, player_stats_season_df
+    finally:
+        if registry is not None:
+            close_identity_registry(data_path=registry_path)
+
+    # La carpeta All se construye en streaming a partir de las tablas de cada temporada
+    all_tables = {"info": ["team", "player", "manager", "venue"], "standings": ["all", "home", "away", "half_time", "expected"],
+                  "statistics": ["team_match", "player_match", "team_season", "player_season"]}
+
+    for folder, tables in all_tables.items():
+        os.makedirs(os.path.join(processed_all_path, folder), exist_ok=True)
+        for table in tables:
+            concat_tables(paths=[os.path.join(processed_league_path, season_key, folder, f"{table}.csv") for season_key in desired_seasons],
+                          out_path=os.path.join(processed_all_path, folder, f"{table}.csv"))
 
     if print_info:
         print(f"Finished data unification ({league_name}) in {elapsed_time_str(start_time=start_time)}")
\ No newline at end of file
@@ -0,0 +1,66 @@
+import os
+import json as jsonlib
+
+from use.functions import json_to_dict, safe_json_dump
+
+# --------------------------------------------------------------------------------------
+# ALMACÉN COMPARTIDO DE ENTIDADES - Un único JSON por (tipo, id) para todas las ligas y temporadas de Sofascore.
+# --------------------------------------------------------------------------------------
+def store_path(season_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(season_path)), "entities")
+
+def entity_path(season_path: str, type: str, id: int) -> str:
+    return os.path.join(store_path(season_path), type, f"{id}.json")
+
+def legacy_entity_path(season_path: str, type: str, id: int) -> str:
+    return os.path.join(season_path, "info", type, f"{id}.json")
+
+# --------------------------------------------------------------------------------------
+# ENTIDADES DE UNA TEMPORADA - Ids de cada tipo que pertenecen a la temporada (info/entities.json).
+# --------------------------------------------------------------------------------------
+def season_entity_ids(season_path: str, type: str) -> list[int]:
+
+    entities_path = os.path.join(season_path, "info", "entities.json")
+    if os.path.exists(entities_path):
+        return json_to_dict(json_path=entities_path).get(type, [])
+
+    # Temporadas descargadas antes del almacén compartido
+    legacy_dir = os.path.join(season_path, "info", type)
+    if not os.path.exists(legacy_dir):
+        return []
+
+    return [int(os.path.splitext(file)[0]) for file in os.listdir(legacy_dir) if os.path.splitext(file)[0].isdigit()]
+
+def add_season_entity_ids(season_path: str, type: str, ids: list[int]) -> None:
+
+    entities_path = os.path.join(season_path, "info", "entities.json")
+    entities = json_to_dict(json_path=entities_path) if os.path.exists(entities_path) else {}
+
+    known_ids = entities.get(type, [])
+    new_ids = list(dict.fromkeys(known_ids + list(ids)))
+
+    if new_ids != known_ids:
+        entities[type] = new_ids
+        safe_json_dump(data=entities, path=entities_path)
+
+# --------------------------------------------------------------------------------------
+# CONSULTA DE ENTIDADES - Devuelve el JSON de cada entidad de la temporada, del almacén o de la carpeta antigua.
+# --------------------------------------------------------------------------------------
+def lookup_entity(season_path: str, type: str, id: int) -> dict:
+
+    for path in [entity_path(season_path=season_path, type=type, id=id), legacy_entity_path(season_path=season_path, type=type, id=id)]:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return jsonlib.load(f)
+
+    return {}
+
+def lookup_entities(season_path: str, type: str) -> list[dict]:
+
+    entities = []
+    for id in season_entity_ids(season_path=season_path, type=type):
+        entity_data = lookup_entity(season_path=season_path, type=type, id=id).get(type)
+        if entity_data:
+            entities.append(entity_data)
+
+    return entities
@@ -1,15 +1,20 @@
 import os
 import json as jsonlib
 import re
+import threading
 import time
 import unicodedata
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
 import numpy as np
 import pandas as pd
 import requests
 
+from use import http_cache, raw_index
+from use.rate_limit import call_limited, http_failure
+
 # --------------------------------------------------------------------------------------
 # LECTURA DE JSON - Lee un archivo JSON y devuelve su contenido.
 # --------------------------------------------------------------------------------------
@@ -24,11 +29,11 @@ def json_to_dict(json_path: str) -> dict:
 
 # --------------------------------------------------------------------------------------
 # CREACIÓN DE SLUGS - Convierte un texto en un slug normalizado.
+# Los mismos nombres se repiten en todas las temporadas y ligas, así que los resultados se memorizan (LRU acotada).
+# typed=True para que 1 y 1.0 no compartan entrada ("1" frente a "10").
 # --------------------------------------------------------------------------------------
-def create_slug(text: str) -> str:
-    
-    if text is None:
-        return ""
+@lru_cache(maxsize=65536, typed=True)
+def cached_slug(text) -> str:
 
     text = str(text).lower()
     text = "".join(c for c in unicodedata.normalize("NFD", text)
@@ -39,6 +44,41 @@ def create_slug(text: str) -> str:
 
     return text
 
+def create_slug(text: str) -> str:
+    
+    if text is None:
+        return ""
+
+    return cached_slug(text)
+
+# --------------------------------------------------------------------------------------
+# CREACIÓN DE SLUGS EN SERIE - Mismo resultado que aplicar create_slug a cada valor, calculado una vez por valor distinto
+# con operaciones de texto de pandas. Los nulos pasan por create_slug (None -> "", NaN -> "nan", igual que con apply).
+# --------------------------------------------------------------------------------------
+def slugify_series(series: pd.Series) -> pd.Series:
+
+    # Fuera de los textos se agrupa por su str() (1, 1.0 y True son iguales para factorize pero no para create_slug)
+    na = series.isna().to_numpy()
+    values = series[~na]
+    if pd.api.types.infer_dtype(values, skipna=False) != "string":
+        values = pd.Series([str(value) for value in values], dtype=object)
+
+    codes, uniques = pd.factorize(values)
+    texts = pd.Series(uniques, dtype=object).str.lower().str.normalize("NFD")
+
+    # Solo hace falta quitar las marcas combinantes (categoría Mn) que aparecen en los textos
+    marks = [c for c in set("".join(texts)) if unicodedata.category(c) == "Mn"]
+    if marks:
+        texts = texts.str.replace(f"[{''.join(map(re.escape, sorted(marks)))}]", "", regex=True)
+
+    texts = texts.str.replace(r"\s+", "_", regex=True).str.replace(r"[^a-z0-9_]", "", regex=True).str.replace(r"_+", "_", regex=True).str.strip("_")
+
+    slugs = np.empty(len(series), dtype=object)
+    slugs[~na] = texts.to_numpy(dtype=object)[codes]
+    slugs[na] = [create_slug(text=value) for value in series[na]]
+
+    return pd.Series(slugs, index=series.index, name=series.name)
+
 # --------------------------------------------------------------------------------------
 # DIVISIÓN SEGURA - Realiza una división segura controlando NaN y divisiones por cero.
 # --------------------------------------------------------------------------------------
@@ -49,6 +89,90 @@ def safe_div(num: Any, den: Any, ndigits: int = 4) -> float:
 
     return round(num / den, ndigits)
 
+# --------------------------------------------------------------------------------------
+# REDONDEO VECTORIZADO - Redondea un array con el mismo resultado que round() en cada elemento.
+# --------------------------------------------------------------------------------------
+def round_array(values: Any, ndigits: int = 4) -> np.ndarray:
+
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+
+    scaled = values * 10 ** ndigits
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(v, ndigits) for v in values[near_half]]
+
+    return rounded
+
+# --------------------------------------------------------------------------------------
+# DIVISIÓN SEGURA VECTORIZADA - Aplica safe_div elemento a elemento sobre columnas completas.
+# --------------------------------------------------------------------------------------
+def safe_div_series(num: pd.Series, den: pd.Series, ndigits: int = 4) -> pd.Series:
+
+    num_values = pd.Series(num).astype("float64").to_numpy()
+    den_values = pd.Series(den).astype("float64").to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.where(np.isnan(num_values) | np.isnan(den_values) | (den_values == 0), np.nan, num_values / den_values)
+
+    return pd.Series(round_array(result, ndigits), index=num.index if isinstance(num, pd.Series) else None)
+
+# --------------------------------------------------------------------------------------
+# REGISTROS COLUMNARES - Representación compacta {columna: valores} para construir cada tabla una sola vez.
+# merge_columns une bloques como pd.concat: columnas en orden de aparición y NaN donde faltan.
+# --------------------------------------------------------------------------------------
+def df_to_columns(df: pd.DataFrame) -> dict:
+    return {column: df[column].tolist() for column in df.columns}
+
+def rows_to_columns(rows: list[dict], columns: list[str] = None) -> dict:
+
+    if columns is None:
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+
+    return {column: [row.get(column, np.nan) for row in rows] for column in columns}
+
+def merge_columns(chunks: list[dict]) -> dict:
+
+    columns = {}
+    total_rows = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+
+        chunk_rows = len(next(iter(chunk.values())))
+        for column in chunk:
+            if column not in columns:
+                columns[column] = [np.nan] * total_rows
+
+        for column, values in columns.items():
+            values.extend(chunk.get(column, [np.nan] * chunk_rows))
+
+        total_rows += chunk_rows
+
+    return columns
+
+def columns_to_df(chunks: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame(merge_columns(chunks))
+
+# --------------------------------------------------------------------------------------
+# ESCRITURA ATÓMICA DE JSON - Escribe en un temporal y lo renombra: quien lea el archivo nunca lo ve a medias.
+# Devuelve el contenido escrito.
+# --------------------------------------------------------------------------------------
+def atomic_json_dump(data, path: str) -> str:
+
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    content = jsonlib.dumps(data, ensure_ascii=False)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+    return content
+
 # --------------------------------------------------------------------------------------
 # GUARDADO SEGURO DE JSON - Guarda un diccionario en formato JSON.
 # --------------------------------------------------------------------------------------
@@ -57,37 +181,49 @@ def safe_json_dump(data: dict, path: str) -> None:
     if not isinstance(data, dict):
         raise TypeError("El parámetro 'data' debe ser un diccionario.")
 
-    out_dir = os.path.dirname(path)
-    if out_dir:
-        os.makedirs(out_dir, exist_ok=True)
+    # Escritura atómica: la limpieza puede leer el archivo mientras otra liga lo está descargando
+    content = atomic_json_dump(data=data, path=path)
 
-    with open(path, "w", encoding="utf-8") as f:
-        jsonlib.dump(data, f, ensure_ascii=False)
+    http_cache.commit_response(path=path)
+    raw_index.record_file(path=path, content=content.encode("utf-8"))
 
 # --------------------------------------------------------------------------------------
 # DESCARGA DE JSON DESDE URL - Realiza una petición HTTP GET y devuelve la respuesta en formato JSON.
 # --------------------------------------------------------------------------------------
-def url_to_json(url: str, sleep_time: int = 3, timeout: int = 30) -> dict:
+def url_to_json(url: str, timeout: int = 30, cache_path: str = None, retries: int = 3) -> dict | None:
     
-    response = requests.get(url, timeout=timeout)
+    headers = http_cache.conditional_headers(path=cache_path)
+    response = call_limited(url=url, func=lambda: requests.get(url, timeout=timeout, headers=headers), check=lambda r: http_failure(status=r.status_code, headers=r.headers),
+                            retry_exceptions=(requests.ConnectionError, requests.Timeout), retries=retries)
+
+    # Con cache_path, None indica que el JSON guardado sigue vigente (304 o mismo contenido)
+    if http_cache.response_unchanged(path=cache_path, url=url, status_code=response.status_code, headers=response.headers, content=response.content):
+        return None
+
     response.raise_for_status()
 
     data = response.json()
     if not isinstance(data, dict):
         raise ValueError(f"La respuesta de '{url}' no contiene un diccionario JSON.")
 
-    time.sleep(sleep_time)
+    http_cache.remember_response(path=cache_path, url=url, headers=response.headers, content=response.content)
+
     return data
 
 # --------------------------------------------------------------------------------------
 # CONTROL DE ANTIGÜEDAD DE ARCHIVOS - Indica si un archivo debe actualizarse según su antigüedad.
 # --------------------------------------------------------------------------------------
-def need_to_upload(path: str, total_days: int = 5) -> bool:
+def need_to_upload(path: str, total_days: int = None) -> bool:
     
     if not os.path.exists(path):
         return True
 
-    creation_time = os.path.getctime(path)
+    # Con un índice raw abierto manda su fecha de descarga; si no, la de la caché HTTP o el ctime
+    if raw_index.index_for_path(path) is not None:
+        return bool(raw_index.stale_paths(paths=[path], total_days=total_days))
+
+    total_days = raw_index.ttl_days(path) if total_days is None else total_days
+    creation_time = http_cache.fetched_time(path=path) or os.path.getctime(path)
     file_age = datetime.now() - datetime.fromtimestamp(creation_time)
 
     return file_age > timedelta(days=total_days)
@@ -0,0 +1,101 @@
+import os
+import json as jsonlib
+import hashlib
+import threading
+import time
+
+from use import raw_index
+
+# --------------------------------------------------------------------------------------
+# CACHÉ HTTP CONDICIONAL - Guarda junto a cada JSON crudo sus validadores HTTP (ETag/Last-Modified) y el hash de la respuesta.
+# --------------------------------------------------------------------------------------
+_pending = {}
+_pending_lock = threading.Lock()
+
+def meta_path(path: str) -> str:
+    return f"{path}.meta"
+
+def load_meta(path: str) -> dict:
+
+    try:
+        with open(meta_path(path), "r", encoding="utf-8") as f:
+            meta = jsonlib.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return meta if isinstance(meta, dict) else {}
+
+def write_meta(path: str, meta: dict) -> None:
+
+    tmp_path = f"{meta_path(path)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        jsonlib.dump(meta, f)
+    os.replace(tmp_path, meta_path(path))
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+# --------------------------------------------------------------------------------------
+# CABECERAS CONDICIONALES - Devuelve If-None-Match / If-Modified-Since si el archivo ya está en disco.
+# --------------------------------------------------------------------------------------
+def conditional_headers(path: str) -> dict:
+
+    if not path or not os.path.exists(path):
+        return {}
+
+    meta = load_meta(path)
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    return headers
+
+# --------------------------------------------------------------------------------------
+# RESPUESTA SIN CAMBIOS - Si el servidor responde 304 o el cuerpo es idéntico, renueva la fecha de descarga sin tocar el JSON.
+# --------------------------------------------------------------------------------------
+def response_unchanged(path: str, url: str, status_code: int, headers: dict, content: bytes) -> bool:
+
+    if not path or not os.path.exists(path):
+        return False
+
+    meta = load_meta(path)
+    if status_code != 304 and (not meta or meta.get("hash") != body_hash(content)):
+        return False
+
+    meta.update({"url": url, "fetched": time.time()})
+    if headers.get("ETag"):
+        meta["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        meta["last_modified"] = headers["Last-Modified"]
+
+    write_meta(path=path, meta=meta)
+    raw_index.touch_file(path=path)
+    return True
+
+# --------------------------------------------------------------------------------------
+# REGISTRO DE RESPUESTAS NUEVAS - Los validadores se guardan solo cuando el JSON llega a escribirse en disco.
+# --------------------------------------------------------------------------------------
+def remember_response(path: str, url: str, headers: dict, content: bytes) -> None:
+
+    if not path:
+        return
+
+    meta = {"url": url, "etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"), "hash": body_hash(content), "fetched": time.time()}
+    with _pending_lock:
+        _pending[os.path.abspath(path)] = meta
+
+def commit_response(path: str) -> None:
+
+    with _pending_lock:
+        meta = _pending.pop(os.path.abspath(path), None)
+
+    if meta is not None:
+        write_meta(path=path, meta=meta)
+
+# --------------------------------------------------------------------------------------
+# FECHA DE DESCARGA - Última vez que se descargó o validó el archivo (None si no tiene metadatos).
+# --------------------------------------------------------------------------------------
+def fetched_time(path: str) -> float | None:
+    return load_meta(path).get("fetched")
@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import threading
+import time
+
+from use.functions import create_slug
+
+# --------------------------------------------------------------------------------------
+# CLAVE DE ORIGEN - Identificador de una entidad en su fuente como texto (los ids numéricos leídos como float pierden el ".0").
+# --------------------------------------------------------------------------------------
+def source_key(value) -> str | None:
+
+    if value is None or value != value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    return str(value)
+
+# --------------------------------------------------------------------------------------
+# REGISTRO DE IDENTIDADES - Relaciona (tipo, fuente, id en la fuente) con una entidad canónica (id, nombre y slug).
+# Solo se guardan los emparejamientos automáticos seguros (puntuación >= AUTO_LINK_SCORE) y los confirmados a mano
+# (confirmed = 1, que sustituyen al automático); el resto se vuelve a emparejar por nombre en cada ejecución.
+# --------------------------------------------------------------------------------------
+AUTO_LINK_SCORE = 90.0
+
+def confident_score(score) -> bool:
+    return score is not None and score == score and float(score) >= AUTO_LINK_SCORE
+
+class IdentityRegistry:
+
+    def __init__(self, db_path: str):
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (entity_id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, name TEXT, slug TEXT, created REAL);
+            CREATE TABLE IF NOT EXISTS identities (kind TEXT, source TEXT, source_id TEXT, entity_id INTEGER, score REAL, confirmed INTEGER DEFAULT 0, updated REAL,
+                                                   PRIMARY KEY (kind, source, source_id));
+            CREATE INDEX IF NOT EXISTS identities_entity ON identities (entity_id);
+        """)
+        self.conn.commit()
+
+    # {id en la fuente: (entidad, puntuación del emparejamiento)} de los ids ya registrados
+    def lookup(self, kind: str, source: str, source_ids: list) -> dict:
+
+        keys = sorted({key for key in (source_key(source_id) for source_id in source_ids) if key is not None})
+        found = {}
+
+        with self.lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.conn.execute(f"SELECT source_id, entity_id, score FROM identities WHERE kind = ? AND source = ? AND source_id IN ({','.join('?' * len(chunk))})",
+                                         (kind, source, *chunk)).fetchall()
+                found.update({source_id: (entity_id, score) for source_id, entity_id, score in rows})
+
+        return found
+
+    # Entidades (de entity_ids) que ya tienen algún id de la fuente indicada, es decir, ya emparejadas con ella
+    def linked_entities(self, kind: str, source: str, entity_ids: list) -> set:
+
+        ids = sorted(set(entity_ids))
+        linked = set()
+
+        with self.lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self.conn.execute(f"SELECT DISTINCT entity_id FROM identities WHERE kind = ? AND source = ? AND entity_id IN ({','.join('?' * len(chunk))})",
+                                         (kind, source, *chunk)).fetchall()
+                linked.update(row[0] for row in rows)
+
+        return linked
+
+    # Entidad ya registrada para alguno de los ids ({fuente: id}), sin escribir nada (None si no hay)
+    def find(self, kind: str, source_ids: dict) -> int | None:
+
+        with self.lock:
+            for source, source_id in source_ids.items():
+                key = source_key(source_id)
+                if key is None:
+                    continue
+                row = self.conn.execute("SELECT entity_id FROM identities WHERE kind = ? AND source = ? AND source_id = ?", (kind, source, key)).fetchone()
+                if row is not None:
+                    return row[0]
+
+        return None
+
+    def entity_names(self, entity_ids: list) -> dict:
+
+        ids = sorted(set(entity_ids))
+        names = {}
+
+        with self.lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self.conn.execute(f"SELECT entity_id, name FROM entities WHERE entity_id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+                names.update(dict(rows))
+
+        return names
+
+    # Liga los ids de una fila emparejada con seguridad ({fuente: id}) a una entidad: la ya registrada para alguno de ellos o una nueva con ese nombre
+    def link(self, kind: str, source_ids: dict, name: str, scores: dict = None) -> int:
+
+        scores = scores or {}
+        keys = {source: source_key(source_id) for source, source_id in source_ids.items()}
+        keys = {source: key for source, key in keys.items() if key is not None}
+        now = time.time()
+
+        with self.lock, self.conn:
+            entity_id = None
+            for source, key in keys.items():
+                row = self.conn.execute("SELECT entity_id FROM identities WHERE kind = ? AND source = ? AND source_id = ?", (kind, source, key)).fetchone()
+                if row is not None:
+                    entity_id = row[0]
+                    break
+
+            if entity_id is None:
+                entity_id = self.conn.execute("INSERT INTO entities (kind, name, slug, created) VALUES (?, ?, ?, ?)", (kind, name, create_slug(text=name), now)).lastrowid
+
+            for source, key in keys.items():
+                score = scores.get(source)
+                self.conn.execute("INSERT OR IGNORE INTO identities (kind, source, source_id, entity_id, score, confirmed, updated) VALUES (?, ?, ?, ?, ?, 0, ?)",
+                                  (kind, source, key, entity_id, None if score is None or score != score else float(score), now))
+
+        return entity_id
+
+    # Emparejamiento manual: fija la entidad de un id de una fuente
+    def confirm(self, kind: str, source: str, source_id, entity_id: int) -> None:
+
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO identities (kind, source, source_id, entity_id, score, confirmed, updated) VALUES (?, ?, ?, ?, 100, 1, ?)",
+                              (kind, source, source_key(source_id), entity_id, time.time()))
+
+    def close(self) -> None:
+        self.conn.close()
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def open_identity_registry(data_path: str) -> IdentityRegistry:
+
+    db_path = os.path.join(os.path.abspath(data_path), "identity_registry.sqlite")
+    with _registries_lock:
+        if db_path not in _registries:
+            _registries[db_path] = IdentityRegistry(db_path=db_path)
+        return _registries[db_path]
+
+def close_identity_registry(data_path: str) -> None:
+
+    db_path = os.path.join(os.path.abspath(data_path), "identity_registry.sqlite")
+    with _registries_lock:
+        registry = _registries.pop(db_path, None)
+
+    if registry is not None:
+        registry.close()
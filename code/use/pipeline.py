@@ -0,0 +1,214 @@
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# --------------------------------------------------------------------------------------
+# NODO DEL PIPELINE - Una etapa (fuente x liga x temporada) con sus dependencias, entradas y salidas.
+# inputs: rutas (archivos o carpetas) o función que las devuelve; None = se ejecuta siempre (scraping).
+# outputs: rutas que deben existir para poder saltar el nodo (o función que las devuelve).
+# lane: los nodos de un mismo carril se ejecutan de uno en uno (p. ej. un host de scraping).
+# cpu: el nodo se ejecuta en el pool de procesos, por lo que func y kwargs deben poder serializarse.
+# --------------------------------------------------------------------------------------
+class Node:
+
+    def __init__(self, name: str, func, kwargs: dict = None, deps: list[str] = None, inputs=None, outputs: list[str] = None, lane: str = None, cpu: bool = False):
+
+        self.name = name
+        self.func = func
+        self.kwargs = kwargs or {}
+        self.deps = deps or []
+        self.inputs = inputs
+        self.outputs = outputs or []
+        self.lane = lane
+        self.cpu = cpu
+
+    def input_paths(self) -> list[str] | None:
+        return self.inputs() if callable(self.inputs) else self.inputs
+
+    def output_paths(self) -> list[str]:
+        return self.outputs() if callable(self.outputs) else self.outputs
+
+# --------------------------------------------------------------------------------------
+# ESTADO DEL PIPELINE - Huella de las entradas con la que se ejecutó cada nodo por última vez y caché de hashes por archivo.
+# El hash de un archivo solo se recalcula si cambian su tamaño o su fecha de modificación.
+# --------------------------------------------------------------------------------------
+IGNORED_SUFFIXES = (".meta", ".tmp", ".sqlite", ".sqlite-wal", ".sqlite-shm")
+
+class PipelineState:
+
+    def __init__(self, db_path: str):
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS file_hashes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT);
+            CREATE TABLE IF NOT EXISTS node_runs (name TEXT PRIMARY KEY, fingerprint TEXT, finished REAL);
+        """)
+        self.conn.commit()
+
+    def file_hash(self, path: str) -> str:
+
+        stat = os.stat(path)
+        with self.lock:
+            row = self.conn.execute("SELECT size, mtime_ns, hash FROM file_hashes WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, digest.hexdigest()))
+            self.conn.commit()
+
+        return digest.hexdigest()
+
+    # Huella de contenido: hash de la lista ordenada de (ruta, hash) de todos los archivos de las entradas
+    def fingerprint(self, paths: list[str], salt: str = "") -> str:
+
+        files = []
+        for path in paths:
+            if os.path.isfile(path):
+                files.append(os.path.abspath(path))
+            elif os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    files.extend(os.path.abspath(os.path.join(root, name)) for name in names if not name.endswith(IGNORED_SUFFIXES))
+
+        digest = hashlib.sha256(salt.encode("utf-8"))
+        for file in sorted(set(files)):
+            digest.update(f"{file}\0{self.file_hash(file)}\n".encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def last_fingerprint(self, name: str) -> str | None:
+
+        with self.lock:
+            row = self.conn.execute("SELECT fingerprint FROM node_runs WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def save_run(self, name: str, fingerprint: str | None, finished: float) -> None:
+
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO node_runs VALUES (?, ?, ?)", (name, fingerprint, finished))
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+_states = {}
+_states_lock = threading.Lock()
+
+def open_pipeline_state(data_path: str) -> PipelineState:
+
+    db_path = os.path.join(os.path.abspath(data_path), "pipeline_state.sqlite")
+    with _states_lock:
+        if db_path not in _states:
+            _states[db_path] = PipelineState(db_path=db_path)
+        return _states[db_path]
+
+# --------------------------------------------------------------------------------------
+# EJECUCIÓN DEL GRAFO - Lanza cada nodo cuando terminan sus dependencias; los independientes van en paralelo.
+# Un nodo se salta si la huella de sus entradas no cambió desde su última ejecución y sus salidas existen.
+# Las huellas se calculan en un pool de hilos propio, para que el planificador no recorra ni hashee árboles de archivos
+# y no esperen detrás de los nodos de scraping del pool de E/S.
+# Devuelve {nombre: (estado, hora)} con estado "ran", "skipped", "failed" o "blocked"; on_finish(nombre, results) se llama al terminar cada nodo.
+# --------------------------------------------------------------------------------------
+def node_fingerprint(node: Node, state: PipelineState) -> str | None:
+
+    input_paths = node.input_paths()
+    return None if input_paths is None else state.fingerprint(paths=input_paths, salt=node.name)
+
+def run_dag(nodes: list[Node], state: PipelineState, io_workers: int = 4, cpu_workers: int = None, fingerprint_workers: int = 2, print_info: bool = True, on_finish=None) -> dict:
+
+    nodes_dict = {node.name: node for node in nodes}
+    missing = {dep for node in nodes for dep in node.deps if dep not in nodes_dict}
+    if missing:
+        raise ValueError(f"Dependencias desconocidas en el pipeline: {sorted(missing)}")
+
+    dependents = {name: [] for name in nodes_dict}
+    waiting = {name: len(node.deps) for name, node in nodes_dict.items()}
+    for node in nodes:
+        for dep in node.deps:
+            dependents[dep].append(node.name)
+
+    results = {}
+    ready = [name for name, total in waiting.items() if total == 0]
+    busy_lanes = set()
+    running = {}
+
+    def finish(name: str, status: str) -> None:
+        busy_lanes.discard(nodes_dict[name].lane)
+        results[name] = (status, time.time())
+        if on_finish is not None:
+            on_finish(name, results)
+        for child in dependents[name]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                ready.append(child)
+
+    with ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="pipeline") as io_pool, ThreadPoolExecutor(max_workers=fingerprint_workers, thread_name_prefix="fingerprint") as fingerprint_pool, \
+         ProcessPoolExecutor(max_workers=cpu_workers) as cpu_pool:
+
+        def dispatch(name: str, fingerprint: str | None) -> None:
+            node = nodes_dict[name]
+            pool = cpu_pool if node.cpu else io_pool
+            running[pool.submit(node.func, **node.kwargs)] = (name, "run", fingerprint)
+
+        while ready or running:
+            for name in list(ready):
+                node = nodes_dict[name]
+
+                # Si alguna dependencia falló, el nodo no se ejecuta
+                if any(results[dep][0] in ("failed", "blocked") for dep in node.deps):
+                    ready.remove(name)
+                    finish(name=name, status="blocked")
+                    continue
+
+                if node.lane is not None and node.lane in busy_lanes:
+                    continue
+
+                ready.remove(name)
+                if node.lane is not None:
+                    busy_lanes.add(node.lane)
+
+                # Sin entradas (scraping) no hay huella que calcular
+                if node.inputs is None:
+                    dispatch(name=name, fingerprint=None)
+                else:
+                    running[fingerprint_pool.submit(node_fingerprint, node, state)] = (name, "fingerprint", None)
+
+            if not running:
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name, phase, fingerprint = running.pop(future)
+
+                try:
+                    result = future.result()
+                except Exception as error:
+                    if print_info:
+                        print(f"Pipeline node failed ({name}): {type(error).__name__}: {error}")
+                    finish(name=name, status="failed")
+                    continue
+
+                if phase == "fingerprint":
+                    if result is not None and result == state.last_fingerprint(name) and all(os.path.exists(path) for path in nodes_dict[name].output_paths()):
+                        finish(name=name, status="skipped")
+                    else:
+                        dispatch(name=name, fingerprint=result)
+                    continue
+
+                state.save_run(name=name, fingerprint=fingerprint, finished=time.time())
+                finish(name=name, status="ran")
+
+    return results
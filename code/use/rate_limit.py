@@ -0,0 +1,227 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# --------------------------------------------------------------------------------------
+# TOKEN BUCKET - Limita el número de peticiones por segundo a un host.
+# --------------------------------------------------------------------------------------
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+
+        if rate <= 0:
+            raise ValueError("El parámetro 'rate' debe ser mayor que 0.")
+
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def set_rate(self, rate: float) -> None:
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        wait_time = self.reserve(tokens=tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        wait_time = self.reserve(tokens=tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+# --------------------------------------------------------------------------------------
+# LIMITADOR ADAPTATIVO POR HOST - Sube el ritmo poco a poco si todo va bien y lo divide ante errores (AIMD).
+# Respeta Retry-After y abre un circuito que pausa el host tras varios fallos seguidos.
+# --------------------------------------------------------------------------------------
+RETRY_STATUS = {403, 429, 500, 502, 503, 504}
+
+class HostLimiter:
+
+    def __init__(self, rate: float = 1 / 3, min_rate: float = 0.05, max_rate: float = 1.0, increase: float = 0.02, decrease: float = 0.5,
+                 failure_threshold: int = 5, cooldown: float = 300.0, backoff_base: float = 2.0, backoff_cap: float = 120.0):
+
+        self.bucket = TokenBucket(rate=rate)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.lock = threading.Lock()
+        self.paused_until = 0.0
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.errors = 0
+        self.throttled = 0
+        self.circuit_opens = 0
+
+    def reserve(self, tokens: float = 1.0) -> float:
+
+        with self.lock:
+            pause = max(0.0, self.paused_until - time.monotonic())
+
+        return pause + self.bucket.reserve(tokens=tokens)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        wait_time = self.reserve(tokens=tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        wait_time = self.reserve(tokens=tokens)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def success(self) -> None:
+
+        with self.lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.increase))
+
+    def failure(self, status: int = None, retry_after: float = None) -> None:
+
+        with self.lock:
+            self.errors += 1
+            if status in (403, 429):
+                self.throttled += 1
+
+            self.consecutive_failures += 1
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate * self.decrease))
+
+            pause = retry_after or 0.0
+            if self.consecutive_failures >= self.failure_threshold:
+                pause = max(pause, self.cooldown)
+                self.circuit_opens += 1
+                self.consecutive_failures = 0
+
+            if pause > 0:
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def set_max_rate(self, max_rate: float) -> None:
+
+        with self.lock:
+            self.max_rate = max_rate
+            self.bucket.set_rate(min(self.bucket.rate, max_rate))
+
+    # Backoff exponencial con jitter completo: espera aleatoria entre 0 y base * 2^intento
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> dict:
+
+        with self.lock:
+            return {"rate": round(self.bucket.rate, 4), "successes": self.successes, "errors": self.errors, "throttled": self.throttled,
+                    "circuit_opens": self.circuit_opens, "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1)}
+
+# --------------------------------------------------------------------------------------
+# REGISTRO DE LIMITADORES POR HOST - Devuelve el limitador compartido de un host y sus estadísticas.
+# --------------------------------------------------------------------------------------
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def url_host(url: str) -> str:
+    return urlparse(url).netloc or url
+
+def host_limiter(url: str, max_rate: float = None, **limiter_kwargs) -> HostLimiter:
+
+    host = url_host(url)
+
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(**limiter_kwargs)
+        limiter = _limiters[host]
+
+    # El máximo de peticiones por segundo se puede ajustar aunque el limitador ya exista
+    if max_rate is not None:
+        limiter.set_max_rate(max_rate=max_rate)
+
+    return limiter
+
+def limiter_stats() -> dict:
+
+    with _limiters_lock:
+        return {host: limiter.stats() for host, limiter in _limiters.items()}
+
+# --------------------------------------------------------------------------------------
+# RETRY-AFTER - Convierte la cabecera (segundos o fecha HTTP) en segundos de espera.
+# --------------------------------------------------------------------------------------
+def retry_after_seconds(value: str | None) -> float | None:
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def http_failure(status: int, headers) -> tuple[int, float | None] | None:
+
+    if status not in RETRY_STATUS:
+        return None
+
+    return status, retry_after_seconds(headers.get("Retry-After"))
+
+# --------------------------------------------------------------------------------------
+# LLAMADA LIMITADA CON REINTENTOS - Ejecuta func pasando por el limitador del host.
+# check(result) devuelve (status, retry_after) si la respuesta es un fallo reintentable, o None si es válida.
+# Agotados los reintentos se devuelve el último resultado o se relanza la última excepción.
+# --------------------------------------------------------------------------------------
+def call_limited(url: str, func, check=None, retry_exceptions: tuple = (), retries: int = 3, tokens: float = 1.0):
+
+    limiter = host_limiter(url)
+
+    for attempt in range(retries + 1):
+        limiter.acquire(tokens=tokens)
+
+        try:
+            result = func()
+        except retry_exceptions:
+            limiter.failure()
+            if attempt == retries:
+                raise
+            time.sleep(limiter.backoff(attempt))
+            continue
+
+        failure = check(result) if check is not None else None
+        if failure is None:
+            limiter.success()
+            return result
+
+        status, retry_after = failure
+        limiter.failure(status=status, retry_after=retry_after)
+        if attempt == retries:
+            return result
+        time.sleep(max(limiter.backoff(attempt), retry_after or 0.0))
+
+    return result
@@ -0,0 +1,219 @@
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+
+# --------------------------------------------------------------------------------------
+# CLASES DE CADUCIDAD - Días de validez de cada tipo de archivo crudo.
+# --------------------------------------------------------------------------------------
+TTL_DAYS = {"current": 5, "entity": 30, "shared_entity": 30, "image": 90, "catalog": 200}
+
+ENTITY_TYPES = {"player", "team", "manager", "venue"}
+
+def ttl_class(path: str) -> str:
+
+    parts = os.path.normpath(path).split(os.sep)
+
+    if "images" in parts[:-1]:
+        return "image"
+    if parts[-1] == "available_seasons.json":
+        return "catalog"
+    if len(parts) > 2 and parts[-3] == "entities" and parts[-2] in ENTITY_TYPES:
+        return "shared_entity"
+    if len(parts) > 2 and parts[-3] == "info" and parts[-2] in ENTITY_TYPES:
+        return "entity"
+
+    return "current"
+
+def ttl_days(path: str) -> int:
+    return TTL_DAYS[ttl_class(path)]
+
+# --------------------------------------------------------------------------------------
+# DESCRIPCIÓN DE UN ARCHIVO CRUDO - Fuente, tipo de entidad e id a partir de la ruta relativa a raw.
+# --------------------------------------------------------------------------------------
+def describe_path(rel_path: str) -> tuple[str, str, str | None]:
+
+    parts = rel_path.split("/")
+    source = "sofascore" if parts[0] == "images" else parts[0]
+    stem = os.path.splitext(parts[-1])[0]
+
+    if stem.isdigit() and len(parts) > 1:
+        return source, parts[-2], stem
+
+    return source, stem, None
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def is_inside(root: str, abs_path: str) -> bool:
+
+    try:
+        return os.path.commonpath([root, abs_path]) == root
+    except ValueError:
+        return False
+
+# --------------------------------------------------------------------------------------
+# ÍNDICE SQLITE DE ARCHIVOS CRUDOS - Registra cuándo se descargó cada archivo, su hash y cuándo cambió por última vez.
+# --------------------------------------------------------------------------------------
+class RawIndex:
+
+    def __init__(self, raw_path: str):
+
+        self.root = os.path.abspath(raw_path)
+        os.makedirs(self.root, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(self.root, "raw_index.sqlite"), timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS raw_files (
+                path TEXT PRIMARY KEY, source TEXT, entity_type TEXT, entity_id TEXT,
+                fetched REAL, changed REAL, content_hash TEXT, ttl_class TEXT);
+            CREATE INDEX IF NOT EXISTS raw_files_entity ON raw_files (source, entity_type, entity_id);
+            CREATE TABLE IF NOT EXISTS clean_runs (scope TEXT PRIMARY KEY, cleaned REAL);
+        """)
+        self.conn.commit()
+
+    def rel_path(self, path: str) -> str | None:
+
+        abs_path = os.path.abspath(path)
+        if not is_inside(self.root, abs_path):
+            return None
+
+        return os.path.relpath(abs_path, self.root).replace(os.sep, "/")
+
+    def record(self, path: str, content: bytes, fetched: float = None) -> None:
+
+        rel_path = self.rel_path(path)
+        fetched = time.time() if fetched is None else fetched
+        new_hash = content_hash(content)
+        source, entity_type, entity_id = describe_path(rel_path)
+
+        with self.lock:
+            row = self.conn.execute("SELECT content_hash, changed FROM raw_files WHERE path = ?", (rel_path,)).fetchone()
+            changed = row[1] if row is not None and row[0] == new_hash else fetched
+
+            self.conn.execute("INSERT OR REPLACE INTO raw_files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              (rel_path, source, entity_type, entity_id, fetched, changed, new_hash, ttl_class(path)))
+            self.conn.commit()
+
+    def touch(self, path: str) -> None:
+
+        with self.lock:
+            self.conn.execute("UPDATE raw_files SET fetched = ? WHERE path = ?", (time.time(), self.rel_path(path)))
+            self.conn.commit()
+
+    def fetched_times(self, paths: list[str]) -> dict:
+
+        rel_paths = {self.rel_path(path): path for path in paths}
+        fetched = {}
+
+        with self.lock:
+            keys = list(rel_paths)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                query = f"SELECT path, fetched FROM raw_files WHERE path IN ({','.join('?' * len(chunk))})"
+                for rel_path, fetched_time in self.conn.execute(query, chunk):
+                    fetched[rel_paths[rel_path]] = fetched_time
+
+        return fetched
+
+    # Archivos que hay que descargar: sin fila en el índice y sin archivo, o con la fecha de descarga caducada
+    def stale_paths(self, paths: list[str], total_days: int = None) -> list[str]:
+
+        fetched = self.fetched_times(paths=paths)
+        now = time.time()
+        stale = []
+
+        for path in paths:
+            fetched_time = fetched.get(path)
+            if fetched_time is None:
+                if not os.path.exists(path):
+                    stale.append(path)
+                    continue
+
+                # Archivos previos al índice: se registran una vez con su ctime
+                with open(path, "rb") as f:
+                    fetched_time = os.path.getctime(path)
+                    self.record(path=path, content=f.read(), fetched=fetched_time)
+
+            days = ttl_days(path) if total_days is None else total_days
+            if now - fetched_time > days * 86400:
+                stale.append(path)
+
+        return stale
+
+    # Limpieza: hay cambios si algún archivo bajo scope (o bajo watch_paths) cambió de contenido después de la última limpieza
+    def needs_cleaning(self, scope_path: str, watch_paths: list[str] = None) -> bool:
+
+        scope = self.rel_path(scope_path)
+        with self.lock:
+            row = self.conn.execute("SELECT cleaned FROM clean_runs WHERE scope = ?", (scope,)).fetchone()
+            if row is None:
+                return True
+
+            for watch in [scope] + [self.rel_path(path) for path in watch_paths or []]:
+                changed = self.conn.execute("SELECT 1 FROM raw_files WHERE (path = ? OR path LIKE ?) AND changed > ? LIMIT 1",
+                                            (watch, f"{watch}/%", row[0])).fetchone()
+                if changed is not None:
+                    return True
+
+            return False
+
+    def mark_cleaned(self, scope_path: str, cleaned: float) -> None:
+
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO clean_runs VALUES (?, ?)", (self.rel_path(scope_path), cleaned))
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+# --------------------------------------------------------------------------------------
+# REGISTRO DE ÍNDICES ABIERTOS - Un índice por carpeta raw; las rutas fuera de ellas se ignoran.
+# --------------------------------------------------------------------------------------
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def open_raw_index(raw_path: str) -> RawIndex:
+
+    root = os.path.abspath(raw_path)
+    with _indexes_lock:
+        if root not in _indexes:
+            _indexes[root] = RawIndex(raw_path=root)
+        return _indexes[root]
+
+def index_for_path(path: str) -> RawIndex | None:
+
+    abs_path = os.path.abspath(path)
+    for root, index in list(_indexes.items()):
+        if is_inside(root, abs_path):
+            return index
+
+    return None
+
+def record_file(path: str, content: bytes) -> None:
+
+    index = index_for_path(path)
+    if index is not None:
+        index.record(path=path, content=content)
+
+def touch_file(path: str) -> None:
+
+    index = index_for_path(path)
+    if index is not None:
+        index.touch(path=path)
+
+def stale_paths(paths: list[str], total_days: int = None) -> list[str]:
+
+    if not paths:
+        return []
+
+    index = index_for_path(paths[0])
+    if index is not None:
+        return index.stale_paths(paths=paths, total_days=total_days)
+
+    now = time.time()
+    return [path for path in paths if not os.path.exists(path) or now - os.path.getctime(path) > (ttl_days(path) if total_days is None else total_days) * 86400]
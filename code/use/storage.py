@@ -0,0 +1,242 @@
+import os
+import csv
+
+import pandas as pd
+
+# --------------------------------------------------------------------------------------
+# FORMATO DE ALMACENAMIENTO - Formato de las tablas de clean y proc (csv, parquet o feather), elegido por ejecución.
+# Se guarda en variables de entorno para que lo hereden los procesos del pool.
+# Parquet y Feather necesitan pyarrow; CSV sigue siendo el formato por defecto.
+# --------------------------------------------------------------------------------------
+STORAGE_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+FORMAT_ENV = "TFM_STORAGE_FORMAT"
+CSV_EXPORT_ENV = "TFM_CSV_EXPORT"
+
+def set_storage_format(storage_format: str = "csv", csv_export: bool = False) -> None:
+
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(f"Formato de almacenamiento no soportado: {storage_format} (opciones: {list(STORAGE_FORMATS)}).")
+
+    os.environ[FORMAT_ENV] = storage_format
+    os.environ[CSV_EXPORT_ENV] = "1" if csv_export else "0"
+
+def storage_format() -> str:
+    return os.environ.get(FORMAT_ENV, "csv")
+
+def csv_export() -> bool:
+    return os.environ.get(CSV_EXPORT_ENV, "0") == "1"
+
+def table_path(path: str, table_format: str = None) -> str:
+    return os.path.splitext(path)[0] + STORAGE_FORMATS[table_format or storage_format()]
+
+# --------------------------------------------------------------------------------------
+# ESQUEMA EXPLÍCITO - Un tipo por columna antes de escribir en formato columnar:
+# columnas object numéricas pasan a número, las de texto se quedan y las mezcladas se guardan como texto.
+# --------------------------------------------------------------------------------------
+def columnar_schema(df: pd.DataFrame) -> pd.DataFrame:
+
+    df = df.copy()
+    df.columns = [str(column) for column in df.columns]
+
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+
+        inferred = pd.api.types.infer_dtype(df[column], skipna=True)
+        if inferred in ("integer", "floating", "mixed-integer-float", "decimal"):
+            df[column] = pd.to_numeric(df[column])
+        elif inferred not in ("string", "boolean", "empty"):
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+
+    return df
+
+# --------------------------------------------------------------------------------------
+# ESCRITURA DE TABLAS - Guarda la tabla en el formato activo (la ruta puede venir con extensión .csv).
+# Con la exportación CSV activada se escribe además la copia en CSV.
+# --------------------------------------------------------------------------------------
+def write_table(df: pd.DataFrame, path: str) -> str:
+
+    table_format = storage_format()
+    out_path = table_path(path=path, table_format=table_format)
+
+    if table_format == "parquet":
+        columnar_schema(df).to_parquet(out_path, index=False)
+    elif table_format == "feather":
+        columnar_schema(df).reset_index(drop=True).to_feather(out_path)
+    else:
+        df.to_csv(out_path, index=False, sep=";")
+
+    if table_format != "csv" and csv_export():
+        df.to_csv(table_path(path=path, table_format="csv"), index=False, sep=";")
+
+    return out_path
+
+# --------------------------------------------------------------------------------------
+# LECTURA DE TABLAS - Lee la tabla en el formato activo; solo si no existe en él se usa la más reciente de los demás formatos
+# (None si no existe en ninguno). La copia CSV de la exportación se escribe después y nunca se prefiere a la del formato activo.
+# columns: proyección de columnas; las que no existan en la tabla se ignoran.
+# --------------------------------------------------------------------------------------
+def existing_table_path(path: str) -> str | None:
+
+    active_path = table_path(path=path)
+    if os.path.exists(active_path):
+        return active_path
+
+    candidates = [table_path(path=path, table_format=table_format) for table_format in STORAGE_FORMATS]
+    candidates = [candidate for candidate in candidates if os.path.exists(candidate)]
+
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+def table_exists(path: str) -> bool:
+    return existing_table_path(path) is not None
+
+def table_columns(path: str) -> list[str]:
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+
+    import pyarrow.feather as feather
+    return feather.read_table(path, memory_map=True).column_names
+
+def read_table(path: str, columns: list[str] = None) -> pd.DataFrame | None:
+
+    in_path = existing_table_path(path)
+    if in_path is None:
+        return None
+
+    if in_path.endswith(".csv"):
+        if columns is None:
+            return pd.read_csv(in_path, sep=";")
+
+        wanted = set(columns)
+        return pd.read_csv(in_path, sep=";", usecols=lambda column: column in wanted)
+
+    if columns is not None:
+        wanted = set(columns)
+        columns = [column for column in table_columns(in_path) if column in wanted]
+
+    if in_path.endswith(".parquet"):
+        return pd.read_parquet(in_path, columns=columns)
+
+    return pd.read_feather(in_path, columns=columns)
+
+# --------------------------------------------------------------------------------------
+# AÑADIDO DE FILAS - Añade filas nuevas a una tabla ya guardada en el formato activo sin reescribir las existentes.
+# En CSV las filas se añaden al final del archivo con el orden de columnas de la cabecera; si traen columnas que la tabla no tiene
+# devuelve False y hay que reescribirla entera. Parquet y Feather no admiten añadir filas: se leen, se concatenan y se reescriben.
+# --------------------------------------------------------------------------------------
+def append_table(df: pd.DataFrame, path: str) -> bool:
+
+    table_format = storage_format()
+    out_path = table_path(path=path, table_format=table_format)
+    if not os.path.exists(out_path):
+        return False
+
+    if df.empty:
+        return True
+
+    if table_format == "csv":
+        header = csv_header(out_path)
+        if not header or not set(df.columns) <= set(header):
+            return False
+
+        df.reindex(columns=header).to_csv(out_path, mode="a", header=False, index=False, sep=";")
+        return True
+
+    write_table(df=pd.concat([read_table(path=path), df], ignore_index=True), path=path)
+    return True
+
+# --------------------------------------------------------------------------------------
+# CONCATENACIÓN EN STREAMING - Une tablas ya guardadas (p. ej. las temporadas de una liga) en una sola sin cargarlas a la vez.
+# Las columnas son la unión en orden de aparición (como pd.concat) y las que faltan en una tabla quedan vacías.
+# En CSV se copian los campos tal cual fila a fila; en Parquet/Feather se escribe tabla a tabla con un tipo por columna para todas.
+# --------------------------------------------------------------------------------------
+def csv_header(path: str) -> list[str]:
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f, delimiter=";"), [])
+
+    return [] if header in ([], [""]) else header
+
+def concat_csv_files(paths: list[str], out_path: str) -> None:
+
+    headers = {path: csv_header(path) for path in paths}
+    columns = list(dict.fromkeys(column for header in headers.values() for column in header))
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out, delimiter=";", lineterminator=os.linesep)
+        writer.writerow(columns)
+
+        for path in paths:
+            header = headers[path]
+            if not header:
+                continue
+
+            positions = [header.index(column) if column in header else None for column in columns]
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f, delimiter=";")
+                next(reader)
+                if header == columns:
+                    writer.writerows(reader)
+                else:
+                    writer.writerows([row[pos] if pos is not None else "" for pos in positions] for row in reader)
+
+    os.replace(tmp_path, out_path)
+
+def arrow_column_type(types: list):
+
+    import pyarrow as pa
+
+    types = list(dict.fromkeys(t for t in types if not pa.types.is_null(t)))
+    if not types:
+        return pa.null()
+    if len(types) == 1:
+        return types[0]
+    if all(pa.types.is_integer(t) for t in types):
+        return pa.int64()
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+
+    return pa.string()
+
+def concat_arrow_files(paths: list[str], out_path: str, table_format: str) -> None:
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    read_schema = pq.read_schema if table_format == "parquet" else lambda path: feather.read_table(path, memory_map=True).schema
+    read_arrow = pq.read_table if table_format == "parquet" else lambda path: feather.read_table(path, memory_map=True)
+
+    # Cada temporada infiere sus tipos por separado: un tipo por columna para todas (enteros y decimales a float, conflictos a texto)
+    schemas = [read_schema(path) for path in paths]
+    names = list(dict.fromkeys(name for schema in schemas for name in schema.names))
+    schema = pa.schema([pa.field(name, arrow_column_type([schema.field(name).type for schema in schemas if name in schema.names])) for name in names])
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    writer = pq.ParquetWriter(tmp_path, schema) if table_format == "parquet" else pa.ipc.new_file(tmp_path, schema)
+    with writer:
+        for path in paths:
+            table = read_arrow(path)
+            columns = [table.column(field.name).cast(field.type) if field.name in table.column_names else pa.nulls(table.num_rows, type=field.type) for field in schema]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            del table, columns
+
+    os.replace(tmp_path, out_path)
+
+def concat_tables(paths: list[str], out_path: str) -> None:
+
+    table_format = storage_format()
+    formats = [table_format] + (["csv"] if table_format != "csv" and csv_export() else [])
+
+    for fmt in formats:
+        in_paths = [table_path(path=path, table_format=fmt) for path in paths]
+        in_paths = [path for path in in_paths if os.path.exists(path)]
+
+        if fmt == "csv":
+            concat_csv_files(paths=in_paths, out_path=table_path(path=out_path, table_format=fmt))
+        else:
+            concat_arrow_files(paths=in_paths, out_path=table_path(path=out_path, table_format=fmt), table_format=fmt)
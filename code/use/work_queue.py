@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import threading
+import time
+
+# --------------------------------------------------------------------------------------
+# COLA DE TRABAJO PERSISTENTE - Plan de descarga de cada liga-temporada en SQLite con estados
+# pending / in_flight / done / failed, para poder reanudar una ejecución interrumpida.
+# --------------------------------------------------------------------------------------
+class WorkQueue:
+
+    def __init__(self, db_path: str, max_attempts: int = 3):
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS work_items (
+                queue TEXT, kind TEXT, item_id TEXT, seq INTEGER, state TEXT, attempts INTEGER DEFAULT 0,
+                error TEXT, updated REAL, PRIMARY KEY (queue, kind, item_id));
+            CREATE INDEX IF NOT EXISTS work_items_state ON work_items (queue, kind, state, attempts, seq);
+        """)
+        self.conn.commit()
+
+    def execute(self, query: str, params: tuple = ()) -> list:
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+            self.conn.commit()
+            return rows
+
+    # Hay plan a medias si queda algo pendiente o en curso (solo de los tipos indicados, si se indican)
+    def has_open_items(self, queue: str, kinds: list[str] = None) -> bool:
+
+        if kinds is None:
+            return bool(self.execute("SELECT 1 FROM work_items WHERE queue = ? AND state IN ('pending', 'in_flight') LIMIT 1", (queue,)))
+
+        kinds = list(kinds)
+        return bool(self.execute(f"SELECT 1 FROM work_items WHERE queue = ? AND state IN ('pending', 'in_flight') AND kind IN ({','.join('?' * len(kinds))}) LIMIT 1", (queue, *kinds)))
+
+    def reset(self, queue: str) -> None:
+        self.execute("DELETE FROM work_items WHERE queue = ?", (queue,))
+
+    # Elementos de tipos que ya no procesa nadie (p. ej. de planes antiguos): se quitan para que no dejen la cola abierta
+    def drop_other_kinds(self, queue: str, kinds: list[str]) -> None:
+
+        kinds = list(kinds)
+        self.execute(f"DELETE FROM work_items WHERE queue = ? AND kind NOT IN ({','.join('?' * len(kinds))})", (queue, *kinds))
+
+    # Lo que quedó en curso al morir la ejecución anterior vuelve a estar pendiente
+    def recover(self, queue: str) -> None:
+        self.execute("UPDATE work_items SET state = 'pending', updated = ? WHERE queue = ? AND state = 'in_flight'", (time.time(), queue))
+
+    def enqueue(self, queue: str, kind: str, item_ids: list) -> None:
+
+        now = time.time()
+        with self.lock:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM work_items WHERE queue = ?", (queue,)).fetchone()[0]
+            self.conn.executemany("INSERT OR IGNORE INTO work_items (queue, kind, item_id, seq, state, updated) VALUES (?, ?, ?, ?, 'pending', ?)",
+                                  [(queue, kind, str(item_id), seq + i, now) for i, item_id in enumerate(item_ids)])
+            self.conn.commit()
+
+    # Reclama hasta limit elementos pendientes; los que ya fallaron alguna vez van al final.
+    # Reclamar no cuenta como intento: si la ejecución muere, recover() los devuelve a pendiente sin penalizarlos.
+    def claim(self, queue: str, kind: str, limit: int = None) -> list[str]:
+
+        with self.lock:
+            rows = self.conn.execute("SELECT item_id FROM work_items WHERE queue = ? AND kind = ? AND state = 'pending' ORDER BY attempts, seq LIMIT ?",
+                                     (queue, kind, -1 if limit is None else limit)).fetchall()
+            item_ids = [row[0] for row in rows]
+
+            self.conn.executemany("UPDATE work_items SET state = 'in_flight', updated = ? WHERE queue = ? AND kind = ? AND item_id = ?",
+                                  [(time.time(), queue, kind, item_id) for item_id in item_ids])
+            self.conn.commit()
+
+        return item_ids
+
+    def done(self, queue: str, kind: str, item_ids: list) -> None:
+
+        with self.lock:
+            self.conn.executemany("UPDATE work_items SET state = 'done', error = NULL, updated = ? WHERE queue = ? AND kind = ? AND item_id = ?",
+                                  [(time.time(), queue, kind, str(item_id)) for item_id in item_ids])
+            self.conn.commit()
+
+    # Un fallo cuenta un intento y devuelve el elemento a pendiente hasta agotar max_attempts; después queda como failed
+    def fail(self, queue: str, kind: str, item_ids: list, error: str = None) -> None:
+
+        with self.lock:
+            self.conn.executemany("UPDATE work_items SET attempts = attempts + 1, state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END, error = ?, updated = ? "
+                                  "WHERE queue = ? AND kind = ? AND item_id = ?",
+                                  [(self.max_attempts, error, time.time(), queue, kind, str(item_id)) for item_id in item_ids])
+            self.conn.commit()
+
+    def item_ids(self, queue: str, kind: str) -> list[str]:
+        return [row[0] for row in self.execute("SELECT item_id FROM work_items WHERE queue = ? AND kind = ? ORDER BY seq", (queue, kind))]
+
+    def counts(self, queue: str) -> dict:
+        return {f"{kind}/{state}": total for kind, state, total in self.execute("SELECT kind, state, COUNT(*) FROM work_items WHERE queue = ? GROUP BY kind, state", (queue,))}
+
+    # Reparto justo entre colas (p. ej. ligas): toma por turnos un elemento de cada cola con trabajo pendiente
+    def claim_round_robin(self, queues: list[str], kind: str, limit: int) -> list[tuple[str, str]]:
+
+        claimed = []
+        active = list(queues)
+
+        while active and len(claimed) < limit:
+            for queue in list(active):
+                item_ids = self.claim(queue=queue, kind=kind, limit=1)
+                if not item_ids:
+                    active.remove(queue)
+                    continue
+
+                claimed.append((queue, item_ids[0]))
+                if len(claimed) >= limit:
+                    break
+
+        return claimed
+
+    def close(self) -> None:
+        self.conn.close()
+
+# --------------------------------------------------------------------------------------
+# REGISTRO DE COLAS ABIERTAS - Una cola por carpeta raw (raw/work_queue.sqlite).
+# --------------------------------------------------------------------------------------
+_queues = {}
+_queues_lock = threading.Lock()
+
+def open_work_queue(raw_path: str) -> WorkQueue:
+
+    db_path = os.path.join(os.path.abspath(raw_path), "work_queue.sqlite")
+    with _queues_lock:
+        if db_path not in _queues:
+            _queues[db_path] = WorkQueue(db_path=db_path)
+        return _queues[db_path]
+
+# --------------------------------------------------------------------------------------
+# PLAN DE UNA COLA - Si la ejecución anterior terminó se descarta y se vuelve a crear con plan_func();
+# si quedó a medias se reanuda, devolviendo a pendiente lo que estaba en curso y añadiendo los ids nuevos del plan
+# (los ya presentes conservan su estado). plan_func() devuelve {kind: [ids]}.
+# kinds: tipos que procesa quien llama; los de otros tipos se descartan y no cuentan como plan a medias.
+# --------------------------------------------------------------------------------------
+def prepare_queue(work_queue: WorkQueue, queue: str, plan_func, kinds: list[str] = None) -> bool:
+
+    if kinds is not None:
+        work_queue.drop_other_kinds(queue=queue, kinds=kinds)
+
+    resumed = work_queue.has_open_items(queue=queue, kinds=kinds)
+    if resumed:
+        work_queue.recover(queue=queue)
+    else:
+        work_queue.reset(queue=queue)
+
+    for kind, item_ids in plan_func().items():
+        work_queue.enqueue(queue=queue, kind=kind, item_ids=item_ids)
+
+    return resumed
+
+# --------------------------------------------------------------------------------------
+# EJECUCIÓN DE UN TIPO DE TRABAJO - Reclama los pendientes de un tipo, los procesa por lotes y marca cada lote al terminarlo.
+# handler(lote) procesa una lista de ids y puede devolver los que no se completaron (el resto se da por hecho);
+# mapper reparte los lotes (map secuencial o el de un pool).
+# --------------------------------------------------------------------------------------
+def run_kind(work_queue: WorkQueue, queue: str, kind: str, handler, mapper=None, chunk_size: int = 1) -> None:
+
+    mapper = mapper or (lambda func, items: list(map(func, items)))
+
+    def run_chunk(chunk: list[str]) -> None:
+        try:
+            missing_ids = {str(item_id) for item_id in handler(chunk) or []}
+        except Exception as error:
+            work_queue.fail(queue=queue, kind=kind, item_ids=chunk, error=f"{type(error).__name__}: {error}")
+            return
+
+        work_queue.fail(queue=queue, kind=kind, item_ids=[item_id for item_id in chunk if item_id in missing_ids], error="Sin datos")
+        work_queue.done(queue=queue, kind=kind, item_ids=[item_id for item_id in chunk if item_id not in missing_ids])
+
+    # Los fallidos vuelven a pendiente y se reintentan en otra vuelta hasta agotar sus intentos
+    while True:
+        item_ids = work_queue.claim(queue=queue, kind=kind)
+        if not item_ids:
+            return
+
+        mapper(run_chunk, [item_ids[i:i + chunk_size] for i in range(0, len(item_ids), chunk_size)])
+
+# --------------------------------------------------------------------------------------
+# EJECUCIÓN ASÍNCRONA DE UN TIPO DE TRABAJO - Igual que run_kind, con un handler asíncrono que se espera lote a lote
+# dentro del bucle de eventos de quien llama (p. ej. para compartir una sesión HTTP entre todos los lotes).
+# --------------------------------------------------------------------------------------
+async def run_kind_async(work_queue: WorkQueue, queue: str, kind: str, handler, chunk_size: int = 1) -> None:
+
+    while True:
+        item_ids = work_queue.claim(queue=queue, kind=kind)
+        if not item_ids:
+            return
+
+        for chunk in [item_ids[i:i + chunk_size] for i in range(0, len(item_ids), chunk_size)]:
+            try:
+                missing_ids = {str(item_id) for item_id in await handler(chunk) or []}
+            except Exception as error:
+                work_queue.fail(queue=queue, kind=kind, item_ids=chunk, error=f"{type(error).__name__}: {error}")
+                continue
+
+            work_queue.fail(queue=queue, kind=kind, item_ids=[item_id for item_id in chunk if item_id in missing_ids], error="Sin datos")
+            work_queue.done(queue=queue, kind=kind, item_ids=[item_id for item_id in chunk if item_id not in missing_ids])